@@ -0,0 +1,70 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks import bench_helpers, bench_transport  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import BENCHMARKS, NOTES, find_regressions, run_benchmark
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Client-side helper micro-benchmarks.")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent on the throughput loop")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on regressions")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'benchmark':<32}{'ops/sec':>14}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'B/call':>10}{'blk/call':>10}")
+    for name, factory in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        result = run_benchmark(name, factory(), min_time=args.min_time)
+        results.append(result)
+        print(
+            f"{name:<32}{result.ops_per_sec:>14,.0f}{result.p50_us:>10.2f}{result.p95_us:>10.2f}"
+            f"{result.p99_us:>10.2f}{result.alloc_bytes_per_call:>10,.0f}{result.alloc_blocks_per_call:>10.1f}"
+        )
+
+    for result in results:
+        if result.name in NOTES:
+            print(f"  {result.name}: {NOTES[result.name]}")
+
+    payload = {result.name: result.as_dict() for result in results}
+    if args.json:
+        args.json.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+        baseline.update(payload)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    # A benchmark without a baseline entry is never compared; say so instead of passing silently.
+    missing = [result.name for result in results if result.name not in baseline]
+    if missing:
+        print(f"\nNot in {args.baseline.name} (run with --save-baseline): {', '.join(missing)}")
+    regressions = find_regressions(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"\nNo regressions against {args.baseline.name} (tolerance {args.tolerance:.0%}).")
+        return 0
+    print(f"\nRegressions against {args.baseline.name} (tolerance {args.tolerance:.0%}):")
+    for line in regressions:
+        print(f"  - {line}")
+    return 1 if args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
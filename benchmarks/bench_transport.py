@@ -0,0 +1,96 @@
+import atexit
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+from playwright.sync_api import sync_playwright
+
+from benchmarks.bench_helpers import USER_PAYLOAD
+from benchmarks.harness import NOTES, benchmark
+from tests.utils.api_utils import post_json
+from tests.utils.list_query import ListQuery
+from tests.utils.local_server import LocalServeRest, start_local_server
+from tests.utils.transport import ApiRequestContext, HttpRequestContext
+
+# Per-request overhead of each api_request backend against the in-process local server,
+# so the numbers are dominated by the client side (IPC to the driver vs. a direct socket).
+
+
+@cache
+def _server() -> LocalServeRest:
+    server = start_local_server()
+    atexit.register(server.stop)
+    return server
+
+
+@cache
+def _context(transport: str) -> ApiRequestContext:
+    base_url = _server().base_url
+    if transport == "http":
+        request_context = HttpRequestContext(base_url)
+        atexit.register(request_context.dispose)
+        return request_context
+    playwright = sync_playwright().start()
+    atexit.register(playwright.stop)
+    return playwright.request.new_context(base_url=base_url)
+
+
+@cache
+def _seeded_users(count: int = 200) -> ApiRequestContext:
+    # Half of the seeded users are admins, so the pushed-down filter skips about half the listing.
+    request_context = _context("http")
+    for index in range(count):
+        user = {**USER_PAYLOAD, "email": f"bench.list.{index}@gmail.com", "administrador": str(index % 2 == 0).lower()}
+        post_json(request_context, "/usuarios", user)
+    return request_context
+
+
+def _get_user(transport: str) -> Callable[[], Any]:
+    request_context = _context(transport)
+    created = post_json(request_context, "/usuarios", {**USER_PAYLOAD, "email": f"bench.{transport}@gmail.com"})
+    user_id = created.json()["_id"]
+    return lambda: request_context.get(f"/usuarios/{user_id}").json()
+
+
+def _login(transport: str) -> Callable[[], Any]:
+    request_context = _context(transport)
+    credentials = {"email": f"bench.login.{transport}@gmail.com", "password": USER_PAYLOAD["password"]}
+    post_json(request_context, "/usuarios", {**USER_PAYLOAD, **credentials})
+    return lambda: post_json(request_context, "/login", credentials).json()
+
+
+@benchmark("transport_playwright_get")
+def bench_playwright_get():
+    return _get_user("playwright")
+
+
+@benchmark("transport_http_get")
+def bench_http_get():
+    return _get_user("http")
+
+
+@benchmark("transport_playwright_post_json")
+def bench_playwright_post_json():
+    return _login("playwright")
+
+
+@benchmark("transport_http_post_json")
+def bench_http_post_json():
+    return _login("http")
+
+
+@benchmark("list_query_admins_server_filter")
+def bench_list_query_server_filter():
+    request_context = _seeded_users()
+    query = ListQuery("/usuarios").where("administrador", "==", "true")
+    saved = query.fetch(request_context, compare=True).bytes_saved
+    NOTES["list_query_admins_server_filter"] = f"{saved:,} bytes saved per call over the unfiltered listing"
+    return lambda: query.fetch(request_context)
+
+
+@benchmark("list_query_admins_client_filter")
+def bench_list_query_client_filter():
+    # The same admins, filtered after downloading the whole listing.
+    request_context = _seeded_users()
+    query = ListQuery("/usuarios").filter(lambda user: user["administrador"] == "true")
+    return lambda: query.fetch(request_context)
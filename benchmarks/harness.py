@@ -0,0 +1,121 @@
+import gc
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+BenchmarkFactory = Callable[[], Callable[[], Any]]
+BENCHMARKS: dict[str, BenchmarkFactory] = {}
+# Extra measurements a factory takes while setting up, printed under the results table.
+NOTES: dict[str, str] = {}
+
+
+def benchmark(name: str) -> Callable[[BenchmarkFactory], BenchmarkFactory]:
+    def register(factory: BenchmarkFactory) -> BenchmarkFactory:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return register
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    alloc_bytes_per_call: float
+    alloc_blocks_per_call: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _calibrate(func: Callable[[], Any], min_time: float) -> int:
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 10:
+            return max(1, int(iterations * min_time / elapsed))
+        iterations *= 2
+
+
+def _percentile(samples: list[int], fraction: float) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(fraction * 100) - 1] / 1000
+
+
+def _allocations(func: Callable[[], Any], calls: int) -> tuple[float, float]:
+    retained = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = 0
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            retained.append(func())
+            peaks += tracemalloc.get_traced_memory()[1] - current
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return peaks / calls, blocks / calls
+
+
+def run_benchmark(name: str, func: Callable[[], Any], min_time: float = 0.5) -> BenchmarkResult:
+    iterations = _calibrate(func, min_time)
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+
+    samples = []
+    for _ in range(min(iterations, 20_000)):
+        call_started = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - call_started)
+
+    alloc_bytes, alloc_blocks = _allocations(func, min(iterations, 200))
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        ops_per_sec=iterations / elapsed,
+        p50_us=_percentile(samples, 0.50),
+        p95_us=_percentile(samples, 0.95),
+        p99_us=_percentile(samples, 0.99),
+        alloc_bytes_per_call=alloc_bytes,
+        alloc_blocks_per_call=alloc_blocks,
+    )
+
+
+def find_regressions(
+    results: list[BenchmarkResult],
+    baseline: dict[str, dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.ops_per_sec < previous["ops_per_sec"] * (1 - tolerance):
+            drop = 1 - result.ops_per_sec / previous["ops_per_sec"]
+            regressions.append(
+                f"{result.name}: ops/sec down {drop:.0%} "
+                f"({previous['ops_per_sec']:,.0f} -> {result.ops_per_sec:,.0f})"
+            )
+        if result.alloc_bytes_per_call > previous["alloc_bytes_per_call"] * (1 + tolerance) + 64:
+            regressions.append(
+                f"{result.name}: allocations up ({previous['alloc_bytes_per_call']:,.0f} -> "
+                f"{result.alloc_bytes_per_call:,.0f} bytes/call)"
+            )
+    return regressions
@@ -1,112 +1,53 @@
 import json
-import os
-from pathlib import Path
 
 import allure
+import pytest
 from assertpy import assert_that
-from dotenv import load_dotenv
 from playwright.sync_api import APIRequestContext
 
-from tests.utils.api_utils import JSON_HEADERS, parse_response_body, post_json
-from tests.utils.faker_utils import random_email, random_product
+from tests.utils import scenario
+from tests.utils.api_utils import JSON_HEADERS, parse_response_body
+from tests.utils.scenario import Scenario, ScenarioBuilder
+from tests.utils.schemas import CARRINHO, validate
 
-load_dotenv(Path(__file__).resolve().parents[2] / "user.env")
-USER_PASSWORD = os.getenv("USER_PASSWORD")
+# The tests sharing cart_scenario's user, token and products run on one worker, so the
+# duration scheduler does not make every worker build them again.
+pytestmark = pytest.mark.xdist_group("cart_scenario")
 
 
-def login_with_default_payload(request: APIRequestContext) -> str:
-    user_email = random_email()
+CART_OWNER = ("user",)
 
-    new_user = {
-        "nome": "Cart Default User",
-        "email": user_email,
-        "password": USER_PASSWORD,
-        "administrador": "true",
-    }
-
-    post_json(request, "/usuarios", new_user)
-    resp = post_json(request, "/login", {"email": user_email, "password": USER_PASSWORD})
-    assert_that(resp.status).is_equal_to(200)
-
-    login_body = parse_response_body(resp)
-    return login_body["authorization"]
-
-
-def create_admin_user_and_get_token(request: APIRequestContext) -> str:
-    user_email = random_email()
-
-    new_user = {
-        "nome": "Cart User",
-        "email": user_email,
-        "password": USER_PASSWORD,
-        "administrador": "true",
-    }
-
-    post_json(request, "/usuarios", new_user)
-    resp = post_json(request, "/login", {"email": user_email, "password": USER_PASSWORD})
-    assert_that(resp.status).is_equal_to(200)
-
-    login_body = parse_response_body(resp)
-    return login_body["authorization"]
-
-
-def create_product(
-    request: APIRequestContext,
-    token: str,
-    price: int,
-    quantity: int,
-    description: str,
-) -> str:
-    product_data = {
-        "nome": random_product(),
-        "preco": price,
-        "descricao": description,
-        "quantidade": quantity,
-    }
-
-    product_resp = request.post(
-        "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
-        data=json.dumps(product_data, ensure_ascii=False),
-    )
-    assert_that(product_resp.status).is_equal_to(201)
 
-    product_body = parse_response_body(product_resp)
-    assert_that(product_body["message"]).is_equal_to("Cadastro realizado com sucesso")
-    return product_body["_id"]
+def cart_scenario(price: int, quantity: int, cart_quantity: int | None = None) -> Scenario:
+    # (user, product) -> token -> reset_cart -> cart. The product comes from the pooled
+    # admin, so it is created alongside the user. User, token and product are shared by
+    # the tests of a worker; a test that creates a cart owns it, so it builds with
+    # fresh=CART_OWNER and the shared user never holds an open cart.
+    steps = [scenario.user(admin=True), scenario.token(), scenario.product(price, quantity), scenario.reset_cart()]
+    if cart_quantity is not None:
+        steps.append(scenario.cart(cart_quantity))
+    return Scenario(*steps)
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct01_full_cart_lifecycle_for_authenticated_user(api_request: APIRequestContext):
-    token = create_admin_user_and_get_token(api_request)
-
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
-
-    product_id = create_product(api_request, token, 150, 10, "Product created for cart lifecycle test")
-    cart_body = {"produtos": [{"idProduto": product_id, "quantidade": 2}]}
-
-    create_cart_resp = api_request.post(
-        "/carrinhos",
-        headers={**JSON_HEADERS, "Authorization": token},
-        data=json.dumps(cart_body, ensure_ascii=False),
-    )
-    assert_that(create_cart_resp.status).is_equal_to(201)
+# 6, plus the pooled admin's signup and login when this is the worker's first admin request.
+@pytest.mark.http_budget(max_requests=8)
+def test_ct01_full_cart_lifecycle_for_authenticated_user(
+    api_request: APIRequestContext,
+    build_scenario: ScenarioBuilder,
+):
+    setup = build_scenario(cart_scenario(150, 10, cart_quantity=2), fresh=CART_OWNER)
+    token = setup["token"]
+    cart_id = setup["cart"]
+    assert_that(cart_id).is_not_none()
 
-    create_cart_body = parse_response_body(create_cart_resp)
-    assert_that(create_cart_body["message"]).is_equal_to("Cadastro realizado com sucesso")
-    assert_that(create_cart_body.get("_id")).is_not_none()
-
-    cart_id = create_cart_body["_id"]
     get_cart_resp = api_request.get(f"/carrinhos/{cart_id}")
     assert_that(get_cart_resp.status).is_equal_to(200)
 
     get_cart_body = parse_response_body(get_cart_resp)
 
-    produtos = get_cart_body["produtos"]
-    assert_that(len(produtos)).is_equal_to(1)
-    assert_that(get_cart_body.get("precoTotal")).is_not_none()
-    assert_that(get_cart_body.get("quantidadeTotal")).is_not_none()
-    assert_that(get_cart_body.get("idUsuario")).is_not_none()
+    assert_that(validate(CARRINHO, get_cart_body)).is_empty()
+    assert_that(len(get_cart_body["produtos"])).is_equal_to(1)
     assert_that(get_cart_body["_id"]).is_equal_to(cart_id)
 
     conclude_resp = api_request.delete("/carrinhos/concluir-compra", headers={"Authorization": token})
@@ -117,20 +58,11 @@ def test_ct01_full_cart_lifecycle_for_authenticated_user(api_request: APIRequest
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct02_cancel_purchase_and_return_products_to_stock(api_request: APIRequestContext):
-    token = login_with_default_payload(api_request)
-
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
-
-    product_id = create_product(api_request, token, 200, 5, "Product for cancel purchase test")
-    cart_body = {"produtos": [{"idProduto": product_id, "quantidade": 1}]}
-
-    create_cart_resp = api_request.post(
-        "/carrinhos",
-        headers={**JSON_HEADERS, "Authorization": token},
-        data=json.dumps(cart_body, ensure_ascii=False),
-    )
-    assert_that(create_cart_resp.status).is_equal_to(201)
+def test_ct02_cancel_purchase_and_return_products_to_stock(
+    api_request: APIRequestContext,
+    build_scenario: ScenarioBuilder,
+):
+    token = build_scenario(cart_scenario(200, 5, cart_quantity=1), fresh=CART_OWNER)["token"]
 
     cancel_resp = api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
     assert_that(cancel_resp.status).is_equal_to(200)
@@ -151,24 +83,18 @@ def test_ct03_prevent_creating_cart_without_authentication_token(api_request: AP
 
     assert_that(resp.status).is_equal_to(401)
     body = parse_response_body(resp)
-    assert_that(body).snapshot()
+    assert_that(body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct04_prevent_creating_more_than_one_cart_for_same_user(api_request: APIRequestContext):
-    token = login_with_default_payload(api_request)
-
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
-
-    product_id = create_product(api_request, token, 120, 3, "Product for multiple cart test")
-    first_cart = {"produtos": [{"idProduto": product_id, "quantidade": 1}]}
-
-    first_resp = api_request.post(
-        "/carrinhos",
-        headers={**JSON_HEADERS, "Authorization": token},
-        data=json.dumps(first_cart, ensure_ascii=False),
-    )
-    assert_that(first_resp.status).is_equal_to(201)
+def test_ct04_prevent_creating_more_than_one_cart_for_same_user(
+    api_request: APIRequestContext,
+    build_scenario: ScenarioBuilder,
+):
+    # The scenario's cart step already created the first cart (201).
+    setup = build_scenario(cart_scenario(120, 3, cart_quantity=1), fresh=CART_OWNER)
+    token = setup["token"]
+    first_cart = {"produtos": [{"idProduto": setup["product"], "quantidade": 1}]}
 
     second_resp = api_request.post(
         "/carrinhos",
@@ -187,16 +113,16 @@ def test_ct05_cart_not_found_by_id(api_request: APIRequestContext):
     assert_that(resp.status).is_equal_to(400)
 
     body = parse_response_body(resp)
-    assert_that(body).snapshot()
+    assert_that(body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct06_prevent_cart_creation_when_product_stock_is_insufficient(api_request: APIRequestContext):
-    token = login_with_default_payload(api_request)
-
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
-
-    product_id = create_product(api_request, token, 100, 1, "Low stock product for cart test")
+def test_ct06_prevent_cart_creation_when_product_stock_is_insufficient(
+    api_request: APIRequestContext,
+    build_scenario: ScenarioBuilder,
+):
+    setup = build_scenario(cart_scenario(100, 1))
+    token, product_id = setup["token"], setup["product"]
     cart_body = {"produtos": [{"idProduto": product_id, "quantidade": 2}]}
 
     resp = api_request.post(
@@ -211,12 +137,12 @@ def test_ct06_prevent_cart_creation_when_product_stock_is_insufficient(api_reque
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct07_prevent_cart_creation_with_duplicated_products_in_same_cart(api_request: APIRequestContext):
-    token = login_with_default_payload(api_request)
-
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
-
-    product_id = create_product(api_request, token, 150, 10, "Product created for duplicated products cart test")
+def test_ct07_prevent_cart_creation_with_duplicated_products_in_same_cart(
+    api_request: APIRequestContext,
+    build_scenario: ScenarioBuilder,
+):
+    setup = build_scenario(cart_scenario(150, 10))
+    token, product_id = setup["token"], setup["product"]
     duplicated_cart_body = {
         "produtos": [
             {"idProduto": product_id, "quantidade": 1},
@@ -236,10 +162,11 @@ def test_ct07_prevent_cart_creation_with_duplicated_products_in_same_cart(api_re
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct08_prevent_cart_creation_with_non_existing_product(api_request: APIRequestContext):
-    token = login_with_default_payload(api_request)
-
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": token})
+def test_ct08_prevent_cart_creation_with_non_existing_product(
+    api_request: APIRequestContext,
+    build_scenario: ScenarioBuilder,
+):
+    token = build_scenario(cart_scenario(150, 10), targets=["reset_cart"])["token"]
 
     invalid_cart_body = {"produtos": [{"idProduto": "AAAAAAAAAAAAAAAA", "quantidade": 1}]}
 
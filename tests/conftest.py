@@ -1,17 +1,334 @@
+import inspect
+import os
+import time
+from pathlib import Path
+from typing import Any
+
 import pytest
-from playwright.sync_api import Playwright, sync_playwright
+from dotenv import load_dotenv
+from playwright.async_api import APIRequestContext as AsyncAPIRequestContext
+from playwright.async_api import Playwright as AsyncPlaywright
+from playwright.async_api import async_playwright
+from playwright.sync_api import APIRequestContext, Playwright
 
+from tests.utils import worker_stats
 from tests.utils.api_utils import BASE_URL
+from tests.utils.async_runner import BackgroundLoop
+from tests.utils.auth_pool import AuthTokenPool, UserFactory, UserSession
+from tests.utils.cassette import active_cassette
+from tests.utils.context_pool import RequestContextPool
+from tests.utils.data_factory import DataFactory, worker_data_factory
+from tests.utils.faker_utils import current_factory
+from tests.utils.instrumentation import request_recorder
+from tests.utils.local_server import start_local_server
+from tests.utils.rate_limiter import rate_limiter
+from tests.utils.request_middleware import (
+    AsyncRequestContextProxy,
+    Middleware,
+    RequestContextProxy,
+)
+from tests.utils.resource_registry import ResourceRegistry
+from tests.utils.response_cache import response_cache
+from tests.utils.scenario import Scenario, ScenarioBuilder, ScenarioCache
+from tests.utils.startup_profile import LazyPlaywright, startup_profile
+from tests.utils.transport import TRANSPORTS, HttpRequestContext
+
+pytest_plugins = [
+    "tests.plugins.data_seed",
+    "tests.plugins.duration_scheduling",
+    "tests.plugins.http_budget",
+    "tests.plugins.rate_limit",
+    "tests.plugins.record_replay",
+    "tests.plugins.request_stats",
+    "tests.plugins.resource_preload",
+    "tests.plugins.response_cache",
+    "tests.plugins.result_sink",
+    "tests.plugins.snapshots",
+    "tests.plugins.startup_profile",
+    "tests.plugins.timing_history",
+]
+
+load_dotenv(Path(__file__).resolve().parents[1] / "user.env")
+USER_PASSWORD = os.getenv("USER_PASSWORD", "SenhaSegura@123")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--local-server",
+        action="store_true",
+        default=False,
+        help="Run the suite against an in-process ServeRest stand-in instead of BASE_URL.",
+    )
+    parser.addoption(
+        "--transport",
+        choices=TRANSPORTS,
+        default="playwright",
+        help="Backend behind api_request: the Playwright driver (default) or pooled keep-alive "
+        "http.client connections.",
+    )
+    parser.addoption(
+        "--keep-data",
+        action="store_true",
+        default=False,
+        help="Skip the session-end cleanup of the users, products and carts the suite created.",
+    )
+    parser.addoption(
+        "--cleanup-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of DELETE requests in flight during the session-end cleanup "
+        "(default 8; --transport=http only: the Playwright transport sends them one at a time "
+        "and warns when asked for more).",
+    )
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    for item in items:
+        if isinstance(item, pytest.Function) and inspect.iscoroutinefunction(item.obj):
+            item.fixturenames.append("async_loop")
+            # async_playwright_instance is a second Node driver next to the sync one; keeping
+            # async tests on one worker means only that worker starts it.
+            item.add_marker(pytest.mark.xdist_group("async_playwright"))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    test_args = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    pyfuncitem.funcargs["async_loop"].run(pyfuncitem.obj(**test_args))
+    return True
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error) -> None:
+    worker_stats.collect_worker_output(node.config, getattr(node, "workeroutput", {}))
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    cleanups = worker_stats.collected(config, "cleanup")
+    if cleanups:
+        removed = {kind: sum(report[kind] for report in cleanups) for kind in ("carts", "products", "users")}
+        failures = [failure for report in cleanups for failure in report["failures"]]
+        terminalreporter.write_sep("-", "session cleanup")
+        terminalreporter.write_line(
+            f"removed carts: {removed['carts']}  products: {removed['products']}  users: {removed['users']}  "
+            f"already gone: {sum(report['already_gone'] for report in cleanups)}  failed: {len(failures)}  "
+            f"slowest worker: {max(report['duration'] for report in cleanups):.2f} s"
+        )
+        for failure in failures:
+            terminalreporter.write_line(f"  {failure}")
+    scenarios = worker_stats.collected(config, "scenario")
+    if scenarios:
+        totals = {key: sum(stats[key] for stats in scenarios) for key in scenarios[0]}
+        terminalreporter.write_sep("-", "scenario setup")
+        terminalreporter.write_line(
+            f"steps sent: {totals['sent']} in {totals['rounds']} rounds  reused: {totals['reused']}  "
+            f"skipped: {totals['skipped']}"
+        )
+    auth_stats = worker_stats.collected(config, "auth_pool")
+    if auth_stats:
+        totals = {key: sum(stats[key] for stats in auth_stats) for key in auth_stats[0]}
+        terminalreporter.write_sep("-", "auth token pool")
+        terminalreporter.write_line(
+            f"workers: {len(auth_stats)}  signups: {totals['signups']}  logins: {totals['logins']}  "
+            f"tokens reused: {totals['hits']}  invalidated on 401: {totals['invalidated']}"
+        )
+    pool_stats = worker_stats.collected(config, "context_pool")
+    if pool_stats:
+        totals = {key: sum(stats[key] for stats in pool_stats) for key in pool_stats[0]}
+        create_max = max(stats["create_time_max"] for stats in pool_stats)
+        terminalreporter.write_sep("-", "request context pool")
+        terminalreporter.write_line(
+            f"workers: {len(pool_stats)}  contexts created: {totals['contexts_created']}  "
+            f"leases: {totals['leases']}  contexts reused: {totals['contexts_reused']}  "
+            f"recycled: {totals['recycled']}"
+        )
+        terminalreporter.write_line(
+            f"context creation: total {totals['create_time_total'] * 1000:.1f} ms, max {create_max * 1000:.1f} ms"
+        )
+
+
+@pytest.fixture(scope="session")
+def api_base_url(pytestconfig: pytest.Config) -> str:
+    if not pytestconfig.getoption("local_server"):
+        yield BASE_URL
+        return
+    server = start_local_server()
+    yield server.base_url
+    server.stop()
 
 
 @pytest.fixture(scope="session")
-def playwright_instance() -> Playwright:
-    with sync_playwright() as playwright:
-        yield playwright
+def playwright_driver(pytestconfig: pytest.Config) -> LazyPlaywright:
+    driver = LazyPlaywright(startup_profile(pytestconfig))
+    yield driver
+    driver.stop()
+
+
+@pytest.fixture(scope="session")
+def playwright_instance(playwright_driver: LazyPlaywright) -> Playwright:
+    return playwright_driver.get()
+
+
+@pytest.fixture(scope="session")
+def request_context_pool(pytestconfig: pytest.Config, playwright_driver: LazyPlaywright, api_base_url: str):
+    profile = startup_profile(pytestconfig)
+    transport = pytestconfig.getoption("transport")
+
+    def new_context() -> APIRequestContext | HttpRequestContext:
+        if transport == "http":
+            with profile.timed("first_context"):
+                return HttpRequestContext(api_base_url)
+        playwright = playwright_driver.get()
+        with profile.timed("first_context"):
+            return playwright.request.new_context(base_url=api_base_url)
+
+    pool = RequestContextPool(new_context, thread_safe=transport == "http")
+    yield pool
+    pool.close()
+    worker_stats.publish(pytestconfig, "context_pool", pool.stats.as_dict())
+
+
+@pytest.fixture(scope="session")
+def resource_registry(
+    pytestconfig: pytest.Config,
+    auth_pool: AuthTokenPool,
+    request_context_pool: RequestContextPool,
+) -> ResourceRegistry:
+    registry = ResourceRegistry()
+    yield registry
+    if pytestconfig.getoption("keep_data") or pytestconfig.getoption("replay") or not len(registry):
+        return
+    started = time.perf_counter()
+    with request_context_pool.lazy_lease() as request_context:
+        admin_token = auth_pool.admin_token(RequestContextProxy(request_context, [registry]))
+        report = registry.cleanup(request_context, admin_token, pytestconfig.getoption("cleanup_concurrency"))
+    worker_stats.publish(pytestconfig, "cleanup", {**report.as_dict(), "duration": time.perf_counter() - started})
+
+
+@pytest.fixture(scope="session")
+def request_middlewares(
+    pytestconfig: pytest.Config, resource_registry: ResourceRegistry, auth_pool: AuthTokenPool
+) -> list[Middleware]:
+    middlewares = [resource_registry, auth_pool]
+    cache = response_cache(pytestconfig)
+    if cache is not None:
+        # Outermost: a hit sends nothing, so it is not timed, recorded or rate limited.
+        middlewares.insert(0, cache)
+    limiter = rate_limiter(pytestconfig)
+    if limiter is not None:
+        middlewares.append(limiter)
+    # Inside the limiter: durations leave out throttle waits and backoff, and each
+    # retry is recorded as the request it is.
+    middlewares.append(request_recorder(pytestconfig))
+    cassette = active_cassette(pytestconfig)
+    if cassette is not None:
+        middlewares.append(cassette)
+    middlewares.append(startup_profile(pytestconfig).first_request)
+    return middlewares
+
+
+@pytest.fixture
+def api_request(request_context_pool: RequestContextPool, request_middlewares: list[Middleware]):
+    with request_context_pool.lazy_lease() as request_context:
+        yield RequestContextProxy(request_context, request_middlewares)
+
+
+@pytest.fixture(scope="session")
+def async_loop() -> BackgroundLoop:
+    loop = BackgroundLoop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def async_playwright_instance(pytestconfig: pytest.Config, async_loop: BackgroundLoop) -> AsyncPlaywright:
+    manager = async_playwright()
+    with startup_profile(pytestconfig).timed("async_driver_spawn"):
+        playwright = async_loop.run(manager.__aenter__())
+    yield playwright
+    async_loop.run(manager.__aexit__(None, None, None))
+
+
+@pytest.fixture
+def api_request_async(
+    pytestconfig: pytest.Config,
+    async_loop: BackgroundLoop,
+    async_playwright_instance: AsyncPlaywright,
+    api_base_url: str,
+    resource_registry: ResourceRegistry,
+    auth_pool: AuthTokenPool,
+) -> AsyncAPIRequestContext:
+    request_context = async_loop.run(async_playwright_instance.request.new_context(base_url=api_base_url))
+    middlewares = [resource_registry.track_async, auth_pool.call_async]
+    cache = response_cache(pytestconfig)
+    if cache is not None:
+        middlewares.insert(0, cache.call_async)
+    limiter = rate_limiter(pytestconfig)
+    if limiter is not None:
+        middlewares.append(limiter.call_async)
+    middlewares.append(request_recorder(pytestconfig).call_async)
+    cassette = active_cassette(pytestconfig)
+    if cassette is not None:
+        middlewares.append(cassette.call_async)
+    yield AsyncRequestContextProxy(request_context, middlewares)
+    async_loop.run(request_context.dispose())
+
+
+@pytest.fixture(scope="session")
+def auth_pool(pytestconfig: pytest.Config) -> AuthTokenPool:
+    pool = AuthTokenPool(password=USER_PASSWORD, pool_emails=worker_data_factory(pytestconfig).email)
+    yield pool
+    worker_stats.publish(pytestconfig, "auth_pool", pool.stats.as_dict())
+
+
+@pytest.fixture
+def admin_token(auth_pool: AuthTokenPool, api_request: APIRequestContext) -> str:
+    return auth_pool.admin_token(api_request)
+
+
+@pytest.fixture
+def non_admin_token(auth_pool: AuthTokenPool, api_request: APIRequestContext) -> str:
+    return auth_pool.non_admin_token(api_request)
+
+
+@pytest.fixture
+def fresh_user(auth_pool: AuthTokenPool, api_request: APIRequestContext) -> UserFactory:
+    def factory(admin: bool = True) -> UserSession:
+        return auth_pool.fresh_user(api_request, admin=admin)
+
+    return factory
+
+
+@pytest.fixture(scope="session")
+def scenario_cache(pytestconfig: pytest.Config) -> ScenarioCache:
+    cache = ScenarioCache()
+    yield cache
+    if cache.stats.rounds:
+        worker_stats.publish(pytestconfig, "scenario", cache.stats.as_dict())
+
+
+@pytest.fixture
+def build_scenario(
+    api_request: APIRequestContext,
+    scenario_cache: ScenarioCache,
+    resource_registry: ResourceRegistry,
+    auth_pool: AuthTokenPool,
+) -> ScenarioBuilder:
+    context = {
+        "password": USER_PASSWORD,
+        "has_cart": resource_registry.has_cart,
+        "admin_token": lambda: auth_pool.admin_token(api_request),
+    }
+
+    def build(scenario: Scenario, targets: list[str] | None = None, fresh: tuple[str, ...] = ()) -> dict[str, Any]:
+        return scenario.build(api_request, scenario_cache, context, targets, fresh)
+
+    return build
 
 
 @pytest.fixture
-def api_request(playwright_instance: Playwright):
-    request_context = playwright_instance.request.new_context(base_url=BASE_URL)
-    yield request_context
-    request_context.dispose()
+def data() -> DataFactory:
+    # Seeded per test by the data_seed plugin; also what random_email() & co. draw from.
+    return current_factory()
@@ -1,13 +1,17 @@
-import csv
 import json
-from pathlib import Path
+from collections.abc import Mapping
 
 import allure
 import pytest
 from assertpy import assert_that
 from playwright.sync_api import APIRequestContext
 
-from tests.utils.api_utils import JSON_HEADERS, parse_response_body, post_json
+from tests.utils.api_utils import (
+    JSON_HEADERS,
+    load_csv_resource,
+    parse_response_body,
+    post_json,
+)
 from tests.utils.faker_utils import random_email, random_product
 
 
@@ -22,16 +26,11 @@ def create_user(request: APIRequestContext, email: str, password: str, admin: bo
 
 
 def load_invalid_email_values() -> list[str]:
-    csv_path = Path(__file__).resolve().parent.parent / "resources" / "login" / "invalid-login-emails.csv"
-    with csv_path.open("r", encoding="utf-8") as csv_file:
-        reader = csv.DictReader(csv_file)
-        return [row["email"] for row in reader]
+    return [row["email"] for row in load_csv_resource("login/invalid-login-emails.csv")]
 
 
-def load_required_fields_rows() -> list[dict[str, str]]:
-    csv_path = Path(__file__).resolve().parent.parent / "resources" / "login" / "invalido-login.csv"
-    with csv_path.open("r", encoding="utf-8") as csv_file:
-        return list(csv.DictReader(csv_file))
+def load_required_fields_rows() -> list[Mapping[str, str]]:
+    return list(load_csv_resource("login/invalido-login.csv"))
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -63,26 +62,26 @@ def test_ct02_login_with_invalid_credentials(api_request: APIRequestContext):
 
     assert_that(resp.status).is_equal_to(401)
     response_body = parse_response_body(resp)
-    assert_that(response_body).snapshot()
+    assert_that(response_body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.NORMAL)
 @pytest.mark.parametrize("_row", load_required_fields_rows())
-def test_ct03_validate_required_fields_on_login(_row: dict[str, str], api_request: APIRequestContext):
+def test_ct03_validate_required_fields_on_login(_row: Mapping[str, str], api_request: APIRequestContext):
     resp1 = post_json(api_request, "/login", {"email": "", "password": "senha123"})
     assert_that(resp1.status).is_equal_to(400)
     body1 = parse_response_body(resp1)
-    assert_that(body1).snapshot()
+    assert_that(body1).matches_snapshot()
 
     resp2 = post_json(api_request, "/login", {"email": "test@email.com", "password": ""})
     assert_that(resp2.status).is_equal_to(400)
     body2 = parse_response_body(resp2)
-    assert_that(body2).snapshot()
+    assert_that(body2).matches_snapshot()
 
     resp3 = post_json(api_request, "/login", {"email": "", "password": ""})
     assert_that(resp3.status).is_equal_to(400)
     body3 = parse_response_body(resp3)
-    assert_that(body3).snapshot()
+    assert_that(body3).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -115,7 +114,7 @@ def test_ct04_login_and_use_token_in_protected_route(api_request: APIRequestCont
 
     assert_that(product_resp.status).is_equal_to(403)
     product_body = parse_response_body(product_resp)
-    assert_that(product_body).snapshot()
+    assert_that(product_body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.NORMAL)
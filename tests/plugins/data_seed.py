@@ -0,0 +1,89 @@
+import re
+
+import pytest
+
+from tests.utils import faker_utils, worker_stats
+from tests.utils.data_factory import (
+    SALT,
+    SEED,
+    DataFactory,
+    data_salt,
+    data_seed,
+    new_salt,
+    new_seed,
+    test_namespace,
+)
+
+TEST_NAMESPACES = pytest.StashKey[dict[str, str]]()
+SALT_PATTERN = re.compile(r"[0-9a-z]{4}")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--data-seed",
+        type=int,
+        default=None,
+        help="Seed for generated test data; with --data-salt, reuse the values printed by a failed run "
+        "to regenerate its data.",
+    )
+    parser.addoption(
+        "--data-salt",
+        default=None,
+        help="Salt of the unique suffixes (4 base-36 characters; random by default). Reusing a run's "
+        "salt regenerates its emails too, so it needs a target without that run's data "
+        "(--local-server, or a run whose cleanup ran).",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if worker_stats.is_worker(config):
+        config.stash[SEED] = config.workerinput["data_seed"]
+        config.stash[SALT] = config.workerinput["data_salt"]
+    else:
+        seed, salt = config.getoption("data_seed"), config.getoption("data_salt")
+        if salt is not None and not SALT_PATTERN.fullmatch(salt):
+            raise pytest.UsageError(f"--data-salt must be 4 characters from 0-9 and a-z, got {salt!r}")
+        config.stash[SEED] = new_seed() if seed is None else seed
+        config.stash[SALT] = new_salt() if salt is None else salt
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    node.workerinput["data_seed"] = data_seed(node.config)
+    node.workerinput["data_salt"] = data_salt(node.config)
+
+
+def pytest_report_header(config: pytest.Config) -> str:
+    return f"test data seed: {data_seed(config)} (run salt: {data_salt(config)})"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # Namespaces derive from the node id, not from the worker that runs the test, so
+    # a test gets the same data whatever the scheduling and when rerun on its own.
+    # Every worker collects the same items, so collisions resolve identically everywhere.
+    namespaces: dict[str, str] = {}
+    taken: set[str] = set()
+    for index, item in enumerate(items):
+        namespace = test_namespace(item.nodeid)
+        if namespace in taken:
+            namespace += f"x{index}"
+        taken.add(namespace)
+        namespaces[item.nodeid] = namespace
+    config.stash[TEST_NAMESPACES] = namespaces
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    namespace = item.config.stash[TEST_NAMESPACES][item.nodeid]
+    faker_utils.use_factory(DataFactory(data_seed(item.config), namespace, data_salt(item.config)))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    if terminalreporter.stats.get("failed") or terminalreporter.stats.get("error"):
+        reports = terminalreporter.stats.get("failed", []) + terminalreporter.stats.get("error", [])
+        failed = dict.fromkeys(report.nodeid for report in reports if report.nodeid)
+        options = f"--data-seed {data_seed(config)} --data-salt {data_salt(config)}"
+        terminalreporter.write_sep("-", "test data")
+        terminalreporter.write_line(f"generated with {options}; to regenerate the same data for the failed tests:")
+        terminalreporter.write_line(f"pytest {options} {' '.join(failed)}".rstrip())
@@ -0,0 +1,120 @@
+import time
+
+import pytest
+import xdist
+from xdist.scheduler import LoadScopeScheduling
+
+from tests.utils import worker_stats
+from tests.utils.duration_scheduler import (
+    XDIST_VERSION,
+    DurationScheduling,
+    TestHistory,
+    item_group,
+)
+from tests.utils.timing_history import TimingHistory, history_target
+from tests.utils.untimed import untimed_seconds
+
+SCHEDULER = pytest.StashKey[DurationScheduling]()
+# Shared start-up paid in the phase being run, handed to its report as shared_setup:
+# session-scoped fixture setup plus untimed work (the lazy driver and context start).
+_shared_setup = {"depth": 0, "fixtures": 0.0, "untimed": 0.0}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--test-scheduler",
+        choices=("duration", "xdist"),
+        default="xdist",
+        help="'duration' (opt-in) distributes tests longest-first using the durations of previous runs "
+        "(read from the --timing-history database) in place of the --dist scheduler; 'xdist' keeps the "
+        "scheduler selected by --dist (loadscope in pytest.ini).",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption("test_scheduler") == "duration" and not xdist.__version__.startswith(XDIST_VERSION):
+        config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                f"--test-scheduler=duration was written for pytest-xdist {XDIST_VERSION}x, found "
+                f"{xdist.__version__}; falling back to --dist=loadscope"
+            ),
+            stacklevel=2,
+        )
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config: pytest.Config, log):
+    if config.getoption("test_scheduler") != "duration":
+        return None
+    if not xdist.__version__.startswith(XDIST_VERSION):
+        return LoadScopeScheduling(config, log)
+    history = TestHistory()
+    if not config.getoption("no_timing_history"):
+        history = TestHistory.load(
+            TimingHistory(config.getoption("timing_history")), history_target(config), config.getoption("transport")
+        )
+    scheduler = DurationScheduling(config, log, history)
+    config.stash[SCHEDULER] = scheduler
+    return scheduler
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    # Workers (or a run without xdist) report which tests must stay together, so the next
+    # scheduled run can split modules whose tests share no module or class-scoped state.
+    # Read after collection_modifyitems, so xdist_group marks added there by any plugin or
+    # conftest (the async tests' group) are seen whatever the hook order.
+    config = session.config
+    if not worker_stats.is_controller(config):
+        worker_stats.publish(config, "test_groups", {item.nodeid: item_group(item) for item in session.items})
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_fixture_setup(fixturedef: pytest.FixtureDef, request: pytest.FixtureRequest):
+    # Only the outermost session fixture is timed; the ones it requests are part of it.
+    # Untimed work inside it is left to the per-phase untimed count.
+    if fixturedef.scope != "session" or _shared_setup["depth"]:
+        return (yield)
+    _shared_setup["depth"] += 1
+    started, untimed_before = time.perf_counter(), untimed_seconds()
+    try:
+        return (yield)
+    finally:
+        _shared_setup["depth"] -= 1
+        untimed = untimed_seconds() - untimed_before
+        _shared_setup["fixtures"] += time.perf_counter() - started - untimed
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo):
+    report = yield
+    untimed = untimed_seconds()
+    report.shared_setup = _shared_setup["fixtures"] + untimed - _shared_setup["untimed"]
+    _shared_setup["fixtures"], _shared_setup["untimed"] = 0.0, untimed
+    return report
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    # Durations are stored by the timing_history plugin; only the groups are kept here.
+    if worker_stats.is_worker(config) or config.getoption("no_timing_history"):
+        return
+    groups: dict[str, str | None] = {}
+    for payload in worker_stats.collected(config, "test_groups"):
+        groups.update(payload)
+    if groups:
+        TimingHistory(config.getoption("timing_history")).save_test_groups(groups)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    scheduler = config.stash.get(SCHEDULER, None)
+    if scheduler is None or not scheduler.busy:
+        return
+    busy = scheduler.busy
+    terminalreporter.write_sep("-", "duration scheduler")
+    terminalreporter.write_line(
+        "busy per worker: " + "  ".join(f"{worker}: {seconds:.2f} s" for worker, seconds in sorted(busy.items()))
+    )
+    terminalreporter.write_line(
+        f"longest worker: {max(busy.values()):.2f} s  ideal: {sum(busy.values()) / len(busy):.2f} s  "
+        f"stolen units: {scheduler.stolen_units}"
+    )
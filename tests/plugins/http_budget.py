@@ -0,0 +1,74 @@
+import pytest
+
+from tests.utils.http_budget import (
+    ACTIONS,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_REQUESTS,
+    HttpBudget,
+    HttpBudgetWarning,
+    budget_report,
+)
+from tests.utils.instrumentation import request_recorder
+
+DEFAULT_BUDGET = pytest.StashKey[HttpBudget]()
+
+
+def _limit(value: str) -> int | None:
+    # "0" or "none" disables a limit.
+    return None if value.lower() in ("0", "none") else int(value)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("http budget")
+    group.addoption(
+        "--http-budget-requests",
+        type=_limit,
+        default=DEFAULT_MAX_REQUESTS,
+        help="Default maximum HTTP requests per test in setup and call, warned about but never "
+        "failed (0 or 'none' disables).",
+    )
+    group.addoption(
+        "--http-budget-bytes",
+        type=_limit,
+        default=DEFAULT_MAX_BYTES,
+        help="Default maximum request + response bytes per test, warned about but never failed "
+        "(0 or 'none' disables).",
+    )
+    group.addoption(
+        "--http-budget-action",
+        choices=ACTIONS,
+        default="fail",
+        help="What a test over a limit set by its http_budget marker does: fail, warn, or nothing "
+        "(off). Tests over the global default only warn.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "http_budget(max_requests=None, max_bytes=None): HTTP request budget of a test, enforced "
+        "per --http-budget-action and overriding --http-budget-requests/--http-budget-bytes.",
+    )
+    config.stash[DEFAULT_BUDGET] = HttpBudget(
+        config.getoption("http_budget_requests"), config.getoption("http_budget_bytes")
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo):
+    report = yield
+    action = item.config.getoption("http_budget_action")
+    if report.when != "call" or not report.passed or action == "off":
+        return report
+    # Setup requests count too: that is where helpers and fixtures add round trips.
+    records = request_recorder(item.config).records_for(item.nodeid)
+    if action == "fail":
+        violations = HttpBudget.declared(item).violations(records)
+        if violations:
+            report.outcome = "failed"
+            report.longrepr = budget_report(item.nodeid, violations, records)
+            return report
+    violations = HttpBudget.for_item(item, item.config.stash[DEFAULT_BUDGET]).violations(records)
+    if violations:
+        item.warn(HttpBudgetWarning(budget_report(item.nodeid, violations, records)))
+    return report
@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.rate_limiter import (
+    DEFAULT_RATE,
+    LIMITER,
+    RETRIES,
+    RateLimiter,
+    SharedTokenBucket,
+    rate_limiter,
+)
+
+STATE_DIR = pytest.StashKey[Path]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help=f"Requests per second allowed across all workers, e.g. {DEFAULT_RATE:g}; shrinks on 429/503 and "
+        "grows back to this value. Off (0) by default: each request costs two rounds on a shared file lock.",
+    )
+    parser.addoption(
+        "--rate-limit-retries",
+        type=int,
+        default=RETRIES,
+        help="Retries for idempotent requests answered with 429 or 5xx.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    ceiling = config.getoption("rate_limit")
+    # A replayed run answers from the cassette and sends nothing to throttle.
+    if ceiling <= 0 or config.getoption("replay"):
+        return
+    if worker_stats.is_worker(config):
+        state_path = Path(config.workerinput["rate_limit_state"])
+    else:
+        config.stash[STATE_DIR] = Path(tempfile.mkdtemp(prefix="serverest-rate-limit-"))
+        state_path = config.stash[STATE_DIR] / "bucket"
+    bucket = SharedTokenBucket(state_path, ceiling)
+    config.stash[LIMITER] = RateLimiter(bucket, retries=config.getoption("rate_limit_retries"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    if STATE_DIR in node.config.stash:
+        node.workerinput["rate_limit_state"] = str(node.config.stash[STATE_DIR] / "bucket")
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    limiter = rate_limiter(session.config)
+    if limiter is not None and limiter.stats.requests:
+        state = limiter.bucket.snapshot()
+        worker_stats.publish(session.config, "rate_limit", {**limiter.stats.as_dict(), "rate": state.rate})
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    limiter = rate_limiter(config)
+    if limiter is not None:
+        limiter.bucket.close()
+    if STATE_DIR in config.stash:
+        shutil.rmtree(config.stash[STATE_DIR], ignore_errors=True)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    stats = worker_stats.collected(config, "rate_limit")
+    if not stats:
+        return
+    total = {key: sum(payload[key] for payload in stats) for key in ("requests", "retries", "throttled", "waited")}
+    terminalreporter.write_sep("-", "rate limit")
+    terminalreporter.write_line(
+        f"requests: {total['requests']}  waited: {total['waited']:.2f} s  throttled: {total['throttled']}  "
+        f"retries: {total['retries']}  final rate: {min(payload['rate'] for payload in stats):.1f} req/s "
+        f"(ceiling {config.getoption('rate_limit'):.1f})"
+    )
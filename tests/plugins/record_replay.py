@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.cassette import (
+    CASSETTE,
+    CASSETTE_PATH,
+    SESSION,
+    Cassette,
+    active_cassette,
+    load_cassette,
+    write_cassette,
+)
+from tests.utils.data_factory import data_salt, data_seed
+
+WRITTEN = pytest.StashKey[int]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("cassette")
+    group.addoption(
+        "--record",
+        action="store_true",
+        default=False,
+        help="Record every request made through api_request/api_request_async into the cassette.",
+    )
+    group.addoption(
+        "--replay",
+        action="store_true",
+        default=False,
+        help="Answer api_request/api_request_async from the cassette without touching the network.",
+    )
+    group.addoption(
+        "--cassette",
+        type=Path,
+        default=CASSETTE_PATH,
+        help="Cassette file used by --record/--replay (default: cassettes/suite.jsonl).",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    record, replay = config.getoption("record"), config.getoption("replay")
+    if record and replay:
+        raise pytest.UsageError("--record and --replay are mutually exclusive")
+    if record:
+        config.stash[CASSETTE] = Cassette("record", scope=worker_stats.worker_id(config))
+    elif replay:
+        header, interactions = load_cassette(config.getoption("cassette"))
+        # Same seed and salt as the recording, so per-test generated data matches request
+        # for request, and the values in the recorded responses match it.
+        if config.getoption("data_seed") is None:
+            config.option.data_seed = header["seed"]
+        if config.getoption("data_salt") is None:
+            config.option.data_salt = header["salt"]
+        config.stash[CASSETTE] = Cassette("replay", interactions)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    cassette = active_cassette(item.config)
+    if cassette is not None:
+        cassette.test = item.nodeid
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    cassette = active_cassette(config)
+    if cassette is None:
+        return
+    cassette.test = SESSION
+    worker_stats.publish(config, "cassette", {**cassette.stats(), "interactions": cassette.recorded})
+    if worker_stats.is_worker(config) or cassette.mode != "record":
+        return
+    recordings = [payload["interactions"] for payload in worker_stats.collected(config, "cassette")]
+    path, seed, salt = config.getoption("cassette"), data_seed(config), data_salt(config)
+    config.stash[WRITTEN] = write_cassette(path, seed, salt, recordings)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    cassette = active_cassette(config)
+    if cassette is None:
+        return
+    path = config.getoption("cassette")
+    if cassette.mode == "record":
+        terminalreporter.write_sep("-", f"cassette: {config.stash.get(WRITTEN, 0)} interactions recorded to {path}")
+        return
+    stats = worker_stats.collected(config, "cassette")
+    misses = [miss for payload in stats for miss in payload["misses"]]
+    terminalreporter.write_sep(
+        "-",
+        f"cassette: {sum(payload['replayed'] for payload in stats)} responses replayed from {path} "
+        f"({sum(payload['fallbacks'] for payload in stats)} matched outside their test, {len(misses)} missing)",
+    )
+    for miss in misses:
+        terminalreporter.write_line(f"missing  {miss}")
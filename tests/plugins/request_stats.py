@@ -0,0 +1,97 @@
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import allure
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.instrumentation import (
+    endpoint_summary,
+    merge_exports,
+    per_test_summary,
+    request_recorder,
+)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--request-stats-tests",
+        type=int,
+        default=15,
+        help="Number of slowest tests listed in the setup/call request breakdown (0 hides it).",
+    )
+
+
+@contextmanager
+def _timed_phase(item: pytest.Item, phase: str) -> Iterator[None]:
+    recorder = request_recorder(item.config)
+    recorder.begin(item.nodeid, phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.end(time.perf_counter() - started)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_setup(item: pytest.Item):
+    with _timed_phase(item, "setup"):
+        return (yield)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item):
+    try:
+        with _timed_phase(item, "call"):
+            return (yield)
+    finally:
+        records = request_recorder(item.config).records_for(item.nodeid)
+        if records:
+            allure.attach(
+                json.dumps([record.__dict__ for record in records], indent=2),
+                name="HTTP requests",
+                attachment_type=allure.attachment_type.JSON,
+            )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_teardown(item: pytest.Item):
+    with _timed_phase(item, "teardown"):
+        return (yield)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    worker_stats.publish(session.config, "requests", request_recorder(session.config).export())
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    exports = worker_stats.collected(config, "requests")
+    records, tests = merge_exports(exports)
+    if not records:
+        return
+
+    workers = sum(1 for export in exports if export["records"])
+    terminalreporter.write_sep("-", f"HTTP requests per endpoint ({len(records)} requests, {workers} workers)")
+    terminalreporter.write_line(
+        f"{'method':<7}{'endpoint':<36}{'count':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'total s':>9}"
+        f"{'KB out':>9}{'KB in':>9}"
+    )
+    for row in endpoint_summary(records):
+        terminalreporter.write_line(
+            f"{row['method']:<7}{row['endpoint']:<36}{row['count']:>6}{row['p50'] * 1000:>9.1f}"
+            f"{row['p95'] * 1000:>9.1f}{row['p99'] * 1000:>9.1f}{row['total']:>9.2f}"
+            f"{row['bytes_sent'] / 1024:>9.1f}{row['bytes_received'] / 1024:>9.1f}"
+        )
+
+    limit = config.getoption("request_stats_tests")
+    if limit <= 0:
+        return
+    terminalreporter.write_sep("-", f"setup vs call time, {limit} slowest tests")
+    terminalreporter.write_line(f"{'setup s':>8}{'(http)':>9}{'call s':>8}{'(http)':>9}  test")
+    for row in per_test_summary(records, tests)[:limit]:
+        terminalreporter.write_line(
+            f"{row['setup']:>8.3f}{row['setup_request_time']:>6.3f}/{row['setup_requests']:<2}"
+            f"{row['call']:>8.3f}{row['call_request_time']:>6.3f}/{row['call_requests']:<2}  {row['test']}"
+        )
@@ -0,0 +1,18 @@
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.api_utils import RESOURCE_CACHE
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if worker_stats.is_worker(config) and "resources" in config.workerinput:
+        RESOURCE_CACHE.restore(config.workerinput["resources"])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    # Parse tests/resources once on the controller and ship it with the worker's
+    # startup input instead of having every worker read and parse the same files.
+    if not RESOURCE_CACHE.entries:
+        RESOURCE_CACHE.preload()
+    node.workerinput["resources"] = RESOURCE_CACHE.export()
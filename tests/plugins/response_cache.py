@@ -0,0 +1,61 @@
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.response_cache import (
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_TTL,
+    RESPONSE_CACHE,
+    ResponseCache,
+    response_cache,
+)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--response-cache",
+        action="store_true",
+        default=False,
+        help="Cache successful GET responses per worker; writes to a collection invalidate its entries.",
+    )
+    parser.addoption(
+        "--response-cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help="Seconds a cached GET response stays valid.",
+    )
+    parser.addoption(
+        "--response-cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum cached responses per worker (least recently used are evicted first).",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption("response_cache") and config.getoption("record"):
+        # A hit never reaches the cassette, so the recording would miss those requests.
+        raise pytest.UsageError("--response-cache cannot be combined with --record")
+    if config.getoption("response_cache"):
+        config.stash[RESPONSE_CACHE] = ResponseCache(
+            ttl=config.getoption("response_cache_ttl"), max_entries=config.getoption("response_cache_size")
+        )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    cache = response_cache(session.config)
+    if cache is not None:
+        worker_stats.publish(session.config, "response_cache", cache.stats.as_dict())
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    stats = worker_stats.collected(config, "response_cache")
+    if not stats:
+        return
+    total = {key: sum(payload[key] for payload in stats) for key in stats[0]}
+    lookups = total["hits"] + total["misses"]
+    hit_rate = total["hits"] / lookups if lookups else 0.0
+    terminalreporter.write_sep("-", "response cache")
+    terminalreporter.write_line(
+        f"hits: {total['hits']}  misses: {total['misses']}  hit rate: {hit_rate:.0%}  "
+        f"invalidated: {total['invalidated']}  expired: {total['expired']}  evicted: {total['evicted']}"
+    )
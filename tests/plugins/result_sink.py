@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.instrumentation import request_recorder
+from tests.utils.result_sink import (
+    DEFAULT_BATCH_SIZE,
+    FAILED_STATUS,
+    RESULT_SINK,
+    ResultSink,
+    allure_labels,
+    new_run_id,
+    request_stats,
+    result_sink,
+)
+from tests.utils.snapshot_store import snapshot_store
+
+RUN_ID = pytest.StashKey[str]()
+# nodeid -> result line being built, from the setup report to the teardown report.
+_pending: dict[str, dict] = {}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("results sink")
+    group.addoption(
+        "--results-sink",
+        default=None,
+        help="Append one JSON line per test to this file instead of writing allure-results "
+        "(convert later with python -m tests.utils.result_sink).",
+    )
+    group.addoption(
+        "--results-sink-batch",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Result lines each worker buffers before appending them to the sink.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    path = config.getoption("results_sink")
+    if path is None:
+        return
+    # tryfirst: runs before allure-pytest's pytest_configure, which then neither cleans
+    # nor writes the allure-results directory.
+    config.option.allure_report_dir = None
+    config.stash[RUN_ID] = config.workerinput["results_run"] if worker_stats.is_worker(config) else new_run_id()
+    if not worker_stats.is_controller(config):
+        config.stash[RESULT_SINK] = ResultSink(Path(path), config.getoption("results_sink_batch"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    if RUN_ID in node.config.stash:
+        node.workerinput["results_run"] = node.config.stash[RUN_ID]
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo):
+    report = yield
+    config = item.config
+    sink = result_sink(config)
+    if sink is None:
+        return report
+    result = _pending.get(item.nodeid)
+    if result is None:
+        result = _pending[item.nodeid] = _new_result(item, config, report.start)
+    result["durations"][report.when] = round(report.duration, 6)
+    result["stop"] = report.stop
+    if report.failed and result["outcome"] == "passed":
+        result["outcome"] = FAILED_STATUS[report.when]
+        crash = getattr(report.longrepr, "reprcrash", None)
+        result["message"] = crash.message if crash is not None else report.longreprtext.partition("\n")[0]
+        result["trace"] = report.longreprtext
+    elif report.skipped and result["outcome"] == "passed":
+        result["outcome"] = "skipped"
+        result["message"] = getattr(report, "wasxfail", "") or (
+            report.longrepr[2] if isinstance(report.longrepr, tuple) else str(report.longrepr)
+        )
+    if report.when == "teardown":
+        del _pending[item.nodeid]
+        result["requests"] = request_stats(request_recorder(config).records_for(item.nodeid))
+        store = snapshot_store(config)
+        result["snapshot_diffs"] = store.diffs.get(item.nodeid, []) if store is not None else []
+        sink.add(result)
+    return report
+
+
+def _new_result(item: pytest.Item, config: pytest.Config, start: float) -> dict:
+    callspec = getattr(item, "callspec", None)
+    return {
+        "run": config.stash[RUN_ID],
+        "nodeid": item.nodeid,
+        "worker": worker_stats.worker_id(config),
+        "outcome": "passed",
+        "start": start,
+        "stop": start,
+        "durations": {},
+        "message": "",
+        "trace": "",
+        "labels": allure_labels(item),
+        "params": {key: repr(value) for key, value in callspec.params.items()} if callspec else {},
+    }
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    sink = result_sink(session.config)
+    if sink is not None:
+        sink.flush()
+        worker_stats.publish(session.config, "results_sink", sink.written)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    written = worker_stats.collected(config, "results_sink")
+    if not written:
+        return
+    terminalreporter.write_sep("-", "results sink")
+    terminalreporter.write_line(
+        f"{sum(written)} results (run {config.stash[RUN_ID]}) appended to {config.getoption('results_sink')}; "
+        "convert with python -m tests.utils.result_sink"
+    )
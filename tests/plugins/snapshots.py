@@ -0,0 +1,112 @@
+import pytest
+from assertpy import add_extension
+
+from tests.utils import worker_stats
+from tests.utils.snapshot_store import (
+    SNAPSHOT_DIR,
+    SNAPSHOT_STORE,
+    SnapshotStore,
+    merge_exports,
+    split_nodeid,
+)
+
+REPORT = pytest.StashKey[dict[str, dict[str, list[str]]]]()
+_active_store: SnapshotStore | None = None
+
+
+def matches_snapshot(self):
+    if _active_store is None:
+        self.error("matches_snapshot() requires the tests.plugins.snapshots plugin")
+    message = _active_store.check(self.val)
+    if message:
+        self.error(message)
+    return self
+
+
+add_extension(matches_snapshot)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("snapshots")
+    group.addoption(
+        "--snapshot-update",
+        action="store_true",
+        default=False,
+        help="Rewrite mismatching snapshots and prune stale entries instead of failing.",
+    )
+    group.addoption(
+        "--snapshot-check",
+        action="store_true",
+        default=False,
+        help="Fail on missing snapshots and never write snapshot files (CI mode).",
+    )
+
+
+def _mode(config: pytest.Config) -> str:
+    if config.getoption("snapshot_update") and config.getoption("snapshot_check"):
+        raise pytest.UsageError("--snapshot-update and --snapshot-check are mutually exclusive")
+    if config.getoption("snapshot_update"):
+        return "update"
+    if config.getoption("snapshot_check"):
+        return "check"
+    return "record"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    global _active_store
+    config.stash[SNAPSHOT_STORE] = _active_store = SnapshotStore(SNAPSHOT_DIR, _mode(config))
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    global _active_store
+    _active_store = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # Runs before -k/-m deselection so deselected tests do not look deleted.
+    partial = {split_nodeid(arg)[0] for arg in config.args if "::" in arg}
+    config.stash[SNAPSHOT_STORE].collect([item.nodeid for item in items], partial)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    item.config.stash[SNAPSHOT_STORE].begin_test(item.nodeid)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo):
+    report = yield
+    if report.when == "call":
+        item.config.stash[SNAPSHOT_STORE].end_test(item.nodeid, report.passed)
+    return report
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    store = config.stash[SNAPSHOT_STORE]
+    worker_stats.publish(config, "snapshots", store.export())
+    if worker_stats.is_worker(config):
+        return
+    report = merge_exports(store.directory, worker_stats.collected(config, "snapshots"), store.mode)
+    config.stash[REPORT] = report
+    if store.mode == "check" and any(entry["stale"] for entry in report.values()):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    report = config.stash.get(REPORT, {})
+    if not report:
+        return
+    created = sum(len(entry["created"]) for entry in report.values())
+    updated = sum(len(entry["updated"]) for entry in report.values())
+    stale = sum(len(entry["stale"]) for entry in report.values())
+    pruned = config.stash[SNAPSHOT_STORE].mode == "update"
+    terminalreporter.write_sep(
+        "-", f"snapshots: {created} created, {updated} updated, {stale} stale{' (pruned)' if pruned else ''}"
+    )
+    for filename, entry in report.items():
+        for key in entry["stale"]:
+            terminalreporter.write_line(f"stale  {filename}: {key}")
+    if stale and not pruned:
+        terminalreporter.write_line("run with --snapshot-update to prune stale entries")
@@ -0,0 +1,41 @@
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.startup_profile import PHASES, process_uptime, startup_profile
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--startup-profile",
+        action="store_true",
+        default=False,
+        help="Report, per worker, the time spent on imports, driver spawn, async driver spawn, first context "
+        "and first request.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    # Wall-clock time since the process started: interpreter start-up plus importing
+    # pytest, its plugins and this suite (Playwright included).
+    startup_profile(config).record("imports", process_uptime())
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    if config.getoption("startup_profile") and not worker_stats.is_controller(config):
+        phases = startup_profile(config).phases
+        worker_stats.publish(config, "startup", {"worker": worker_stats.worker_id(config), **phases})
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    profiles = sorted(worker_stats.collected(config, "startup"), key=lambda profile: profile["worker"])
+    if not profiles:
+        return
+    terminalreporter.write_sep("-", "startup profile")
+    header = "".join(f"{label:>15}" for label in PHASES.values())
+    terminalreporter.write_line(f"{'worker':<8}{header}{'total':>10}")
+    for profile in profiles:
+        cells = [f"{profile[phase]:>13.3f} s" if phase in profile else f"{'-':>15}" for phase in PHASES]
+        total = sum(profile.get(phase, 0.0) for phase in PHASES)
+        terminalreporter.write_line(f"{profile['worker']:<8}" + "".join(cells) + f"{total:>8.3f} s")
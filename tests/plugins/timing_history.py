@@ -0,0 +1,166 @@
+import pytest
+
+from tests.utils import worker_stats
+from tests.utils.duration_scheduler import own_duration
+from tests.utils.instrumentation import endpoint_summary, merge_exports
+from tests.utils.timing_history import (
+    DEFAULT_BASELINE_RUNS,
+    DEFAULT_MIN_PASS_RATIO,
+    DEFAULT_THRESHOLD,
+    HISTORY_FILE,
+    Regression,
+    TimingHistory,
+    answered,
+    git_commit,
+    history_target,
+    pass_ratio,
+    regressions,
+)
+
+REPORT = pytest.StashKey[dict]()
+OUTCOMES = pytest.StashKey["RunOutcomes"]()
+
+
+class RunOutcomes:
+    # nodeid -> [outcome, seconds]; on the controller this sees the reports of every worker.
+    # Registered as a plugin of its own so the logreport hook can reach the run's state.
+    def __init__(self):
+        self.tests: dict[str, list] = {}
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        entry = self.tests.setdefault(report.nodeid, ["passed", 0.0])
+        if report.failed:
+            entry[0] = "failed"
+        elif report.skipped and entry[0] == "passed":
+            entry[0] = "skipped"
+        # Shared start-up is left out (measured by the duration_scheduling plugin); the test
+        # that pays for it depends on the schedule, not on its own code.
+        entry[1] += own_duration(report)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("timing history")
+    group.addoption(
+        "--timing-history",
+        default=str(HISTORY_FILE),
+        help="SQLite file the test and endpoint timings of every run are appended to.",
+    )
+    group.addoption(
+        "--no-timing-history",
+        action="store_true",
+        default=False,
+        help="Neither record this run's timings nor compare them with the history.",
+    )
+    group.addoption(
+        "--timing-baseline-runs",
+        type=int,
+        default=DEFAULT_BASELINE_RUNS,
+        help="Number of previous runs (same target and transport) the baseline median is taken over.",
+    )
+    group.addoption(
+        "--timing-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Report tests and endpoints slower than their baseline by more than this percentage.",
+    )
+    group.addoption(
+        "--timing-fail-threshold",
+        type=float,
+        default=None,
+        help="Fail the run when a test or endpoint is slower than its baseline by more than this percentage.",
+    )
+    group.addoption(
+        "--timing-min-pass-ratio",
+        type=float,
+        default=DEFAULT_MIN_PASS_RATIO,
+        help="Only store a run in the history when at least this share of its tests passed.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[OUTCOMES] = outcomes = RunOutcomes()
+    config.pluginmanager.register(outcomes, "timing_history_outcomes")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    # trylast: without xdist, request_stats publishes the request records in its own
+    # sessionfinish, which has to run first.
+    config = session.config
+    tests = config.stash[OUTCOMES].tests
+    if worker_stats.is_worker(config) or config.getoption("no_timing_history") or not tests:
+        return
+    records, _ = merge_exports(worker_stats.collected(config, "requests"))
+    # Failed requests (transport errors, 5xx, throttling) say nothing about the endpoint.
+    endpoints = endpoint_summary([record for record in records if answered(record)])
+    history = TimingHistory(config.getoption("timing_history"))
+    target, transport = history_target(config), config.getoption("transport")
+    ratio = pass_ratio(outcome for outcome, _ in tests.values())
+    stored = (
+        session.exitstatus in (pytest.ExitCode.OK, pytest.ExitCode.TESTS_FAILED)
+        and ratio >= config.getoption("timing_min_pass_ratio")
+    )
+    run_id = None
+    if stored:
+        run_id = history.record(
+            git_commit(config.rootpath),
+            target,
+            transport,
+            {nodeid: tuple(entry) for nodeid, entry in tests.items()},
+            endpoints,
+        )
+    baseline = history.baseline(target, transport, config.getoption("timing_baseline_runs"), before=run_id)
+    threshold = config.getoption("timing_threshold")
+    fail_threshold = config.getoption("timing_fail_threshold")
+    if fail_threshold is not None:
+        threshold = min(threshold, fail_threshold)
+    passed = {nodeid: duration for nodeid, (outcome, duration) in tests.items() if outcome == "passed"}
+    p50s = {f"{row['method']} {row['endpoint']}": row["p50"] for row in endpoints}
+    found = regressions("test", passed, baseline["tests"], threshold)
+    found += regressions("endpoint", p50s, baseline["endpoints"], threshold)
+    config.stash[REPORT] = {
+        "target": target,
+        "transport": transport,
+        "baseline": baseline,
+        "regressions": found,
+        "stored": stored,
+        "pass_ratio": ratio,
+    }
+    failing = fail_threshold is not None and any(regression.change > fail_threshold for regression in found)
+    if failing and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    report = config.stash.get(REPORT, None)
+    if report is None:
+        return
+    baseline = report["baseline"]
+    found: list[Regression] = report["regressions"]
+    terminalreporter.write_sep("-", f"timing history ({report['target']}, {report['transport']})")
+    if not report["stored"]:
+        terminalreporter.write_line(
+            f"not recorded: {report['pass_ratio']:.0%} of the tests passed "
+            f"(needs {config.getoption('timing_min_pass_ratio'):.0%} and a run that completed)"
+        )
+    if not baseline["tests"] and not baseline["endpoints"]:
+        if report["stored"]:
+            terminalreporter.write_line("no previous runs for this target yet; recorded as the first baseline")
+        return
+    if not found:
+        terminalreporter.write_line(
+            f"no regressions: {len(baseline['tests'])} tests and {len(baseline['endpoints'])} endpoints "
+            "within threshold of their baseline"
+        )
+        return
+    fail_threshold = config.getoption("timing_fail_threshold")
+    terminalreporter.write_line(f"{'kind':<9}{'baseline ms':>12}{'now ms':>10}{'slower':>9}{'runs':>6}  name")
+    for regression in found:
+        failed = fail_threshold is not None and regression.change > fail_threshold
+        terminalreporter.write_line(
+            f"{regression.kind:<9}{regression.baseline * 1000:>12.1f}{regression.current * 1000:>10.1f}"
+            f"{regression.change:>8.0f}%{regression.runs:>6}  {regression.name}",
+            red=failed,
+        )
+    if fail_threshold is not None and any(regression.change > fail_threshold for regression in found):
+        terminalreporter.write_line(f"failing: slower than baseline by more than {fail_threshold:g}%", red=True)
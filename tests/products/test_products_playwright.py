@@ -1,32 +1,21 @@
 import json
-import time
-import uuid
 
 import allure
 import pytest
 from assertpy import assert_that
 from playwright.sync_api import APIRequestContext
 
-from tests.utils.api_utils import JSON_HEADERS, load_json_resource, parse_response_body, post_json, put_json
-
-
-def get_admin_token(request: APIRequestContext) -> str:
-    email = f"admin.{uuid.uuid4()}@example.com"
-    password = "SenhaSegura@123"
-
-    user_payload = {
-        "nome": "Admin User",
-        "email": email,
-        "password": password,
-        "administrador": "true",
-    }
-
-    post_json(request, "/usuarios", user_payload)
-    login_resp = post_json(request, "/login", {"email": email, "password": password})
-    assert_that(login_resp.status).is_equal_to(200)
-
-    login_body = parse_response_body(login_resp)
-    return login_body["authorization"]
+from tests.utils.api_utils import (
+    JSON_HEADERS,
+    load_json_resource,
+    parse_response_body,
+    post_json,
+    put_json,
+    stream_items,
+)
+from tests.utils.auth_pool import UserFactory
+from tests.utils.faker_utils import random_product
+from tests.utils.schemas import PRODUTO, validate_many
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -38,21 +27,15 @@ def test_ct01_list_all_products_and_validate_json_structure(api_request: APIRequ
     quantidade = body["quantidade"]
     produtos = body["produtos"]
 
-    assert_that(quantidade).is_greater_than_or_equal_to(0)
+    assert_that(quantidade).is_equal_to(len(produtos))
     assert_that(produtos).is_not_none()
 
-    for product in produtos:
-        assert_that(product).contains_key("nome")
-        assert_that(product).contains_key("preco")
-        assert_that(product).contains_key("descricao")
-        assert_that(product).contains_key("quantidade")
-        assert_that(product).contains_key("_id")
+    assert_that(validate_many(PRODUTO, produtos)).is_empty()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct02_create_new_product_as_administrator(api_request: APIRequestContext):
-    token = get_admin_token(api_request)
-    product_name = f"Product {int(time.time() * 1000)}"
+def test_ct02_create_new_product_as_administrator(api_request: APIRequestContext, admin_token: str):
+    product_name = random_product()
     product_payload = {
         "nome": product_name,
         "preco": 250,
@@ -62,7 +45,7 @@ def test_ct02_create_new_product_as_administrator(api_request: APIRequestContext
 
     create_resp = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(product_payload, ensure_ascii=False),
     )
 
@@ -84,9 +67,8 @@ def test_ct02_create_new_product_as_administrator(api_request: APIRequestContext
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct03_validate_error_on_duplicate_product_name(api_request: APIRequestContext):
-    token = get_admin_token(api_request)
-    name = f"Duplicate Product Test {int(time.time() * 1000)}"
+def test_ct03_validate_error_on_duplicate_product_name(api_request: APIRequestContext, admin_token: str):
+    name = random_product()
 
     product_payload = {
         "nome": name,
@@ -97,20 +79,20 @@ def test_ct03_validate_error_on_duplicate_product_name(api_request: APIRequestCo
 
     first = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(product_payload, ensure_ascii=False),
     )
     assert_that(first.status).is_equal_to(201)
 
     second = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(product_payload, ensure_ascii=False),
     )
     assert_that(second.status).is_equal_to(400)
 
     second_body = parse_response_body(second)
-    assert_that(second_body).snapshot()
+    assert_that(second_body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.NORMAL)
@@ -129,9 +111,8 @@ def test_ct04_search_for_products_with_filters(api_request: APIRequestContext):
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct05_update_existing_product(api_request: APIRequestContext):
-    token = get_admin_token(api_request)
-    product_name = f"Product {int(time.time() * 1000)}"
+def test_ct05_update_existing_product(api_request: APIRequestContext, admin_token: str):
+    product_name = random_product()
 
     initial_product = {
         "nome": product_name,
@@ -142,7 +123,7 @@ def test_ct05_update_existing_product(api_request: APIRequestContext):
 
     create_resp = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(initial_product, ensure_ascii=False),
     )
     assert_that(create_resp.status).is_equal_to(201)
@@ -161,7 +142,7 @@ def test_ct05_update_existing_product(api_request: APIRequestContext):
         api_request,
         f"/produtos/{product_id}",
         updated_product,
-        headers={"Authorization": token},
+        headers={"Authorization": admin_token},
     )
     assert_that(update_resp.status).is_equal_to(200)
 
@@ -212,13 +193,16 @@ def test_ct07_create_product_without_token(api_request: APIRequestContext):
 
     assert_that(resp.status).is_equal_to(401)
     body = parse_response_body(resp)
-    assert_that(body).snapshot()
+    assert_that(body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.NORMAL)
 @pytest.mark.parametrize("number_field", [1, 2, 3, 4])
-def test_ct08_validate_required_fields_when_creating_product(number_field: int, api_request: APIRequestContext):
-    token = get_admin_token(api_request)
+def test_ct08_validate_required_fields_when_creating_product(
+    number_field: int,
+    api_request: APIRequestContext,
+    admin_token: str,
+):
 
     payload_by_case = {
         1: {"preco": 0.55, "descricao": "Test without name", "quantidade": 10},
@@ -230,7 +214,7 @@ def test_ct08_validate_required_fields_when_creating_product(number_field: int,
     payload = payload_by_case[number_field]
     resp = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(payload, ensure_ascii=False),
     )
 
@@ -242,15 +226,12 @@ def test_ct09_work_with_complex_json_data(api_request: APIRequestContext):
     resp = api_request.get("/produtos")
     assert_that(resp.status).is_equal_to(200)
 
-    body = parse_response_body(resp)
-    produtos = body["produtos"]
-
-    if produtos is None:
-        return
-
-    cheap_products = [p for p in produtos if float(p["preco"]) < 100]
-    medium_products = [p for p in produtos if 100 <= float(p["preco"]) < 500]
-    expensive_products = [p for p in produtos if float(p["preco"]) >= 500]
+    # Price ranges are not ServeRest filters, so the listing is bucketed in one streamed pass.
+    cheap_products, medium_products, expensive_products = [], [], []
+    for product in stream_items(resp):
+        price = float(product["preco"])
+        bucket = cheap_products if price < 100 else medium_products if price < 500 else expensive_products
+        bucket.append(product)
 
     assert_that(cheap_products).is_not_none()
     assert_that(medium_products).is_not_none()
@@ -258,9 +239,8 @@ def test_ct09_work_with_complex_json_data(api_request: APIRequestContext):
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct10_delete_existing_product(api_request: APIRequestContext):
-    token = get_admin_token(api_request)
-    product_name = f"Product {int(time.time() * 1000)}"
+def test_ct10_delete_existing_product(api_request: APIRequestContext, admin_token: str):
+    product_name = random_product()
 
     product_payload = {
         "nome": product_name,
@@ -271,7 +251,7 @@ def test_ct10_delete_existing_product(api_request: APIRequestContext):
 
     create_resp = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(product_payload, ensure_ascii=False),
     )
     assert_that(create_resp.status).is_equal_to(201)
@@ -279,29 +259,28 @@ def test_ct10_delete_existing_product(api_request: APIRequestContext):
     create_body = parse_response_body(create_resp)
     product_id = create_body["_id"]
 
-    delete_resp = api_request.delete(f"/produtos/{product_id}", headers={"Authorization": token})
+    delete_resp = api_request.delete(f"/produtos/{product_id}", headers={"Authorization": admin_token})
     assert_that(delete_resp.status).is_equal_to(200)
 
     delete_body = parse_response_body(delete_resp)
-    assert_that(delete_body).snapshot()
+    assert_that(delete_body).matches_snapshot()
 
     get_resp = api_request.get(f"/produtos/{product_id}")
     assert_that(get_resp.status).is_equal_to(400)
 
     get_body = parse_response_body(get_resp)
-    assert_that(get_body).snapshot()
+    assert_that(get_body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.NORMAL)
-def test_ct11_create_product_from_fixed_json_payload(api_request: APIRequestContext):
-    token = get_admin_token(api_request)
+def test_ct11_create_product_from_fixed_json_payload(api_request: APIRequestContext, admin_token: str):
 
     product_payload = load_json_resource("products/productPayload.json")
-    product_payload["nome"] = f"Product {int(time.time() * 1000)}"
+    product_payload["nome"] = random_product()
 
     resp = api_request.post(
         "/produtos",
-        headers={**JSON_HEADERS, "Authorization": token},
+        headers={**JSON_HEADERS, "Authorization": admin_token},
         data=json.dumps(product_payload, ensure_ascii=False),
     )
 
@@ -312,11 +291,14 @@ def test_ct11_create_product_from_fixed_json_payload(api_request: APIRequestCont
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct12_prevent_deleting_product_in_cart(api_request: APIRequestContext):
-    admin_token = get_admin_token(api_request)
-
+@pytest.mark.http_budget(max_requests=8)
+def test_ct12_prevent_deleting_product_in_cart(
+    api_request: APIRequestContext,
+    admin_token: str,
+    fresh_user: UserFactory,
+):
     product_payload = {
-        "nome": f"Product {int(time.time() * 1000)}",
+        "nome": random_product(),
         "preco": 300,
         "descricao": "Product linked to cart",
         "quantidade": 10,
@@ -332,23 +314,7 @@ def test_ct12_prevent_deleting_product_in_cart(api_request: APIRequestContext):
     create_product_body = parse_response_body(create_product_resp)
     product_id = create_product_body["_id"]
 
-    user_email = f"cart.user.{int(time.time() * 1000)}@example.com"
-    user_password = "SenhaSegura@123"
-
-    user_data = {
-        "nome": "Cart User",
-        "email": user_email,
-        "password": user_password,
-        "administrador": "false",
-    }
-
-    post_json(api_request, "/usuarios", user_data)
-
-    login_resp = post_json(api_request, "/login", {"email": user_email, "password": user_password})
-    assert_that(login_resp.status).is_equal_to(200)
-
-    login_body = parse_response_body(login_resp)
-    user_token = login_body["authorization"]
+    user_token = fresh_user(admin=False).token
 
     api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": user_token})
 
@@ -369,25 +335,7 @@ def test_ct12_prevent_deleting_product_in_cart(api_request: APIRequestContext):
 
 
 @allure.severity(allure.severity_level.CRITICAL)
-def test_ct13_restrict_product_creation_to_administrators_only(api_request: APIRequestContext):
-    user_email = f"non.admin.{int(time.time() * 1000)}@example.com"
-    user_password = "SenhaSegura@123"
-
-    user_data = {
-        "nome": "Non Admin User",
-        "email": user_email,
-        "password": user_password,
-        "administrador": "false",
-    }
-
-    post_json(api_request, "/usuarios", user_data)
-
-    login_resp = post_json(api_request, "/login", {"email": user_email, "password": user_password})
-    assert_that(login_resp.status).is_equal_to(200)
-
-    login_body = parse_response_body(login_resp)
-    non_admin_token = login_body["authorization"]
-
+def test_ct13_restrict_product_creation_to_administrators_only(api_request: APIRequestContext, non_admin_token: str):
     product_data = {
         "nome": "Restricted Product",
         "preco": 500,
@@ -403,4 +351,4 @@ def test_ct13_restrict_product_creation_to_administrators_only(api_request: APIR
 
     assert_that(product_resp.status).is_equal_to(403)
     product_body = parse_response_body(product_resp)
-    assert_that(product_body).snapshot()
+    assert_that(product_body).matches_snapshot()
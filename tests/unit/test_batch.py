@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from assertpy import assert_that
+
+from tests.utils.api_utils import batch
+from tests.utils.async_api_utils import batch as async_batch
+from tests.utils.async_runner import BackgroundLoop
+from tests.utils.batch import BatchConcurrencyWarning
+from tests.utils.local_server import LocalServeRest, start_local_server
+from tests.utils.request_middleware import (
+    AsyncRequestContextProxy,
+    RequestCall,
+    RequestContextProxy,
+)
+from tests.utils.transport import HttpRequestContext
+
+PRICE_FILTERS = [RequestCall("GET", f"/produtos?preco={price}") for price in (100, 200, 300)]
+
+
+class MainThreadOnlyContext:
+    # Stands in for a sync Playwright APIRequestContext, which only its driver's thread may use.
+    def __init__(self, failure: Exception | None = None):
+        self.failure = failure
+        self.threads: list[threading.Thread] = []
+
+    def fetch(self, url: str, method: str | None = None, **options: Any) -> SimpleNamespace:
+        self.threads.append(threading.current_thread())
+        if self.failure is not None:
+            raise self.failure
+        return SimpleNamespace(
+            url=url, status=200, status_text="OK", headers={}, body=lambda: b"{}", dispose=lambda: None
+        )
+
+
+class SlowAsyncContext:
+    # Stands in for an async Playwright APIRequestContext; records how many calls wait at once.
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch(self, url: str, method: str | None = None, **options: Any) -> SimpleNamespace:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return SimpleNamespace(url=url, status=200)
+
+
+@pytest.fixture
+def local_server() -> Iterator[LocalServeRest]:
+    server = start_local_server()
+    yield server
+    server.stop()
+
+
+def test_batch_sends_from_worker_threads_on_thread_safe_context(local_server: LocalServeRest):
+    request = HttpRequestContext(local_server.base_url)
+
+    results = batch(RequestContextProxy(request), PRICE_FILTERS, concurrency=3)
+
+    assert_that([result.call for result in results]).is_equal_to(PRICE_FILTERS)
+    assert_that([result.unwrap().status for result in results]).is_equal_to([200, 200, 200])
+    request.dispose()
+
+
+def test_batch_sends_sync_context_calls_in_order_on_calling_thread():
+    request_context = MainThreadOnlyContext()
+
+    with pytest.warns(BatchConcurrencyWarning, match="concurrency=3 cannot be honoured"):
+        results = batch(RequestContextProxy(request_context), PRICE_FILTERS, concurrency=3)
+
+    assert_that(request_context.threads).is_equal_to([threading.main_thread()] * len(PRICE_FILTERS))
+    assert_that([result.unwrap().url for result in results]).is_equal_to([call.url for call in PRICE_FILTERS])
+
+
+def test_batch_reports_failure_on_every_call():
+    failure = ConnectionRefusedError("connection refused")
+
+    results = batch(RequestContextProxy(MainThreadOnlyContext(failure)), PRICE_FILTERS, concurrency=1)
+
+    assert_that(results).is_length(len(PRICE_FILTERS))
+    for result in results:
+        assert_that(result.ok).is_false()
+        assert_that(result.error).is_same_as(failure)
+
+
+def test_batch_raises_errors_that_are_not_transport_failures():
+    request_context = MainThreadOnlyContext(KeyError("idProduto"))
+
+    with pytest.raises(KeyError):
+        batch(RequestContextProxy(request_context), PRICE_FILTERS)
+
+
+def test_async_batch_keeps_up_to_concurrency_calls_in_flight():
+    request_context = SlowAsyncContext()
+    calls = [RequestCall("GET", f"/produtos?preco={price}") for price in range(6)]
+
+    loop = BackgroundLoop()
+    results = loop.run(async_batch(AsyncRequestContextProxy(request_context), calls, concurrency=4))
+    loop.close()
+
+    assert_that(request_context.max_in_flight).is_equal_to(4)
+    assert_that([result.unwrap().url for result in results]).is_equal_to([call.url for call in calls])
@@ -0,0 +1,21 @@
+from assertpy import assert_that
+
+from tests.utils.cassette import mask
+from tests.utils.data_factory import DataFactory
+
+
+def test_replayed_seed_with_new_salt_generates_new_unique_values():
+    first = DataFactory(1234, "t0000abcd", salt="aaaa").users(3)
+    replay = DataFactory(1234, "t0000abcd", salt="bbbb").users(3)
+
+    assert_that([user["password"] for user in replay]).is_equal_to([user["password"] for user in first])
+    assert_that({user["email"] for user in replay} & {user["email"] for user in first}).is_empty()
+    assert_that({user["nome"] for user in replay} & {user["nome"] for user in first}).is_empty()
+
+
+def test_generated_names_are_unique_and_masked():
+    factory = DataFactory(1234, "w0", salt="aaaa")
+    names = [factory.name() for _ in range(300)]
+
+    assert_that(set(names)).is_length(300)
+    assert_that(mask(names[0])).is_equal_to("<nome>")
@@ -0,0 +1,13 @@
+from assertpy import assert_that
+
+from tests.utils.request_middleware import RequestCall
+from tests.utils.response_cache import cache_key
+
+
+def test_cache_key_reads_the_token_whatever_the_header_case():
+    upper = RequestCall("GET", "/usuarios", {"headers": {"Authorization": "Bearer a"}})
+    lower = RequestCall("GET", "/usuarios", {"headers": {"authorization": "Bearer a"}})
+    anonymous = RequestCall("GET", "/usuarios", {})
+
+    assert_that(cache_key(lower)).is_equal_to(cache_key(upper))
+    assert_that(cache_key(lower)).is_not_equal_to(cache_key(anonymous))
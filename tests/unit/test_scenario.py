@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from assertpy import assert_that
+
+from tests.utils.request_middleware import RequestCall
+from tests.utils.scenario import Scenario, ScenarioCache, Step
+
+
+class CountingContext:
+    def __init__(self):
+        self.sent = 0
+
+    def fetch(self, url: str, method: str | None = None, **options) -> SimpleNamespace:
+        self.sent += 1
+        return SimpleNamespace(value=f"token-{self.sent}")
+
+
+def test_shared_step_is_built_again_once_its_max_age_has_passed():
+    now = [0.0]
+    cache = ScenarioCache(clock=lambda: now[0])
+    request = CountingContext()
+    token = Step(
+        "token",
+        lambda values: RequestCall("POST", "/login", {}),
+        lambda response, call: response.value,
+        shared=True,
+        max_age=540,
+    )
+
+    first = Scenario(token).build(request, cache)["token"]
+    now[0] = 539
+    reused = Scenario(token).build(request, cache)["token"]
+    now[0] = 540
+    refreshed = Scenario(token).build(request, cache)["token"]
+
+    assert_that([first, reused, refreshed]).is_equal_to(["token-1", "token-1", "token-2"])
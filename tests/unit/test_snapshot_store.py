@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from assertpy import assert_that
+
+from tests.utils.snapshot_store import SnapshotStore, merge_exports
+
+NODEID = "tests/users/test_users_playwright.py::test_ct01_list_users"
+FILENAME = "snap-test_users_playwright.json"
+STORED = {"test_ct01_list_users#1": {"quantidade": 1}, "test_ct01_list_users#2": {"nome": "Fulano"}}
+
+
+def _run(directory: Path, passed: bool, checks: int) -> dict:
+    (directory / FILENAME).write_text(json.dumps(STORED), encoding="utf-8")
+    store = SnapshotStore(directory, "update")
+    store.collect([NODEID])
+    store.begin_test(NODEID)
+    for value in list(STORED.values())[:checks]:
+        store.check(value)
+    store.end_test(NODEID, passed)
+    return merge_exports(directory, [store.export()], store.mode)
+
+
+def test_failing_test_keeps_snapshots_it_did_not_reach(tmp_path: Path):
+    report = _run(tmp_path, passed=False, checks=1)
+
+    assert_that(report).is_empty()
+    assert_that(json.loads((tmp_path / FILENAME).read_text(encoding="utf-8"))).is_equal_to(STORED)
+
+
+def test_passing_test_prunes_snapshots_it_did_not_reach(tmp_path: Path):
+    report = _run(tmp_path, passed=True, checks=1)
+
+    assert_that(report[FILENAME]["stale"]).is_equal_to(["test_ct01_list_users#2"])
+    assert_that(json.loads((tmp_path / FILENAME).read_text(encoding="utf-8"))).does_not_contain_key(
+        "test_ct01_list_users#2"
+    )
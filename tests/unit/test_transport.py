@@ -0,0 +1,58 @@
+import time
+from collections.abc import Iterator
+
+import pytest
+from assertpy import assert_that
+
+from tests.utils import transport
+from tests.utils.local_server import LocalServeRest, ServeRestHandler
+from tests.utils.transport import HttpRequestContext
+
+NEW_USER = {"nome": "Fulano", "email": "fulano@qa.com.br", "password": "teste", "administrador": "true"}
+
+
+class ShortKeepAliveHandler(ServeRestHandler):
+    # Closes a keep-alive connection idle for 0.2 s, as serverest.dev does after about 5 s.
+    timeout = 0.2
+
+
+@pytest.fixture
+def short_keep_alive_server() -> Iterator[LocalServeRest]:
+    server = LocalServeRest()
+    server.RequestHandlerClass = ShortKeepAliveHandler
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_post_after_idle_gap_opens_new_connection(short_keep_alive_server: LocalServeRest):
+    request = HttpRequestContext(short_keep_alive_server.base_url)
+    assert_that(request.get("/usuarios").status).is_equal_to(200)
+    time.sleep(0.5)
+
+    assert_that(request.post("/usuarios", data=NEW_USER).status).is_equal_to(201)
+    assert_that(request.connections_opened).is_equal_to(2)
+    request.dispose()
+
+
+def test_idle_connection_older_than_limit_is_not_reused(short_keep_alive_server: LocalServeRest):
+    request = HttpRequestContext(short_keep_alive_server.base_url, max_idle_seconds=0.05)
+    request.get("/usuarios")
+    time.sleep(0.1)
+
+    request.get("/usuarios")
+    assert_that(request.connections_opened).is_equal_to(2)
+    request.dispose()
+
+
+def test_post_retried_when_stale_connection_fails_before_write(
+    monkeypatch: pytest.MonkeyPatch, short_keep_alive_server: LocalServeRest
+):
+    # The server closes the connection right after the pool checked it.
+    monkeypatch.setattr(transport, "_usable", lambda connection: True)
+    request = HttpRequestContext(short_keep_alive_server.base_url, max_idle_seconds=60)
+    request.get("/usuarios")
+    time.sleep(0.5)
+
+    assert_that(request.post("/usuarios", data=NEW_USER).status).is_equal_to(201)
+    request.dispose()
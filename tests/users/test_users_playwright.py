@@ -1,13 +1,30 @@
+import asyncio
 import json
 import re
-import time
 
 import allure
+import pytest
 from assertpy import assert_that
+from playwright.async_api import APIRequestContext as AsyncAPIRequestContext
 from playwright.sync_api import APIRequestContext
 
-from tests.utils.api_utils import JSON_HEADERS, load_json_resource, parse_response_body, post_json, put_json
-from tests.utils.faker_utils import random_email, random_name, random_password
+from tests.utils.api_utils import (
+    JSON_HEADERS,
+    load_json_resource,
+    parse_response_body,
+    post_json,
+    put_json,
+)
+from tests.utils.async_api_utils import parse_response_body as async_parse_response_body
+from tests.utils.async_api_utils import post_json as async_post_json
+from tests.utils.faker_utils import (
+    random_email,
+    random_name,
+    random_password,
+    random_product,
+)
+from tests.utils.list_query import ListQuery
+from tests.utils.schemas import USUARIO, validate_many
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -23,13 +40,7 @@ def test_ct01_list_all_users_and_validate_structure(api_request: APIRequestConte
     assert_that(usuarios).is_not_none()
     assert_that(len(usuarios)).is_greater_than(0)
 
-    for user in usuarios:
-        assert_that(user).contains_key("nome")
-        assert_that(user).contains_key("email")
-        assert_that(user).contains_key("password")
-        assert_that(user).contains_key("administrador")
-        assert_that(user).contains_key("_id")
-        assert_that(re.fullmatch(r".+@.+\..+", user["email"])).is_not_none()
+    assert_that(validate_many(USUARIO, usuarios)).is_empty()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -80,17 +91,16 @@ def test_ct03_create_user(api_request: APIRequestContext):
 
 @allure.severity(allure.severity_level.NORMAL)
 def test_ct04_advanced_json_validations_with_filters(api_request: APIRequestContext):
-    resp = api_request.get("/usuarios")
-    assert_that(resp.status).is_equal_to(200)
-
-    body = parse_response_body(resp)
-    usuarios = body["usuarios"]
-
-    admins = [user for user in usuarios if user.get("administrador") == "true"]
+    # administrador=true is sent as a query parameter; only admins are transferred.
+    admins = ListQuery("/usuarios").where("administrador", "==", "true").fetch(api_request)
+    assert_that(admins.response.status).is_equal_to(200)
+    assert_that(admins.params).is_equal_to({"administrador": "true"})
     assert_that(len(admins)).is_greater_than(0)
+    assert_that(admins.rows_received).is_equal_to(len(admins))
 
-    for user in usuarios:
-        assert_that(user.get("email")).is_not_none()
+    without_email = ListQuery("/usuarios").filter(lambda user: user.get("email") is None).fetch(api_request)
+    assert_that(without_email.response.status).is_equal_to(200)
+    assert_that(without_email.items).is_empty()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -118,7 +128,7 @@ def test_ct05_duplicate_email_validation(api_request: APIRequestContext):
     assert_that(second.status).is_equal_to(400)
 
     second_body = parse_response_body(second)
-    assert_that(second_body).snapshot()
+    assert_that(second_body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.NORMAL)
@@ -158,7 +168,7 @@ def test_ct07_conditional_validations_based_on_values(api_request: APIRequestCon
 
 @allure.severity(allure.severity_level.NORMAL)
 def test_ct08_validate_formats_with_regular_expressions(api_request: APIRequestContext):
-    new_email = f"test.regex.{int(time.time() * 1000)}@example.com"
+    new_email = random_email()
 
     user_data = {
         "nome": "Regex Test",
@@ -280,7 +290,7 @@ def test_ct13_create_and_delete_user_based_on_json_payload(api_request: APIReque
     delete_resp = api_request.delete(f"/usuarios/{user_id}")
     assert_that(delete_resp.status).is_equal_to(200)
     delete_body = parse_response_body(delete_resp)
-    assert_that(delete_body).snapshot()
+    assert_that(delete_body).matches_snapshot()
 
     search_resp = api_request.get(f"/usuarios?email={expected_email}")
     assert_that(search_resp.status).is_equal_to(200)
@@ -289,6 +299,7 @@ def test_ct13_create_and_delete_user_based_on_json_payload(api_request: APIReque
 
 
 @allure.severity(allure.severity_level.CRITICAL)
+@pytest.mark.http_budget(max_requests=5)
 def test_ct14_prevent_deleting_user_that_has_associated_cart(api_request: APIRequestContext):
     user_email = random_email()
     user_password = "SenhaSegura@123"
@@ -314,30 +325,20 @@ def test_ct14_prevent_deleting_user_that_has_associated_cart(api_request: APIReq
     user_token = login_body["authorization"]
 
     product_data = {
-        "nome": f"Product for user cart {int(time.time() * 1000)}",
+        "nome": random_product(),
         "preco": 100,
         "descricao": "Product associated to user cart",
         "quantidade": 5,
     }
 
-    product_resp = api_request.post(
-        "/produtos",
-        headers={**JSON_HEADERS, "Authorization": user_token},
-        data=json.dumps(product_data, ensure_ascii=False),
-    )
+    product_resp = post_json(api_request, "/produtos", product_data, headers={"Authorization": user_token})
     assert_that(product_resp.status).is_equal_to(201)
 
     product_body = parse_response_body(product_resp)
     product_id = product_body["_id"]
 
-    api_request.delete("/carrinhos/cancelar-compra", headers={"Authorization": user_token})
-
     cart_body = {"produtos": [{"idProduto": product_id, "quantidade": 1}]}
-    cart_resp = api_request.post(
-        "/carrinhos",
-        headers={**JSON_HEADERS, "Authorization": user_token},
-        data=json.dumps(cart_body, ensure_ascii=False),
-    )
+    cart_resp = post_json(api_request, "/carrinhos", cart_body, headers={"Authorization": user_token})
     assert_that(cart_resp.status).is_equal_to(201)
 
     delete_resp = api_request.delete(f"/usuarios/{user_id}")
@@ -354,7 +355,7 @@ def test_ct15_get_user_by_invalid_id_should_return_400(api_request: APIRequestCo
     assert_that(resp.status).is_equal_to(400)
 
     body = parse_response_body(resp)
-    assert_that(body).snapshot()
+    assert_that(body).matches_snapshot()
 
 
 @allure.severity(allure.severity_level.CRITICAL)
@@ -394,4 +395,26 @@ def test_ct16_prevent_updating_user_with_duplicate_email(api_request: APIRequest
     assert_that(update_resp.status).is_equal_to(400)
 
     update_body = parse_response_body(update_resp)
-    assert_that(update_body).snapshot()
+    assert_that(update_body).matches_snapshot()
+
+
+@allure.severity(allure.severity_level.NORMAL)
+@pytest.mark.http_budget(max_requests=6)
+async def test_ct17_create_independent_users_concurrently(api_request_async: AsyncAPIRequestContext):
+    # The signups do not depend on each other, so they are in flight at the same time,
+    # and so are the lookups of the users they created.
+    users = [
+        {"nome": random_name(), "email": random_email(), "password": random_password(), "administrador": "false"}
+        for _ in range(3)
+    ]
+
+    create_resps = await asyncio.gather(*(async_post_json(api_request_async, "/usuarios", user) for user in users))
+    assert_that([resp.status for resp in create_resps]).is_equal_to([201] * len(users))
+
+    user_ids = [(await async_parse_response_body(resp))["_id"] for resp in create_resps]
+    assert_that(set(user_ids)).is_length(len(users))
+
+    get_resps = await asyncio.gather(*(api_request_async.get(f"/usuarios/{user_id}") for user_id in user_ids))
+    for user, resp in zip(users, get_resps):
+        assert_that(resp.status).is_equal_to(200)
+        assert_that((await async_parse_response_body(resp))["email"]).is_equal_to(user["email"])
@@ -1,49 +1,88 @@
 import json
+import os
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 from typing import Any
 
-from playwright.sync_api import APIRequestContext, APIResponse
+from tests.utils.batch import BatchResult, run_batch
+from tests.utils.json_stream import LIST_KEYS, ListStream
+from tests.utils.request_middleware import RequestCall
+from tests.utils.resource_cache import ResourceCache, thaw
+from tests.utils.transport import ApiRequestContext, ApiResponse
 
-BASE_URL = "https://serverest.dev"
+BASE_URL = os.getenv("BASE_URL", "https://serverest.dev")
 JSON_HEADERS = {"Content-Type": "application/json"}
 RESOURCES_DIR = Path(__file__).resolve().parent.parent / "resources"
+RESOURCE_CACHE = ResourceCache(RESOURCES_DIR)
 
 
 def post_json(
-    request: APIRequestContext,
+    request: ApiRequestContext,
     endpoint: str,
     payload: dict[str, Any] | str,
     headers: dict[str, str] | None = None,
-) -> APIResponse:
-    request_headers = dict(JSON_HEADERS)
-    if headers:
-        request_headers.update(headers)
-
-    data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
-    return request.post(endpoint, headers=request_headers, data=data)
+) -> ApiResponse:
+    return request.post(endpoint, **json_options(payload, headers))
 
 
 def put_json(
-    request: APIRequestContext,
+    request: ApiRequestContext,
     endpoint: str,
     payload: dict[str, Any] | str,
     headers: dict[str, str] | None = None,
-) -> APIResponse:
-    request_headers = dict(JSON_HEADERS)
-    if headers:
-        request_headers.update(headers)
+) -> ApiResponse:
+    return request.put(endpoint, **json_options(payload, headers))
 
-    data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
-    return request.put(endpoint, headers=request_headers, data=data)
+
+def json_call(
+    method: str,
+    endpoint: str,
+    payload: dict[str, Any] | str,
+    headers: dict[str, str] | None = None,
+) -> RequestCall:
+    # Same request post_json/put_json would send, as a spec for batch().
+    return RequestCall(method.upper(), endpoint, json_options(payload, headers))
 
 
-def parse_response_body(response: APIResponse) -> dict[str, Any]:
+def batch(
+    request: ApiRequestContext,
+    calls: Iterable[RequestCall],
+    concurrency: int | None = None,
+) -> list[BatchResult]:
+    # Sends the calls through the same middlewares as request. With a thread-safe
+    # transport (--transport=http) at most `concurrency` are in flight at once
+    # (DEFAULT_CONCURRENCY when None); on a sync Playwright context they go out one after
+    # another, and an explicit concurrency above 1 warns (async_api_utils.batch sends
+    # concurrently there). Results keep the input order; a call that failed on the
+    # network or in Playwright gets its exception in BatchResult.error instead of a response.
+    return run_batch(request, calls, concurrency)
+
+
+def parse_response_body(response: ApiResponse) -> dict[str, Any]:
     return response.json()
 
 
+def stream_items(response: ApiResponse, key: str | None = None) -> ListStream:
+    # The usuarios/produtos/carrinhos items of a listing, parsed one at a time instead
+    # of all at once (the body itself is read in full first); "quantidade" and other
+    # top-level values end up in .fields.
+    return ListStream.of(response.body(), (key,) if key else LIST_KEYS)
+
+
 def load_json_resource(relative_path: str) -> dict[str, Any]:
-    file_path = RESOURCES_DIR / relative_path
-    if not file_path.exists():
-        raise FileNotFoundError(f"Resource not found: {file_path}")
-    with file_path.open("r", encoding="utf-8") as resource_file:
-        return json.load(resource_file)
+    # A private mutable copy of the cached payload, so tests can customise it freely.
+    return thaw(RESOURCE_CACHE.get(relative_path))
+
+
+def load_csv_resource(relative_path: str) -> tuple[Mapping[str, str], ...]:
+    # Read-only rows shared by every caller.
+    return RESOURCE_CACHE.get(relative_path)
+
+
+def json_options(payload: dict[str, Any] | str, headers: dict[str, str] | None) -> dict[str, Any]:
+    request_headers = dict(JSON_HEADERS)
+    if headers:
+        request_headers.update(headers)
+
+    data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+    return {"headers": request_headers, "data": data}
@@ -0,0 +1,45 @@
+from collections.abc import Iterable
+from typing import Any
+
+from playwright.async_api import APIRequestContext, APIResponse
+
+from tests.utils.api_utils import json_options
+from tests.utils.batch import BatchResult, run_batch_async
+from tests.utils.json_stream import LIST_KEYS, ListStream
+from tests.utils.request_middleware import AsyncRequestContextProxy, RequestCall
+
+
+async def post_json(
+    request: APIRequestContext,
+    endpoint: str,
+    payload: dict[str, Any] | str,
+    headers: dict[str, str] | None = None,
+) -> APIResponse:
+    return await request.post(endpoint, **json_options(payload, headers))
+
+
+async def put_json(
+    request: APIRequestContext,
+    endpoint: str,
+    payload: dict[str, Any] | str,
+    headers: dict[str, str] | None = None,
+) -> APIResponse:
+    return await request.put(endpoint, **json_options(payload, headers))
+
+
+async def parse_response_body(response: APIResponse) -> dict[str, Any]:
+    return await response.json()
+
+
+async def stream_items(response: APIResponse, key: str | None = None) -> ListStream:
+    return ListStream.of(await response.body(), (key,) if key else LIST_KEYS)
+
+
+async def batch(
+    request: AsyncRequestContextProxy,
+    calls: Iterable[RequestCall],
+    concurrency: int | None = None,
+) -> list[BatchResult]:
+    # api_utils.batch for api_request_async: up to `concurrency` calls in flight at once
+    # on either transport, including the default Playwright one.
+    return await run_batch_async(request, calls, concurrency)
@@ -0,0 +1,141 @@
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from playwright.async_api import APIResponse as AsyncAPIResponse
+from playwright.sync_api import APIRequestContext, APIResponse
+
+from tests.utils.api_utils import parse_response_body, post_json
+from tests.utils.faker_utils import random_email
+from tests.utils.request_middleware import AsyncSend, RequestCall, Send
+
+# ServeRest signs tokens with a 600 s expiry; refresh a little earlier so a token
+# handed out at the end of the window is still valid for the whole test.
+TOKEN_TTL_SECONDS = 600
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+
+
+@dataclass
+class UserSession:
+    email: str
+    password: str
+    admin: bool
+    user_id: str | None = None
+    token: str | None = None
+    issued_at: float = 0.0
+
+
+UserFactory = Callable[..., UserSession]
+
+
+@dataclass
+class AuthPoolStats:
+    signups: int = 0
+    logins: int = 0
+    # Pooled tokens handed out without a signup or login.
+    hits: int = 0
+    # Pooled tokens dropped after the server answered 401 to them.
+    invalidated: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class AuthTokenPool:
+    def __init__(
+        self,
+        password: str,
+        ttl: float = TOKEN_TTL_SECONDS,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        pool_emails: Callable[[], str] = random_email,
+    ):
+        self.password = password
+        self.pool_emails = pool_emails
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.sessions: dict[bool, UserSession] = {}
+        self.stats = AuthPoolStats()
+
+    def admin_token(self, request: APIRequestContext) -> str:
+        return self._pooled_token(request, admin=True)
+
+    def non_admin_token(self, request: APIRequestContext) -> str:
+        return self._pooled_token(request, admin=False)
+
+    def fresh_user(self, request: APIRequestContext, admin: bool = True, email: str | None = None) -> UserSession:
+        session = UserSession(email=email or random_email(), password=self.password, admin=admin)
+        self._signup(request, session)
+        self._login(request, session)
+        return session
+
+    def __call__(self, call: RequestCall, send: Send) -> APIResponse:
+        # Middleware: a pooled token the server rejects (expired early, or the target was
+        # reset) is dropped, so the next admin_token/non_admin_token logs in again.
+        response = send(call)
+        if response.status == 401:
+            self.invalidate(_authorization(call))
+        return response
+
+    async def call_async(self, call: RequestCall, send: AsyncSend) -> AsyncAPIResponse:
+        response = await send(call)
+        if response.status == 401:
+            self.invalidate(_authorization(call))
+        return response
+
+    def invalidate(self, token: str | None) -> None:
+        for session in self.sessions.values():
+            if token and session.token == token:
+                session.token = None
+                self.stats.invalidated += 1
+
+    def _pooled_token(self, request: APIRequestContext, admin: bool) -> str:
+        session = self.sessions.get(admin)
+        if session is None:
+            session = self.fresh_user(request, admin=admin, email=self.pool_emails())
+            self.sessions[admin] = session
+        elif self._is_expiring(session):
+            if not self._login(request, session, required=False):
+                # The target may have been reset since the user was created.
+                self._signup(request, session)
+                self._login(request, session)
+        else:
+            self.stats.hits += 1
+        return session.token
+
+    def _is_expiring(self, session: UserSession) -> bool:
+        if session.token is None:
+            return True
+        return self.clock() - session.issued_at >= self.ttl - self.refresh_margin
+
+    def _signup(self, request: APIRequestContext, session: UserSession) -> None:
+        payload = {
+            "nome": "Pooled Admin User" if session.admin else "Pooled User",
+            "email": session.email,
+            "password": session.password,
+            "administrador": "true" if session.admin else "false",
+        }
+        resp = post_json(request, "/usuarios", payload)
+        if resp.status != 201:
+            raise RuntimeError(f"Could not create pooled user {session.email}: {resp.status} {resp.text()}")
+        self.stats.signups += 1
+        session.user_id = parse_response_body(resp)["_id"]
+
+    def _login(self, request: APIRequestContext, session: UserSession, required: bool = True) -> bool:
+        issued_at = self.clock()
+        resp = post_json(request, "/login", {"email": session.email, "password": session.password})
+        self.stats.logins += 1
+        if resp.status != 200:
+            if required:
+                raise RuntimeError(f"Could not log in pooled user {session.email}: {resp.status} {resp.text()}")
+            return False
+        session.token = parse_response_body(resp)["authorization"]
+        session.issued_at = issued_at
+        return True
+
+
+def _authorization(call: RequestCall) -> str | None:
+    headers = call.options.get("headers") or {}
+    return next((value for name, value in headers.items() if name.lower() == "authorization"), None)
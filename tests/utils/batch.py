@@ -0,0 +1,124 @@
+import asyncio
+import http.client
+import warnings
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from tests.utils.context_pool import LazyRequestContext
+from tests.utils.request_middleware import (
+    AsyncRequestContextProxy,
+    RequestCall,
+    RequestContextProxy,
+    Send,
+    compose,
+)
+from tests.utils.transport import ApiRequestContext, ApiResponse, HttpRequestContext
+
+DEFAULT_CONCURRENCY = 8
+# What one call of a batch can fail with: the network (socket errors and timeouts,
+# malformed HTTP from http.client) or Playwright. Anything else is a bug and is raised.
+CALL_ERRORS = (OSError, http.client.HTTPException, PlaywrightError)
+
+
+class BatchConcurrencyWarning(pytest.PytestWarning):
+    pass
+
+
+@dataclass
+class BatchResult:
+    call: RequestCall
+    response: ApiResponse | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.response.ok
+
+    def unwrap(self) -> ApiResponse:
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def run_batch(
+    request: ApiRequestContext,
+    calls: Iterable[RequestCall],
+    concurrency: int | None = None,
+) -> list[BatchResult]:
+    # Each call goes through the proxy's middleware chain, so the registry, cassette and
+    # rate limiter see batched requests like any other one. Only a thread-safe transport
+    # (HttpRequestContext) can have several requests in flight from here: at most
+    # `concurrency`, DEFAULT_CONCURRENCY when None. A sync Playwright context belongs to
+    # the thread running its driver, so there the calls go out one after another, and
+    # asking for more than one at a time warns instead of being silently ignored;
+    # run_batch_async on api_request_async is the concurrent path for that transport.
+    _check_concurrency(concurrency)
+    calls = list(calls)
+    if not calls:
+        return []
+    if isinstance(request, RequestContextProxy):
+        target, middlewares = request.request_context, request.middlewares
+    else:
+        target, middlewares = request, ()
+    chain = compose(middlewares, lambda call: target.fetch(call.url, method=call.method, **call.options))
+    if not thread_safe(target):
+        if concurrency is not None and concurrency > 1 and len(calls) > 1:
+            warnings.warn(
+                BatchConcurrencyWarning(
+                    f"concurrency={concurrency} cannot be honoured on a sync Playwright context: the "
+                    f"{len(calls)} calls are sent one at a time; use --transport=http, or batch on "
+                    "api_request_async (async_api_utils.batch)"
+                ),
+                stacklevel=3,
+            )
+        concurrency = 1
+    concurrency = concurrency or DEFAULT_CONCURRENCY
+    if concurrency == 1 or len(calls) == 1:
+        return [_run(chain, call) for call in calls]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(calls)), thread_name_prefix="api-batch") as executor:
+        return list(executor.map(lambda call: _run(chain, call), calls))
+
+
+async def run_batch_async(
+    request: AsyncRequestContextProxy,
+    calls: Iterable[RequestCall],
+    concurrency: int | None = None,
+) -> list[BatchResult]:
+    # An async Playwright context has a concurrent path on its own event loop whatever
+    # the transport: at most `concurrency` calls (DEFAULT_CONCURRENCY when None) wait on
+    # the driver at once, each through the proxy's async middlewares.
+    _check_concurrency(concurrency)
+    slots = asyncio.Semaphore(concurrency or DEFAULT_CONCURRENCY)
+
+    async def run(call: RequestCall) -> BatchResult:
+        async with slots:
+            try:
+                return BatchResult(call, response=await request.fetch(call.url, method=call.method, **call.options))
+            except CALL_ERRORS as error:
+                return BatchResult(call, error=error)
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+
+def _check_concurrency(concurrency: int | None) -> None:
+    if concurrency is not None and concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+
+def _run(chain: Send, call: RequestCall) -> BatchResult:
+    try:
+        return BatchResult(call, response=chain(call))
+    except CALL_ERRORS as error:
+        return BatchResult(call, error=error)
+
+
+def thread_safe(target: ApiRequestContext) -> bool:
+    # HttpRequestContext can be shared by threads; a sync Playwright context belongs to
+    # the thread running its driver.
+    if isinstance(target, LazyRequestContext):
+        return target.thread_safe
+    return isinstance(target, HttpRequestContext)
@@ -0,0 +1,311 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pytest
+from playwright.async_api import APIResponse as AsyncAPIResponse
+from playwright.sync_api import APIResponse
+
+from tests.utils.data_factory import FULL_NAMES, PRODUCT_TITLES
+from tests.utils.request_middleware import AsyncSend, RequestCall, Send
+from tests.utils.transport import IDEMPOTENT_METHODS
+
+CASSETTE_PATH = Path(__file__).resolve().parents[2] / "cassettes" / "suite.jsonl"
+CASSETTE_VERSION = 2
+SESSION = "<session>"
+CASSETTE = pytest.StashKey["Cassette"]()
+EMAIL = re.compile(r"[^\s@\"]+@[^\s@\"]+\.[A-Za-z]{2,}")
+# DataFactory.unique(): "<run tag><salt><namespace>n<counter>", e.g. "0k3f9a7qz1w3n12" or
+# "0k3f9a7qz1t1a2b3c4n2".
+UNIQUE_TOKEN = re.compile(r"\b[0-9a-z]{10}(?:w\d+|t[0-9a-z]{7}(?:x\d+)?)n\d+\b")
+PASSWORD = re.compile(r"Senha@[0-9a-f]{10}")
+NAMES = frozenset(FULL_NAMES)
+TITLES = frozenset(PRODUCT_TITLES)
+
+
+def mask(value: Any, placeholder: Callable[[str, str], str] = lambda kind, raw: f"<{kind}>") -> Any:
+    # Generated values differ between runs (pooled users come from the worker namespace),
+    # so they are replaced by placeholders before a request is matched.
+    if isinstance(value, dict):
+        return {key: mask(item, placeholder) for key, item in value.items()}
+    if isinstance(value, list):
+        return [mask(item, placeholder) for item in value]
+    if not isinstance(value, str):
+        return value
+    # DataFactory.name() and product_name(): "<name or title> <unique>". Shared scenario
+    # users and products are created by whichever test needs them first on a worker, so
+    # the name drawn differs per run.
+    title, _, suffix = value.rpartition(" ")
+    if UNIQUE_TOKEN.fullmatch(suffix):
+        if title in NAMES:
+            return placeholder("nome", value)
+        if title in TITLES:
+            return placeholder("produto", value)
+    value = EMAIL.sub(lambda match: placeholder("email", match.group()), value)
+    value = PASSWORD.sub(lambda match: placeholder("password", match.group()), value)
+    return UNIQUE_TOKEN.sub(lambda match: placeholder("uid", match.group()), value)
+
+
+class Masker:
+    # Numbered placeholders for the requests stored in a recording: each distinct value
+    # gets its own ("<email:gw0/3>"), so the journal still says which requests share a
+    # user, a product or a token without keeping any of them. `scope` (the worker id)
+    # keeps the numbers of different workers apart once their recordings are merged.
+    def __init__(self, scope: str):
+        self.scope = scope
+        self.placeholders: dict[tuple[str, str], str] = {}
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def placeholder(self, kind: str, raw: str) -> str:
+        with self._lock:
+            found = self.placeholders.get((kind, raw))
+            if found is None:
+                self.counts[kind] = self.counts.get(kind, 0) + 1
+                found = self.placeholders[(kind, raw)] = f"<{kind}:{self.scope}/{self.counts[kind]}>"
+            return found
+
+    def token(self, authorization: str) -> str:
+        # A token a login response returned; anything else (a malformed or made-up token
+        # a negative test sends) is a literal of the test and is kept as is.
+        token = authorization.removeprefix("Bearer ")
+        with self._lock:
+            found = self.placeholders.get(("token", token))
+        return authorization if found is None else authorization.replace(token, found)
+
+    def request(self, call: RequestCall) -> dict[str, Any]:
+        # Method, URL, Content-Type and body, masked; the Authorization header becomes
+        # "auth", pointing at the login whose response carried the token.
+        data = call.options.get("data")
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", "replace")
+        if isinstance(data, str):
+            try:
+                data = json.dumps(mask(json.loads(data), self.placeholder), ensure_ascii=False)
+            except ValueError:
+                data = mask(data, self.placeholder)
+        elif data is not None:
+            data = mask(data, self.placeholder)
+        headers = call.options.get("headers") or {}
+        request = {"method": call.method, "url": self.url(call.url), "data": data}
+        request["headers"] = {key: value for key, value in headers.items() if key.lower() == "content-type"}
+        authorization = next((value for key, value in headers.items() if key.lower() == "authorization"), None)
+        if authorization is not None:
+            request["auth"] = self.token(authorization)
+        if call.options.get("params"):
+            params = call.options["params"].items()
+            request["params"] = {key: mask(str(value), self.placeholder) for key, value in params}
+        return request
+
+    def url(self, url: str) -> str:
+        # Query values one by one: an email pattern would take the path along with it.
+        path, mark, query = url.partition("?")
+        if not mark:
+            return mask(path, self.placeholder)
+        segments = []
+        for segment in query.split("&"):
+            key, equals, value = segment.partition("=")
+            segments.append(key + equals + mask(value, self.placeholder))
+        return f"{mask(path, self.placeholder)}?{'&'.join(segments)}"
+
+    def body(self, body: str) -> str:
+        # Login responses: the token is stored as a placeholder too, registered here so
+        # the requests sending it later refer to it.
+        if '"authorization"' not in body:
+            return body
+        try:
+            authorization = json.loads(body).get("authorization")
+        except (ValueError, AttributeError):
+            return body
+        if not isinstance(authorization, str):
+            return body
+        token = authorization.removeprefix("Bearer ")
+        return body.replace(token, self.placeholder("token", token))
+
+
+def request_key(call: RequestCall) -> str:
+    parts = urlsplit(call.url)
+    target = parts.path.rstrip("/") or "/"
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    query += sorted((key, str(value)) for key, value in (call.options.get("params") or {}).items())
+    if query:
+        target += "?" + urlencode(sorted((key, mask(value)) for key, value in query))
+    return f"{call.method} {target} {normalize_body(call.options.get('data'))}"
+
+
+def normalize_body(data: Any) -> str:
+    if data is None or data == "":
+        return ""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", "replace")
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return mask(data)
+    return json.dumps(mask(data), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+class ReplayResponse:
+    # The parts of APIResponse the suite reads, served from a recorded interaction.
+    def __init__(self, url: str, interaction: dict[str, Any]):
+        self.url = url
+        self.status = interaction["status"]
+        self.status_text = ""
+        self.ok = 200 <= self.status <= 299
+        self._body = interaction["body"].encode("utf-8")
+        self.headers = {"content-type": interaction["content_type"], "content-length": str(len(self._body))}
+
+    def body(self) -> bytes:
+        return self._body
+
+    def text(self) -> str:
+        return self._body.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self._body)
+
+    def dispose(self) -> None:
+        pass
+
+
+class AsyncReplayResponse(ReplayResponse):
+    async def body(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode("utf-8")
+
+    async def json(self) -> Any:
+        return json.loads(self._body)
+
+    async def dispose(self) -> None:
+        pass
+
+
+class Cassette:
+    # Middleware for api_request/api_request_async. "record" appends every exchange;
+    # "replay" answers from the cassette and never calls send(). Interactions are
+    # looked up by (test, masked request) first, in recorded order; requests whose
+    # test depends on scheduling (pooled users are created by whichever test needs
+    # them first on a worker) fall back to any unused interaction with the same key.
+    # When none is left, an idempotent request (e.g. the cart reset a shared user needs
+    # more often when fewer workers share the tests) gets the last response served
+    # for its key again. `scope` names the worker in the placeholders of recorded requests.
+    def __init__(self, mode: str, interactions: Iterable[dict[str, Any]] = (), scope: str = "main"):
+        self.mode = mode
+        self.test = SESSION
+        self.recorded: list[dict[str, Any]] = []
+        self.masker = Masker(scope)
+        self.started = time.perf_counter()
+        self.interactions = list(interactions)
+        self.used = [False] * len(self.interactions)
+        self.by_test: dict[tuple[str, str], deque[int]] = {}
+        self.by_key: dict[str, deque[int]] = {}
+        for position, interaction in enumerate(self.interactions):
+            self.by_test.setdefault((interaction["test"], interaction["key"]), deque()).append(position)
+            self.by_key.setdefault(interaction["key"], deque()).append(position)
+        self.last_served: dict[str, int] = {}
+        self.replayed = 0
+        self.fallbacks = 0
+        self.misses: list[str] = []
+
+    def __call__(self, call: RequestCall, send: Send) -> APIResponse:
+        if self.mode == "replay":
+            return ReplayResponse(call.url, self.lookup(call))
+        response = send(call)
+        self.record(call, response.status, response.headers.get("content-type", ""), response.text())
+        return response
+
+    async def call_async(self, call: RequestCall, send: AsyncSend) -> AsyncAPIResponse:
+        if self.mode == "replay":
+            return AsyncReplayResponse(call.url, self.lookup(call))
+        response = await send(call)
+        self.record(call, response.status, response.headers.get("content-type", ""), await response.text())
+        return response
+
+    def record(self, call: RequestCall, status: int, content_type: str, body: str) -> None:
+        # The masked request and its offset in the worker's session let traffic_replay
+        # send the suite's traffic again; replay matching only uses "key".
+        offset = round(time.perf_counter() - self.started, 6)
+        request = self.masker.request(call)
+        self.recorded.append(
+            {
+                "test": self.test,
+                "key": request_key(call),
+                "status": status,
+                "content_type": content_type,
+                "body": self.masker.body(body),
+                "offset": offset,
+                "request": request,
+            }
+        )
+
+    def lookup(self, call: RequestCall) -> dict[str, Any]:
+        key = request_key(call)
+        position = _take(self.by_test.get((self.test, key)), self.used)
+        if position is None:
+            position = _take(self.by_key.get(key), self.used)
+            if position is None and call.method in IDEMPOTENT_METHODS:
+                position = self.last_served.get(key)
+            if position is None:
+                self.misses.append(f"{self.test}: {key}")
+                raise LookupError(f"No recorded response for {key} (test {self.test}); record the cassette again")
+            self.fallbacks += 1
+        self.used[position] = True
+        self.last_served[key] = position
+        self.replayed += 1
+        return self.interactions[position]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "recorded": len(self.recorded),
+            "replayed": self.replayed,
+            "fallbacks": self.fallbacks,
+            "misses": self.misses,
+        }
+
+
+def active_cassette(config: pytest.Config) -> Cassette | None:
+    return config.stash.get(CASSETTE, None)
+
+
+def _take(positions: deque[int] | None, used: list[bool]) -> int | None:
+    while positions:
+        position = positions.popleft()
+        if not used[position]:
+            return position
+    return None
+
+
+def load_cassette(path: Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    if not path.exists():
+        raise FileNotFoundError(f"Cassette not found: {path}; run the suite with --record first")
+    with path.open(encoding="utf-8") as cassette:
+        header = json.loads(cassette.readline())
+        if header.get("cassette") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette format in {path}: {header}")
+        return header, [json.loads(line) for line in cassette]
+
+
+def write_cassette(path: Path, seed: int, salt: str, recordings: Iterable[list[dict[str, Any]]]) -> int:
+    # One JSON object per line, grouped by test (each worker's order is kept within a test),
+    # so re-recording an unchanged suite produces a small diff.
+    interactions = sorted((entry for recorded in recordings for entry in recorded), key=lambda entry: entry["test"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as cassette:
+        header = {"cassette": CASSETTE_VERSION, "seed": seed, "salt": salt, "interactions": len(interactions)}
+        cassette.write(json.dumps(header) + "\n")
+        for entry in interactions:
+            cassette.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(temp_path, path)
+    return len(interactions)
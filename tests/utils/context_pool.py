@@ -0,0 +1,113 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from playwright.sync_api import APIRequestContext, APIResponse
+
+from tests.utils.untimed import untimed
+
+
+@dataclass
+class PoolStats:
+    contexts_created: int = 0
+    leases: int = 0
+    # Leases served by an idle context instead of a new one.
+    contexts_reused: int = 0
+    recycled: int = 0
+    # Time spent creating contexts (for the first one it includes starting the
+    # Playwright driver).
+    create_time_total: float = 0.0
+    create_time_max: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class RequestContextPool:
+    # thread_safe: whether the factory's contexts may be shared by threads
+    # (HttpRequestContext), which lets batch() send from its worker threads.
+    def __init__(self, factory: Callable[[], APIRequestContext], max_idle: int = 2, thread_safe: bool = False):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.thread_safe = thread_safe
+        self.idle: list[APIRequestContext] = []
+        self.stats = PoolStats()
+
+    @contextmanager
+    def lazy_lease(self) -> Iterator["LazyRequestContext"]:
+        lazy_context = LazyRequestContext(self)
+        try:
+            yield lazy_context
+        finally:
+            lazy_context.release()
+
+    def acquire(self) -> APIRequestContext:
+        self.stats.leases += 1
+        if self.idle:
+            self.stats.contexts_reused += 1
+            return self.idle.pop()
+        started = time.perf_counter()
+        request_context = self.factory()
+        created = time.perf_counter() - started
+        self.stats.contexts_created += 1
+        self.stats.create_time_total += created
+        self.stats.create_time_max = max(self.stats.create_time_max, created)
+        return request_context
+
+    def release(self, request_context: APIRequestContext, cookies_set: bool) -> None:
+        # Contexts carry no default headers, so cookies are the only state a test can
+        # leave behind; a context that picked some up is replaced instead of reused.
+        if len(self.idle) >= self.max_idle or cookies_set:
+            self.stats.recycled += 1
+            request_context.dispose()
+            return
+        self.idle.append(request_context)
+
+    def close(self) -> None:
+        while self.idle:
+            self.idle.pop().dispose()
+
+
+class LazyRequestContext:
+    # Leases from the pool on first use, so a test that never sends a request
+    # never creates a context (nor starts the Playwright driver). Responses going
+    # through fetch() are checked for Set-Cookie, so release() needs no round trip.
+    def __init__(self, pool: RequestContextPool):
+        self._pool = pool
+        self._request_context: APIRequestContext | None = None
+        self._lock = threading.Lock()
+        self.cookies_set = False
+
+    @property
+    def leased(self) -> bool:
+        return self._request_context is not None
+
+    @property
+    def thread_safe(self) -> bool:
+        return self._pool.thread_safe
+
+    def acquire(self) -> APIRequestContext:
+        if self._request_context is None:
+            # Batched threads of a thread-safe pool may all send first at once.
+            with untimed(), self._lock:
+                if self._request_context is None:
+                    self._request_context = self._pool.acquire()
+        return self._request_context
+
+    def fetch(self, url: str, method: str | None = None, **options: Any) -> APIResponse:
+        response = self.acquire().fetch(url, method=method, **options)
+        if any(name.lower() == "set-cookie" for name in response.headers):
+            self.cookies_set = True
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.acquire(), name)
+
+    def release(self) -> None:
+        if self._request_context is not None:
+            self._pool.release(self._request_context, self.cookies_set)
+            self._request_context = None
+            self.cookies_set = False
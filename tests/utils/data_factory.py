@@ -0,0 +1,206 @@
+import random
+import zlib
+from collections.abc import Sequence
+from typing import Any
+
+import pytest
+
+from tests.utils import worker_stats
+
+# Seeds are rendered as a fixed-width base-36 run tag, so every value a run
+# generates carries it and two runs with different seeds can never collide.
+SEED_LIMIT = 36**6
+# A random per-run salt follows the seed in the tag: a run replaying an earlier seed
+# against a persistent target would otherwise sign up the emails the earlier run left
+# behind (if its cleanup did not run) and get 400 "Este email já está sendo usado".
+SALT_LIMIT = 36**4
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+SEED = pytest.StashKey[int]()
+SALT = pytest.StashKey[str]()
+WORKER_FACTORY = pytest.StashKey["DataFactory"]()
+
+FIRST_NAMES = [
+    "Ana",
+    "Bruno",
+    "Carla",
+    "Diego",
+    "Eduarda",
+    "Felipe",
+    "Giovana",
+    "Henrique",
+    "Isabela",
+    "Joao",
+    "Larissa",
+    "Marcos",
+    "Natalia",
+    "Otavio",
+    "Paula",
+    "Rafael",
+]
+LAST_NAMES = [
+    "Silva",
+    "Santos",
+    "Oliveira",
+    "Souza",
+    "Lima",
+    "Pereira",
+    "Costa",
+    "Ferreira",
+    "Almeida",
+    "Ribeiro",
+    "Carvalho",
+    "Gomes",
+    "Martins",
+    "Rocha",
+    "Barbosa",
+    "Araujo",
+]
+PRODUCT_NAMES = [
+    "Mouse Gamer",
+    "Teclado Mecânico",
+    "Headset Pro",
+    "Webcam HD",
+    "Monitor UltraWide",
+    "SSD NVMe",
+    "Cadeira Gamer",
+    "Notebook",
+    "Smartphone",
+    "Caixa de Som",
+    "Roteador Wi-Fi",
+    "Pendrive",
+]
+PRODUCT_EDITIONS = ["Basic", "Plus", "Pro", "Max", "Lite", "Ultra", "Slim", "Turbo"]
+EMAIL_DOMAINS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.com.br"]
+
+EMAIL_NAMES = [name.lower() for name in FIRST_NAMES]
+FULL_NAMES = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+PRODUCT_TITLES = [f"{name} {edition}" for name in PRODUCT_NAMES for edition in PRODUCT_EDITIONS]
+
+
+def base36(number: int, width: int = 0) -> str:
+    digits = ""
+    while number:
+        number, remainder = divmod(number, 36)
+        digits = DIGITS[remainder] + digits
+    return digits.rjust(width, "0") or "0"
+
+
+def new_seed() -> int:
+    return random.SystemRandom().randrange(SEED_LIMIT)
+
+
+def new_salt() -> str:
+    return base36(random.SystemRandom().randrange(SALT_LIMIT), 4)
+
+
+def worker_namespace(worker_id: str) -> str:
+    # "gw3" -> "w3"; a run without xdist behaves like a single worker.
+    return "w" + (worker_id.removeprefix("gw") if worker_id.startswith("gw") else "0")
+
+
+def test_namespace(nodeid: str) -> str:
+    return "t" + base36(zlib.crc32(nodeid.encode("utf-8")), 7)
+
+
+class DataFactory:
+    # Same (seed, namespace) -> same sequence of values; only the salt in the unique
+    # suffixes changes between runs. Uniqueness does not rely on randomness: every unique
+    # value (emails, product and user names) ends in "<run tag><salt><namespace>n<counter>",
+    # and namespaces ("w3" per worker, "t<crc of node id>" per test) are distinct within a run.
+    def __init__(self, seed: int, namespace: str, salt: str | None = None):
+        self.seed = seed
+        self.namespace = namespace
+        self.salt = new_salt() if salt is None else salt
+        self.rng = random.Random(f"{seed}:{namespace}")
+        self.prefix = f"{base36(seed % SEED_LIMIT, 6)}{self.salt}{namespace}n"
+        self.counter = 0
+
+    def unique(self) -> str:
+        self.counter += 1
+        return f"{self.prefix}{self.counter}"
+
+    def name(self) -> str:
+        return f"{self.rng.choice(FULL_NAMES)} {self.unique()}"
+
+    def email(self) -> str:
+        return f"{self.rng.choice(EMAIL_NAMES)}.{self.unique()}@{self.rng.choice(EMAIL_DOMAINS)}"
+
+    def password(self) -> str:
+        return f"Senha@{self.rng.getrandbits(40):010x}"
+
+    def product_name(self) -> str:
+        return f"{self.rng.choice(PRODUCT_TITLES)} {self.unique()}"
+
+    def user(self, admin: bool = False, password: str | None = None) -> dict[str, Any]:
+        return self.users(1, admin=admin, password=password)[0]
+
+    def product(self, price: int | None = None, quantity: int | None = None) -> dict[str, Any]:
+        return self.products(1, price=price, quantity=quantity)[0]
+
+    def users(self, count: int, admin: bool = False, password: str | None = None) -> list[dict[str, Any]]:
+        rng = self.rng
+        names = rng.choices(FULL_NAMES, k=count)
+        locals_ = rng.choices(EMAIL_NAMES, k=count)
+        domains = rng.choices(EMAIL_DOMAINS, k=count)
+        passwords = [password] * count if password else [f"Senha@{rng.getrandbits(40):010x}" for _ in range(count)]
+        start = self.counter + 1
+        self.counter += count
+        prefix = self.prefix
+        administrador = "true" if admin else "false"
+        return [
+            {
+                "nome": f"{names[index]} {prefix}{start + index}",
+                "email": f"{locals_[index]}.{prefix}{start + index}@{domains[index]}",
+                "password": passwords[index],
+                "administrador": administrador,
+            }
+            for index in range(count)
+        ]
+
+    def products(self, count: int, price: int | None = None, quantity: int | None = None) -> list[dict[str, Any]]:
+        rng = self.rng
+        titles = rng.choices(PRODUCT_TITLES, k=count)
+        start = self.counter + 1
+        self.counter += count
+        prefix = self.prefix
+        return [
+            {
+                "nome": f"{titles[index]} {prefix}{start + index}",
+                "preco": price if price is not None else rng.randint(10, 5_000),
+                "descricao": f"{titles[index]} gerado para testes",
+                "quantidade": quantity if quantity is not None else rng.randint(1, 500),
+            }
+            for index in range(count)
+        ]
+
+    def cart(self, product_ids: Sequence[str], quantity: int | None = None) -> dict[str, Any]:
+        return self.carts([product_ids], quantity=quantity)[0]
+
+    def carts(self, product_ids: Sequence[Sequence[str]], quantity: int | None = None) -> list[dict[str, Any]]:
+        randint = self.rng.randint
+        return [
+            {
+                "produtos": [
+                    {"idProduto": product_id, "quantidade": quantity if quantity is not None else randint(1, 3)}
+                    for product_id in ids
+                ]
+            }
+            for ids in product_ids
+        ]
+
+
+def data_seed(config: pytest.Config) -> int:
+    return config.stash[SEED]
+
+
+def data_salt(config: pytest.Config) -> str:
+    return config.stash[SALT]
+
+
+def worker_data_factory(config: pytest.Config) -> DataFactory:
+    # Data that outlives a single test (pooled users) comes from the worker namespace.
+    if WORKER_FACTORY not in config.stash:
+        config.stash[WORKER_FACTORY] = DataFactory(
+            data_seed(config), worker_namespace(worker_stats.worker_id(config)), data_salt(config)
+        )
+    return config.stash[WORKER_FACTORY]
@@ -0,0 +1,292 @@
+import statistics
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import pytest
+from xdist.remote import Producer
+from xdist.report import report_collection_diff
+from xdist.workermanage import WorkerController, parse_tx_spec_config
+
+from tests.utils.timing_history import TimingHistory
+
+# The scheduler implements xdist's scheduler protocol and uses its helpers, which are not
+# a public API; requirements.txt pins the release it was written against, and any other
+# release falls back to xdist's own --dist=loadscope scheduler.
+XDIST_VERSION = "3.8."
+# Stored runs (same target and transport) a test's duration estimate is taken over.
+HISTORY_RUNS = 10
+DEFAULT_DURATION = 1.0
+# A worker must always know its next test (pytest needs it for teardown decisions).
+MIN_PENDING = 2
+# Weight of the newest run in a test's estimate; one noisy run should not reorder everything.
+SMOOTHING = 0.3
+
+
+@dataclass
+class TestHistory:
+    durations: dict[str, float] = field(default_factory=dict)
+    groups: dict[str, str | None] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, history: TimingHistory, base_url: str, transport: str) -> "TestHistory":
+        # The durations the timing_history plugin stored for this target and transport.
+        durations = {}
+        for nodeid, runs in history.test_durations(base_url, transport, HISTORY_RUNS).items():
+            # Exponential moving average of the runs, oldest first.
+            estimate = runs[0]
+            for duration in runs[1:]:
+                estimate += SMOOTHING * (duration - estimate)
+            durations[nodeid] = estimate
+        return cls(durations=durations, groups=history.test_groups())
+
+    def group_of(self, nodeid: str) -> str | None:
+        # Tests a previous run has not told us about (all of them on a fresh checkout or
+        # with --no-timing-history) stay in their --dist=loadscope scope: their class, or
+        # their module, since they may share class or module-scoped state.
+        if nodeid in self.groups:
+            return self.groups[nodeid]
+        return nodeid.rsplit("::", 1)[0]
+
+
+def own_duration(report: pytest.TestReport) -> float:
+    # The phase's duration without the shared start-up it paid for (session-scoped
+    # fixtures, the lazy driver and context): whichever test first needs them pays, and
+    # which one that is depends on the schedule.
+    return max(0.0, report.duration - getattr(report, "shared_setup", 0.0))
+
+
+def item_group(item: pytest.Item) -> str | None:
+    for mark in item.iter_markers("xdist_group"):
+        return "group:" + (mark.args[0] if mark.args else mark.kwargs.get("name", "default"))
+    scopes = {
+        fixturedefs[-1].scope for fixturedefs in item._fixtureinfo.name2fixturedefs.values() if fixturedefs
+    }
+    if "package" in scopes:
+        return item.nodeid.rpartition("/")[0] or "."
+    if "module" in scopes:
+        return item.nodeid.partition("::")[0]
+    if "class" in scopes:
+        cls = item.getparent(pytest.Class)
+        return cls.nodeid if cls is not None else item.nodeid.partition("::")[0]
+    return None
+
+
+@dataclass
+class Unit:
+    key: str
+    indices: list[int]
+    cost: float
+
+
+class DurationScheduling:
+    # Units (a test, or the tests that must share a worker) are assigned up front,
+    # longest-processing-time first, each to the worker with the least estimated work.
+    # Estimates are only estimates, so a worker that runs dry near the end steals whole,
+    # not yet started units from the worker with the most estimated work left.
+    def __init__(self, config: pytest.Config, log: Producer | None = None, history: TestHistory | None = None):
+        self.config = config
+        self.log = log.durationsched if log is not None else Producer("durationsched")
+        self.history = history or TestHistory()
+        self.numnodes = len(parse_tx_spec_config(config))
+        self.node2collection: dict[WorkerController, list[str]] = {}
+        self.node2pending: dict[WorkerController, list[int]] = {}
+        self.collection: list[str] | None = None
+        self.queue: list[Unit] = []
+        self.unit_of: dict[int, Unit] = {}
+        self.costs: list[float] = []
+        self.steal_requested_from_node: WorkerController | None = None
+        self.stolen_units = 0
+        self.busy: dict[str, float] = {}
+
+    @property
+    def nodes(self) -> list[WorkerController]:
+        return list(self.node2pending)
+
+    @property
+    def collection_is_completed(self) -> bool:
+        return len(self.node2collection) >= self.numnodes
+
+    @property
+    def tests_finished(self) -> bool:
+        if not self.collection_is_completed or self.queue or self.steal_requested_from_node is not None:
+            return False
+        return all(len(pending) < MIN_PENDING for pending in self.node2pending.values())
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.queue) or any(self.node2pending.values())
+
+    def add_node(self, node: WorkerController) -> None:
+        assert node not in self.node2pending
+        self.node2pending[node] = []
+
+    def add_node_collection(self, node: WorkerController, collection: Sequence[str]) -> None:
+        assert node in self.node2pending
+        if self.collection_is_completed:
+            assert self.collection
+            if collection != self.collection:
+                other = next(iter(self.node2collection))
+                self.log(report_collection_diff(self.collection, collection, other.gateway.id, node.gateway.id))
+                return
+        self.node2collection[node] = list(collection)
+
+    def mark_test_complete(self, node: WorkerController, item_index: int, duration: float = 0) -> None:
+        self.node2pending[node].remove(item_index)
+        self.busy[node.gateway.id] = self.busy.get(node.gateway.id, 0.0) + duration
+        self.check_schedule()
+
+    def mark_test_pending(self, item: str) -> None:
+        assert self.collection is not None
+        index = self.collection.index(item)
+        self._enqueue([Unit(item, [index], self.costs[index])])
+        self.check_schedule()
+
+    def remove_pending_tests_from_node(self, node: WorkerController, indices: Sequence[int]) -> None:
+        assert node is self.steal_requested_from_node
+        self.steal_requested_from_node = None
+        returned = set(indices)
+        self.node2pending[node] = [index for index in self.node2pending[node] if index not in returned]
+        units = self._units_for(indices)
+        self.stolen_units += len(units)
+        self._enqueue(units)
+        self.check_schedule()
+
+    def remove_node(self, node: WorkerController) -> str | None:
+        pending = self.node2pending.pop(node)
+        crashitem = None
+        if pending:
+            assert self.collection is not None
+            crashitem = self.collection[pending.pop(0)]
+        self._enqueue(self._units_for(pending))
+        if self.steal_requested_from_node is node:
+            self.steal_requested_from_node = None
+        self.check_schedule()
+        return crashitem
+
+    def schedule(self) -> None:
+        assert self.collection_is_completed
+        if self.collection is not None:
+            self.check_schedule()
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+        self.collection = next(iter(self.node2collection.values()))
+        if not self.collection:
+            return
+        known = [self.history.durations[nodeid] for nodeid in self.collection if nodeid in self.history.durations]
+        default = statistics.median(known) if known else DEFAULT_DURATION
+        self.costs = [self.history.durations.get(nodeid, default) for nodeid in self.collection]
+
+        grouped: dict[str, Unit] = {}
+        units = []
+        for index, nodeid in enumerate(self.collection):
+            key = self.history.group_of(nodeid)
+            if key is None:
+                units.append(Unit(nodeid, [index], self.costs[index]))
+                continue
+            unit = grouped.get(key)
+            if unit is None:
+                unit = grouped[key] = Unit(key, [], 0.0)
+                units.append(unit)
+            unit.indices.append(index)
+            unit.cost += self.costs[index]
+        self._register(units)
+        loads = {node: 0.0 for node in self.nodes}
+        assigned: dict[WorkerController, list[int]] = {node: [] for node in self.nodes}
+        for unit in sorted(units, key=lambda unit: unit.cost, reverse=True):
+            node = min(loads, key=loads.__getitem__)
+            loads[node] += unit.cost
+            assigned[node].extend(unit.indices)
+        for node, indices in assigned.items():
+            if indices:
+                self.node2pending[node].extend(indices)
+                node.send_runtest_some(indices)
+        self.check_schedule()
+
+    def check_schedule(self) -> None:
+        nodes_up = [node for node in self.node2pending if not node.shutting_down]
+        hungry = [node for node in nodes_up if len(self.node2pending[node]) < MIN_PENDING]
+        if not hungry:
+            return
+        # Returned or stolen units go to the least loaded hungry workers, longest first.
+        for node in sorted(hungry, key=self._remaining):
+            while self.queue and len(self.node2pending[node]) < MIN_PENDING:
+                self._send(node, self.queue.pop(0))
+        hungry = [node for node in hungry if len(self.node2pending[node]) < MIN_PENDING]
+        if not hungry or self.steal_requested_from_node is not None:
+            return
+
+        victim, stolen = self._pick_steal(nodes_up)
+        if not stolen:
+            for node in hungry:
+                node.shutdown()
+            return
+        victim.send_steal(stolen)
+        self.steal_requested_from_node = victim
+
+    def _pick_steal(self, nodes: list[WorkerController]) -> tuple[WorkerController | None, list[int]]:
+        best: tuple[float, WorkerController | None, list[int]] = (0.0, None, [])
+        for node in nodes:
+            pending = self.node2pending[node]
+            running = set(pending[:MIN_PENDING])
+            candidates = []
+            for unit in self._units_for(pending):
+                if running.isdisjoint(unit.indices) and all(index in pending for index in unit.indices):
+                    candidates.append(unit)
+            # Take units from the back of the queue until roughly half the work moves.
+            half = self._remaining(node) / 2
+            taken: list[int] = []
+            moved = 0.0
+            for unit in reversed(candidates):
+                if moved + unit.cost > half and taken:
+                    break
+                taken.extend(unit.indices)
+                moved += unit.cost
+            if taken and moved < self._remaining(node) and moved > best[0]:
+                best = (moved, node, taken)
+        return best[1], best[2]
+
+    def _remaining(self, node: WorkerController) -> float:
+        return sum(self.costs[index] for index in self.node2pending[node])
+
+    def _units_for(self, indices: Sequence[int]) -> list[Unit]:
+        units: list[Unit] = []
+        wanted = set(indices)
+        for index in indices:
+            unit = self.unit_of[index]
+            if unit in units:
+                continue
+            part = [member for member in unit.indices if member in wanted]
+            if len(part) == len(unit.indices):
+                units.append(unit)
+            else:
+                # Only part of a unit is left (the rest ran or is running): it becomes its own unit.
+                units.append(Unit(unit.key, part, sum(self.costs[member] for member in part)))
+        return units
+
+    def _register(self, units: list[Unit]) -> None:
+        for unit in units:
+            for index in unit.indices:
+                self.unit_of[index] = unit
+
+    def _enqueue(self, units: list[Unit]) -> None:
+        self._register(units)
+        self.queue.extend(units)
+        self.queue.sort(key=lambda unit: unit.cost, reverse=True)
+
+    def _send(self, node: WorkerController, unit: Unit) -> None:
+        self.node2pending[node].extend(unit.indices)
+        node.send_runtest_some(unit.indices)
+
+    def _check_nodes_have_same_collection(self) -> bool:
+        (first_node, first), *others = self.node2collection.items()
+        same = True
+        for node, collection in others:
+            message = report_collection_diff(first, collection, first_node.gateway.id, node.gateway.id)
+            if message:
+                same = False
+                self.log(message)
+                report = pytest.CollectReport(nodeid=node.gateway.id, outcome="failed", longrepr=message, result=[])
+                self.config.hook.pytest_collectreport(report=report)
+        return same
@@ -1,42 +1,32 @@
-import random
-import re
-import uuid
-
-FIRST_NAMES = [
-    "Ana",
-    "Bruno",
-    "Carla",
-    "Diego",
-    "Eduarda",
-    "Felipe",
-    "Giovana",
-    "Henrique",
-]
-
-PRODUCT_NAMES = [
-    "Mouse Gamer",
-    "Teclado Mecânico",
-    "Headset Pro",
-    "Webcam HD",
-    "Monitor UltraWide",
-    "SSD NVMe",
-]
+import os
+
+from tests.utils.data_factory import DataFactory, new_seed, worker_namespace
+
+# The data_seed plugin swaps in a seeded factory per test; outside pytest
+# (benchmarks, scripts) a randomly seeded per-process factory is used.
+_factory = DataFactory(new_seed(), worker_namespace(os.getenv("PYTEST_XDIST_WORKER", "")))
+
+
+def use_factory(factory: DataFactory) -> None:
+    global _factory
+    _factory = factory
+
+
+def current_factory() -> DataFactory:
+    return _factory
 
 
 def random_name() -> str:
-    return f"{random.choice(FIRST_NAMES)} {uuid.uuid4().hex[:6]}"
+    return _factory.name()
 
 
 def random_product() -> str:
-    return f"{random.choice(PRODUCT_NAMES)} {uuid.uuid4().hex[:8]}"
+    return _factory.product_name()
 
 
 def random_email() -> str:
-    first_name = random.choice(FIRST_NAMES).lower()
-    sanitized = re.sub(r"[^a-z0-9]", "", first_name)
-    suffix = uuid.uuid4().hex[:8]
-    return f"{sanitized}.{suffix}@gmail.com"
+    return _factory.email()
 
 
 def random_password() -> str:
-    return f"Senha@{uuid.uuid4().hex[:10]}"
+    return _factory.password()
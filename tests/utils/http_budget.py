@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+
+import pytest
+
+from tests.utils.instrumentation import RequestRecord
+
+DEFAULT_MAX_REQUESTS = 10
+DEFAULT_MAX_BYTES = 1024 * 1024
+ACTIONS = ("fail", "warn", "off")
+
+
+class HttpBudgetWarning(pytest.PytestWarning):
+    pass
+
+
+@dataclass(frozen=True)
+class HttpBudget:
+    # Requests (and request + response bytes) a test may make in setup and call.
+    # None means unlimited. The global defaults only ever warn: response sizes depend
+    # on what else is stored on the target, so they cannot fail a test on their own.
+    max_requests: int | None = DEFAULT_MAX_REQUESTS
+    max_bytes: int | None = DEFAULT_MAX_BYTES
+
+    @classmethod
+    def declared(cls, item: pytest.Item) -> "HttpBudget":
+        # Only the limits @pytest.mark.http_budget(max_requests=..., max_bytes=...) sets;
+        # the closest marker (function over class over module) wins.
+        limits = _marker_limits(item)
+        return cls(max_requests=limits.get("max_requests"), max_bytes=limits.get("max_bytes"))
+
+    @classmethod
+    def for_item(cls, item: pytest.Item, default: "HttpBudget") -> "HttpBudget":
+        # The marker's limits, with the global default for the ones it leaves out.
+        limits = _marker_limits(item)
+        return cls(
+            max_requests=limits.get("max_requests", default.max_requests),
+            max_bytes=limits.get("max_bytes", default.max_bytes),
+        )
+
+    def violations(self, records: list[RequestRecord]) -> list[str]:
+        used_bytes = sum(record.bytes_sent + record.bytes_received for record in records)
+        found = []
+        if self.max_requests is not None and len(records) > self.max_requests:
+            found.append(f"{len(records)} requests (budget {self.max_requests})")
+        if self.max_bytes is not None and used_bytes > self.max_bytes:
+            found.append(f"{used_bytes} bytes (budget {self.max_bytes})")
+        return found
+
+
+def _marker_limits(item: pytest.Item) -> dict[str, int | None]:
+    marker = item.get_closest_marker("http_budget")
+    if marker is None:
+        return {}
+    unknown = set(marker.kwargs) - {"max_requests", "max_bytes"}
+    if marker.args or unknown:
+        raise pytest.UsageError(f"{item.nodeid}: http_budget only takes max_requests= and max_bytes= keyword arguments")
+    return dict(marker.kwargs)
+
+
+def budget_report(nodeid: str, violations: list[str], records: list[RequestRecord]) -> str:
+    lines = [f"{nodeid} is over its HTTP budget: {', '.join(violations)}"]
+    lines.append(f"{'phase':<7}{'method':<7}{'status':>6}{'ms':>8}{'bytes':>8}  endpoint")
+    for record in records:
+        lines.append(
+            f"{record.phase:<7}{record.method:<7}{record.status:>6}{record.duration * 1000:>8.1f}"
+            f"{record.bytes_sent + record.bytes_received:>8}  {record.endpoint}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+import re
+import statistics
+import time
+from dataclasses import astuple, dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from playwright.async_api import APIResponse as AsyncAPIResponse
+from playwright.sync_api import APIResponse
+
+from tests.utils.request_middleware import AsyncSend, RequestCall, Send
+from tests.utils.untimed import untimed_seconds
+
+ID_SEGMENT = re.compile(r"[A-Za-z0-9]{16}")
+RECORDER = pytest.StashKey["RequestRecorder"]()
+
+
+def endpoint_template(url: str) -> str:
+    parts = urlsplit(url)
+    segments = ["{id}" if ID_SEGMENT.fullmatch(segment) else segment for segment in parts.path.split("/")]
+    template = "/".join(segments) or "/"
+    keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    if keys:
+        template += "?" + "&".join(f"{key}={{}}" for key in keys)
+    return template
+
+
+def request_size(options: dict[str, Any]) -> int:
+    data = options.get("data")
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    if isinstance(data, bytes):
+        return len(data)
+    return 0
+
+
+def response_size(response: APIResponse | AsyncAPIResponse) -> int:
+    # Content-Length comes with the response metadata; reading body() would cost
+    # another round trip to the driver just to count bytes.
+    length = response.headers.get("content-length")
+    return int(length) if length and length.isdigit() else 0
+
+
+@dataclass
+class RequestRecord:
+    test: str
+    phase: str
+    method: str
+    endpoint: str
+    status: int
+    duration: float
+    bytes_sent: int
+    bytes_received: int
+
+
+class RequestRecorder:
+    def __init__(self):
+        self.records: list[RequestRecord] = []
+        self.by_test: dict[str, list[RequestRecord]] = {}
+        self.tests: dict[str, dict[str, float]] = {}
+        self.test = "<session>"
+        self.phase = "setup"
+
+    def __call__(self, call: RequestCall, send: Send) -> APIResponse:
+        # Leasing the context or spawning the driver on the way down is not request latency.
+        untimed_before = untimed_seconds()
+        started = time.perf_counter()
+        response = None
+        try:
+            response = send(call)
+            return response
+        finally:
+            duration = time.perf_counter() - started - (untimed_seconds() - untimed_before)
+            self._record(call, duration, response, self.test, self.phase)
+
+    async def call_async(self, call: RequestCall, send: AsyncSend) -> AsyncAPIResponse:
+        # Attributed to the test and phase running when the request was started.
+        test, phase = self.test, self.phase
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await send(call)
+            return response
+        finally:
+            self._record(call, time.perf_counter() - started, response, test, phase)
+
+    def _record(
+        self,
+        call: RequestCall,
+        duration: float,
+        response: APIResponse | AsyncAPIResponse | None,
+        test: str,
+        phase: str,
+    ) -> None:
+        self._append(
+            RequestRecord(
+                test=test,
+                phase=phase,
+                method=call.method,
+                endpoint=endpoint_template(call.url),
+                status=response.status if response is not None else 0,
+                duration=duration,
+                bytes_sent=request_size(call.options),
+                bytes_received=response_size(response) if response is not None else 0,
+            )
+        )
+
+    def _append(self, record: RequestRecord) -> None:
+        self.records.append(record)
+        self.by_test.setdefault(record.test, []).append(record)
+
+    def begin(self, test: str, phase: str) -> None:
+        self.test = test
+        self.phase = phase
+
+    def end(self, duration: float) -> None:
+        timings = self.tests.setdefault(self.test, {"setup": 0.0, "call": 0.0, "teardown": 0.0})
+        timings[self.phase] += duration
+
+    def records_for(self, test: str) -> list[RequestRecord]:
+        return self.by_test.get(test, [])
+
+    def export(self) -> dict[str, Any]:
+        return {"records": [list(astuple(record)) for record in self.records], "tests": self.tests}
+
+
+def request_recorder(config: pytest.Config) -> RequestRecorder:
+    if RECORDER not in config.stash:
+        config.stash[RECORDER] = RequestRecorder()
+    return config.stash[RECORDER]
+
+
+def merge_exports(exports: list[dict[str, Any]]) -> tuple[list[RequestRecord], dict[str, dict[str, float]]]:
+    records = []
+    tests = {}
+    for export in exports:
+        records.extend(RequestRecord(*row) for row in export["records"])
+        tests.update(export["tests"])
+    return records, tests
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(fraction * 100) - 1]
+
+
+def endpoint_summary(records: list[RequestRecord]) -> list[dict[str, Any]]:
+    grouped: dict[tuple[str, str], list[RequestRecord]] = {}
+    for record in records:
+        grouped.setdefault((record.method, record.endpoint), []).append(record)
+    rows = []
+    for (method, endpoint), group in grouped.items():
+        durations = [record.duration for record in group]
+        rows.append(
+            {
+                "method": method,
+                "endpoint": endpoint,
+                "count": len(group),
+                "p50": percentile(durations, 0.50),
+                "p95": percentile(durations, 0.95),
+                "p99": percentile(durations, 0.99),
+                "total": sum(durations),
+                "bytes_sent": sum(record.bytes_sent for record in group),
+                "bytes_received": sum(record.bytes_received for record in group),
+            }
+        )
+    return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+
+def per_test_summary(records: list[RequestRecord], tests: dict[str, dict[str, float]]) -> list[dict[str, Any]]:
+    by_test: dict[str, list[RequestRecord]] = {}
+    for record in records:
+        by_test.setdefault(record.test, []).append(record)
+    rows = []
+    for test, timings in tests.items():
+        requests = by_test.get(test, [])
+        rows.append(
+            {
+                "test": test,
+                "setup": timings["setup"],
+                "call": timings["call"],
+                "setup_requests": sum(1 for record in requests if record.phase == "setup"),
+                "call_requests": sum(1 for record in requests if record.phase == "call"),
+                "setup_request_time": sum(record.duration for record in requests if record.phase == "setup"),
+                "call_request_time": sum(record.duration for record in requests if record.phase == "call"),
+            }
+        )
+    return sorted(rows, key=lambda row: row["setup"] + row["call"], reverse=True)
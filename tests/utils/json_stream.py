@@ -0,0 +1,141 @@
+import codecs
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+CHUNK_SIZE = 64 * 1024
+LIST_KEYS = ("usuarios", "produtos", "carrinhos")
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+_decoder = json.JSONDecoder()
+
+
+class ListStream:
+    # Items of the list array in a ServeRest listing ({"quantidade": 2, "usuarios": [...]}),
+    # parsed lazily, one at a time, from CHUNK_SIZE pieces of the body. The caller still
+    # holds the whole body as bytes (of() slices it without copying); what is never built
+    # is the decoded text of the whole body or the full list of dicts.
+    # The first top-level key in `keys` holding an array is streamed; every other
+    # top-level value read so far is kept in `fields`. Breaking out of the loop stops
+    # parsing, so a search for one item only reads the body up to that item.
+    def __init__(self, chunks: Iterable[bytes], keys: Sequence[str] = LIST_KEYS):
+        self.keys = tuple(keys)
+        self.key: str | None = None
+        self.fields: dict[str, Any] = {}
+        self.count = 0
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+        self._started = False
+
+    @classmethod
+    def of(cls, body: bytes, keys: Sequence[str] = LIST_KEYS, chunk_size: int = CHUNK_SIZE) -> "ListStream":
+        view = memoryview(body)
+        return cls((view[start : start + chunk_size] for start in range(0, len(view), chunk_size)), keys)
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._started:
+            raise RuntimeError("A ListStream can only be iterated once")
+        self._started = True
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+        else:
+            yield from self._members()
+        if self._peek() is not None:
+            raise self._error("Extra data")
+
+    def _members(self) -> Iterator[Any]:
+        while True:
+            name = self._value()
+            if not isinstance(name, str):
+                raise self._error("Expecting property name enclosed in double quotes")
+            self._expect(":")
+            if self.key is None and name in self.keys and self._peek() == "[":
+                self.key = name
+                self._pos += 1
+                yield from self._items()
+            else:
+                self.fields[name] = self._value()
+            if self._separator("}"):
+                return
+
+    def _items(self) -> Iterator[Any]:
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            item = self._value()
+            self.count += 1
+            yield item
+            if self._separator("]"):
+                return
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut at the end of a chunk ("12" of "123", "3." of "3.5") still decodes
+            # as a shorter one; read on until something that cannot extend it follows.
+            if _may_continue(self._buffer, end, value) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _separator(self, closing: str) -> bool:
+        char = self._peek()
+        if char == ",":
+            self._pos += 1
+            return False
+        if char == closing:
+            self._pos += 1
+            return True
+        raise self._error(f"Expecting ',' delimiter or '{closing}'")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def _peek(self) -> str | None:
+        # Next non-whitespace character (not consumed), or None at the end of the body.
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer):
+                return buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def _fill(self) -> bool:
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            text = self._decode(b"", final=True)
+            if not text:
+                return False
+        else:
+            text = self._decode(chunk)
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+
+def _may_continue(buffer: str, end: int, value: Any) -> bool:
+    if type(value) not in (int, float):
+        return False
+    return all(char in NUMBER_CHARS for char in buffer[end:])
@@ -0,0 +1,127 @@
+import operator
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlencode
+
+from tests.utils.json_stream import LIST_KEYS, ListStream
+from tests.utils.serverest_contract import (
+    CART_QUERY_FIELDS,
+    PRODUCT_QUERY_FIELDS,
+    USER_QUERY_FIELDS,
+)
+from tests.utils.transport import ApiRequestContext, ApiResponse
+
+# Filters each listing endpoint can apply on the server.
+SERVER_FILTERS = {
+    "/usuarios": USER_QUERY_FIELDS,
+    "/produtos": PRODUCT_QUERY_FIELDS,
+    "/carrinhos": CART_QUERY_FIELDS,
+}
+OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, options: value in options,
+    "contains": lambda value, part: part in value,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    op: str
+    value: Any
+
+    def matches(self, item: dict[str, Any]) -> bool:
+        if self.field not in item:
+            return False
+        try:
+            return OPERATORS[self.op](item[self.field], self.value)
+        except TypeError:
+            return False
+
+
+@dataclass
+class QueryResult:
+    response: ApiResponse
+    items: list[dict[str, Any]]
+    params: dict[str, Any]
+    rows_received: int
+    bytes_received: int
+    # Only known with fetch(..., compare=True), which also downloads the unfiltered listing;
+    # meant for benchmarks (list_query_admins_server_filter), not for functional tests.
+    bytes_saved: int | None = None
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+@dataclass
+class ListQuery:
+    # Filters for a list endpoint. Equality on a field ServeRest filters by goes into the
+    # query string, so only matching rows are sent and parsed; every other condition is
+    # checked client-side while the streamed items are read, in a single pass.
+    endpoint: str
+    conditions: list[Condition] = field(default_factory=list)
+    predicates: list[Callable[[dict[str, Any]], bool]] = field(default_factory=list)
+
+    def where(self, name: str, op: str, value: Any) -> "ListQuery":
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported operator {op!r}; expected one of {list(OPERATORS)}")
+        self.conditions.append(Condition(name, op, value))
+        return self
+
+    def filter(self, predicate: Callable[[dict[str, Any]], bool]) -> "ListQuery":
+        self.predicates.append(predicate)
+        return self
+
+    def plan(self) -> tuple[dict[str, Any], list[Condition]]:
+        # (query params, conditions left for the client)
+        server_fields = SERVER_FILTERS.get(self.endpoint, {})
+        params: dict[str, Any] = {}
+        client: list[Condition] = []
+        for condition in self.conditions:
+            kind = server_fields.get(condition.field)
+            if condition.op == "==" and type(condition.value) is kind and condition.field not in params:
+                params[condition.field] = condition.value
+            else:
+                client.append(condition)
+        return params, client
+
+    def url(self, params: dict[str, Any]) -> str:
+        return f"{self.endpoint}?{urlencode(params)}" if params else self.endpoint
+
+    def fetch(self, request: ApiRequestContext, compare: bool = False) -> QueryResult:
+        params, client = self.plan()
+        response = request.get(self.url(params))
+        body = response.body()
+        stream = ListStream.of(body, _list_keys(self.endpoint))
+        items = list(self._matching(stream, client))
+        bytes_saved = None
+        if compare:
+            bytes_saved = len(request.get(self.endpoint).body()) - len(body) if params else 0
+        return QueryResult(response, items, params, stream.count, len(body), bytes_saved)
+
+    def first(self, request: ApiRequestContext) -> dict[str, Any] | None:
+        # Stops reading the listing at the first match.
+        params, client = self.plan()
+        stream = ListStream.of(request.get(self.url(params)).body(), _list_keys(self.endpoint))
+        return next(self._matching(stream, client), None)
+
+    def _matching(self, stream: ListStream, client: list[Condition]) -> Iterator[dict[str, Any]]:
+        predicates = self.predicates
+        for item in stream:
+            if all(condition.matches(item) for condition in client) and all(test(item) for test in predicates):
+                yield item
+
+
+def _list_keys(endpoint: str) -> tuple[str, ...]:
+    key = endpoint.strip("/")
+    return (key,) if key in LIST_KEYS else LIST_KEYS
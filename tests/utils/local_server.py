@@ -0,0 +1,132 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+from tests.utils.local_store import Result, ServeRestStore
+
+MSG_INVALID_JSON = (
+    "Adicione aspas em todos os valores. "
+    "Para mais informações acesse a issue https://github.com/ServeRest/ServeRest/issues/225"
+)
+
+
+def _routes(store: ServeRestStore) -> list[tuple[str, re.Pattern, Any]]:
+    return [
+        ("POST", re.compile(r"/login"), lambda m, q, b, a: store.login(b)),
+        ("GET", re.compile(r"/usuarios"), lambda m, q, b, a: store.list_users(q)),
+        ("POST", re.compile(r"/usuarios"), lambda m, q, b, a: store.create_user(b)),
+        ("GET", re.compile(r"/usuarios/([^/]+)"), lambda m, q, b, a: store.get_user(m[1])),
+        ("PUT", re.compile(r"/usuarios/([^/]+)"), lambda m, q, b, a: store.update_user(m[1], b)),
+        ("DELETE", re.compile(r"/usuarios/([^/]+)"), lambda m, q, b, a: store.delete_user(m[1])),
+        ("GET", re.compile(r"/produtos"), lambda m, q, b, a: store.list_products(q)),
+        ("POST", re.compile(r"/produtos"), lambda m, q, b, a: store.create_product(b, a)),
+        ("GET", re.compile(r"/produtos/([^/]+)"), lambda m, q, b, a: store.get_product(m[1])),
+        ("PUT", re.compile(r"/produtos/([^/]+)"), lambda m, q, b, a: store.update_product(m[1], b, a)),
+        ("DELETE", re.compile(r"/produtos/([^/]+)"), lambda m, q, b, a: store.delete_product(m[1], a)),
+        ("GET", re.compile(r"/carrinhos"), lambda m, q, b, a: store.list_carts(q)),
+        ("POST", re.compile(r"/carrinhos"), lambda m, q, b, a: store.create_cart(b, a)),
+        ("DELETE", re.compile(r"/carrinhos/concluir-compra"), lambda m, q, b, a: store.conclude_purchase(a)),
+        ("DELETE", re.compile(r"/carrinhos/cancelar-compra"), lambda m, q, b, a: store.cancel_purchase(a)),
+        ("GET", re.compile(r"/carrinhos/([^/]+)"), lambda m, q, b, a: store.get_cart(m[1])),
+    ]
+
+
+class ServeRestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "LocalServeRest"
+
+    def do_GET(self) -> None:
+        self._dispatch()
+
+    def do_POST(self) -> None:
+        self._dispatch()
+
+    def do_PUT(self) -> None:
+        self._dispatch()
+
+    def do_DELETE(self) -> None:
+        self._dispatch()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        status, body = self._handle(path, dict(parse_qsl(url.query, keep_blank_values=True)), raw_body)
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, path: str, query: dict[str, str], raw_body: bytes) -> Result:
+        path_matched = False
+        for method, pattern, handler in self.server.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            path_matched = True
+            if method != self.command:
+                continue
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+            except ValueError:
+                return 400, {"message": MSG_INVALID_JSON}
+            return handler(match, query, body, self.headers.get("Authorization"))
+        status = 405 if path_matched else 404
+        message = (
+            f"Não é possível realizar {self.command} em {path}. "
+            "Acesse https://serverest.dev para ver as rotas disponíveis e como utilizá-las."
+        )
+        return status, {"message": message}
+
+
+class LocalServeRest(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, store: ServeRestStore | None = None):
+        super().__init__((host, port), ServeRestHandler)
+        self.store = store or ServeRestStore()
+        self.routes = _routes(self.store)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalServeRest":
+        self._thread = threading.Thread(target=self.serve_forever, name="local-serverest", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def start_local_server(host: str = "127.0.0.1", port: int = 0) -> LocalServeRest:
+    return LocalServeRest(host, port).start()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the in-memory ServeRest stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    args = parser.parse_args()
+
+    server = LocalServeRest(args.host, args.port)
+    print(f"ServeRest stand-in listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,489 @@
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import string
+import threading
+import time
+from typing import Any
+
+from tests.utils.serverest_contract import (
+    CART_QUERY_FIELDS,
+    ID_PATTERN,
+    PRODUCT_QUERY_FIELDS,
+    USER_QUERY_FIELDS,
+)
+
+TOKEN_TTL_SECONDS = 600
+ID_ALPHABET = string.ascii_letters + string.digits
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s.]+(\.[^@\s.]+)*\.[A-Za-z]{2,}")
+
+MSG_CREATED = "Cadastro realizado com sucesso"
+MSG_UPDATED = "Registro alterado com sucesso"
+MSG_DELETED = "Registro excluído com sucesso"
+MSG_NOTHING_DELETED = "Nenhum registro excluído"
+MSG_LOGIN_OK = "Login realizado com sucesso"
+MSG_LOGIN_FAILED = "Email e/ou senha inválidos"
+MSG_TOKEN_INVALID = "Token de acesso ausente, inválido, expirado ou usuário do token não existe mais"
+MSG_ADMIN_ONLY = "Rota exclusiva para administradores"
+MSG_EMAIL_TAKEN = "Este email já está sendo usado"
+MSG_USER_NOT_FOUND = "Usuário não encontrado"
+MSG_USER_HAS_CART = "Não é permitido excluir usuário com carrinho cadastrado"
+MSG_PRODUCT_NAME_TAKEN = "Já existe produto com esse nome"
+MSG_PRODUCT_NOT_FOUND = "Produto não encontrado"
+MSG_PRODUCT_IN_CART = "Não é permitido excluir produto que faz parte de carrinho"
+MSG_CART_NOT_FOUND = "Carrinho não encontrado"
+MSG_CART_LIMIT = "Não é permitido ter mais de 1 carrinho"
+MSG_CART_DUPLICATED_PRODUCT = "Não é permitido possuir produto duplicado"
+MSG_CART_NO_STOCK = "Produto não possui quantidade suficiente"
+MSG_CART_MISSING = "Não foi encontrado carrinho para esse usuário"
+MSG_CART_CANCELLED = "Registro excluído com sucesso. Estoque dos produtos reabastecido"
+MSG_INVALID_ID = "id deve ter exatamente 16 caracteres alfanuméricos"
+
+SEED_USERS = [
+    {
+        "nome": "Fulano da Silva",
+        "email": "fulano@qa.com",
+        "password": "teste",
+        "administrador": "true",
+        "_id": "0uxuPY0cbmQhpEz1",
+    },
+]
+SEED_PRODUCTS = [
+    {
+        "nome": "Logitech MX Vertical",
+        "preco": 470,
+        "descricao": "Mouse",
+        "quantidade": 382,
+        "_id": "BeeJh5lz3k6kSIzA",
+    },
+    {
+        "nome": "Samsung 60 polegadas",
+        "preco": 5240,
+        "descricao": "TV",
+        "quantidade": 49,
+        "_id": "K6leHdftCeOJj8BJ",
+    },
+]
+
+Result = tuple[int, dict[str, Any]]
+
+
+class IndexedCollection:
+    def __init__(self, unique_field: str | None = None):
+        self.unique_field = unique_field
+        self.by_id: dict[str, dict[str, Any]] = {}
+        self.by_unique: dict[Any, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, record_id: str) -> dict[str, Any] | None:
+        return self.by_id.get(record_id)
+
+    def find_unique(self, value: Any) -> dict[str, Any] | None:
+        record_id = self.by_unique.get(value)
+        return None if record_id is None else self.by_id[record_id]
+
+    def insert(self, record: dict[str, Any]) -> None:
+        self.by_id[record["_id"]] = record
+        if self.unique_field:
+            self.by_unique[record[self.unique_field]] = record["_id"]
+
+    def replace(self, record: dict[str, Any]) -> None:
+        self.delete(record["_id"])
+        self.insert(record)
+
+    def delete(self, record_id: str) -> dict[str, Any] | None:
+        record = self.by_id.pop(record_id, None)
+        if record is not None and self.unique_field:
+            self.by_unique.pop(record[self.unique_field], None)
+        return record
+
+    def filter(self, query: dict[str, Any]) -> list[dict[str, Any]]:
+        if "_id" in query:
+            record = self.by_id.get(query["_id"])
+            candidates = [] if record is None else [record]
+        elif self.unique_field and self.unique_field in query:
+            record = self.find_unique(query[self.unique_field])
+            candidates = [] if record is None else [record]
+        else:
+            candidates = self.by_id.values()
+        return [dict(record) for record in candidates if all(record.get(k) == v for k, v in query.items())]
+
+
+class ServeRestStore:
+    def __init__(self, secret: str | None = None, seed: bool = True):
+        self.secret = (secret or "".join(random.choices(ID_ALPHABET, k=32))).encode()
+        self.lock = threading.RLock()
+        self.usuarios = IndexedCollection(unique_field="email")
+        self.produtos = IndexedCollection(unique_field="nome")
+        self.carrinhos = IndexedCollection(unique_field="idUsuario")
+        self.carts_by_product: dict[str, set[str]] = {}
+        if seed:
+            for user in SEED_USERS:
+                self.usuarios.insert(dict(user))
+            for product in SEED_PRODUCTS:
+                self.produtos.insert(dict(product))
+
+    # /login
+
+    def login(self, body: Any) -> Result:
+        errors = validate(body, LOGIN_SCHEMA)
+        if errors:
+            return 400, errors
+        user = self.usuarios.find_unique(body["email"])
+        if user is None or user["password"] != body["password"]:
+            return 401, {"message": MSG_LOGIN_FAILED}
+        return 200, {"message": MSG_LOGIN_OK, "authorization": f"Bearer {self._issue_token(user)}"}
+
+    # /usuarios
+
+    def list_users(self, query: dict[str, str]) -> Result:
+        errors, filters = parse_query(query, USER_QUERY_FIELDS)
+        if errors:
+            return 400, errors
+        with self.lock:
+            usuarios = self.usuarios.filter(filters)
+        return 200, {"quantidade": len(usuarios), "usuarios": usuarios}
+
+    def get_user(self, user_id: str) -> Result:
+        if not ID_PATTERN.fullmatch(user_id):
+            return 400, {"id": MSG_INVALID_ID}
+        user = self.usuarios.get(user_id)
+        if user is None:
+            return 400, {"message": MSG_USER_NOT_FOUND}
+        return 200, dict(user)
+
+    def create_user(self, body: Any) -> Result:
+        errors = validate(body, USER_SCHEMA)
+        if errors:
+            return 400, errors
+        with self.lock:
+            if self.usuarios.find_unique(body["email"]) is not None:
+                return 400, {"message": MSG_EMAIL_TAKEN}
+            user = {**pick(body, USER_SCHEMA), "_id": self._new_id(self.usuarios)}
+            self.usuarios.insert(user)
+        return 201, {"message": MSG_CREATED, "_id": user["_id"]}
+
+    def update_user(self, user_id: str, body: Any) -> Result:
+        errors = validate(body, USER_SCHEMA)
+        if errors:
+            return 400, errors
+        with self.lock:
+            owner = self.usuarios.find_unique(body["email"])
+            if owner is not None and owner["_id"] != user_id:
+                return 400, {"message": MSG_EMAIL_TAKEN}
+            if self.usuarios.get(user_id) is None:
+                user = {**pick(body, USER_SCHEMA), "_id": self._new_id(self.usuarios)}
+                self.usuarios.insert(user)
+                return 201, {"message": MSG_CREATED, "_id": user["_id"]}
+            self.usuarios.replace({**pick(body, USER_SCHEMA), "_id": user_id})
+        return 200, {"message": MSG_UPDATED}
+
+    def delete_user(self, user_id: str) -> Result:
+        with self.lock:
+            cart = self.carrinhos.find_unique(user_id)
+            if cart is not None:
+                return 400, {"message": MSG_USER_HAS_CART, "idCarrinho": cart["_id"]}
+            if self.usuarios.delete(user_id) is None:
+                return 200, {"message": MSG_NOTHING_DELETED}
+        return 200, {"message": MSG_DELETED}
+
+    # /produtos
+
+    def list_products(self, query: dict[str, str]) -> Result:
+        errors, filters = parse_query(query, PRODUCT_QUERY_FIELDS)
+        if errors:
+            return 400, errors
+        with self.lock:
+            produtos = self.produtos.filter(filters)
+        return 200, {"quantidade": len(produtos), "produtos": produtos}
+
+    def get_product(self, product_id: str) -> Result:
+        if not ID_PATTERN.fullmatch(product_id):
+            return 400, {"id": MSG_INVALID_ID}
+        product = self.produtos.get(product_id)
+        if product is None:
+            return 400, {"message": MSG_PRODUCT_NOT_FOUND}
+        return 200, dict(product)
+
+    def create_product(self, body: Any, authorization: str | None) -> Result:
+        errors = validate(body, PRODUCT_SCHEMA)
+        if errors:
+            return 400, errors
+        denied = self._require_admin(authorization)
+        if denied:
+            return denied
+        with self.lock:
+            if self.produtos.find_unique(body["nome"]) is not None:
+                return 400, {"message": MSG_PRODUCT_NAME_TAKEN}
+            product = {**pick(body, PRODUCT_SCHEMA), "_id": self._new_id(self.produtos)}
+            self.produtos.insert(product)
+        return 201, {"message": MSG_CREATED, "_id": product["_id"]}
+
+    def update_product(self, product_id: str, body: Any, authorization: str | None) -> Result:
+        errors = validate(body, PRODUCT_SCHEMA)
+        if errors:
+            return 400, errors
+        denied = self._require_admin(authorization)
+        if denied:
+            return denied
+        with self.lock:
+            owner = self.produtos.find_unique(body["nome"])
+            if owner is not None and owner["_id"] != product_id:
+                return 400, {"message": MSG_PRODUCT_NAME_TAKEN}
+            if self.produtos.get(product_id) is None:
+                product = {**pick(body, PRODUCT_SCHEMA), "_id": self._new_id(self.produtos)}
+                self.produtos.insert(product)
+                return 201, {"message": MSG_CREATED, "_id": product["_id"]}
+            self.produtos.replace({**pick(body, PRODUCT_SCHEMA), "_id": product_id})
+        return 200, {"message": MSG_UPDATED}
+
+    def delete_product(self, product_id: str, authorization: str | None) -> Result:
+        denied = self._require_admin(authorization)
+        if denied:
+            return denied
+        with self.lock:
+            cart_ids = self.carts_by_product.get(product_id)
+            if cart_ids:
+                return 400, {"message": MSG_PRODUCT_IN_CART, "idCarrinhos": sorted(cart_ids)}
+            if self.produtos.delete(product_id) is None:
+                return 200, {"message": MSG_NOTHING_DELETED}
+        return 200, {"message": MSG_DELETED}
+
+    # /carrinhos
+
+    def list_carts(self, query: dict[str, str]) -> Result:
+        errors, filters = parse_query(query, CART_QUERY_FIELDS)
+        if errors:
+            return 400, errors
+        with self.lock:
+            carrinhos = self.carrinhos.filter(filters)
+        return 200, {"quantidade": len(carrinhos), "carrinhos": carrinhos}
+
+    def get_cart(self, cart_id: str) -> Result:
+        if not ID_PATTERN.fullmatch(cart_id):
+            return 400, {"id": MSG_INVALID_ID}
+        cart = self.carrinhos.get(cart_id)
+        if cart is None:
+            return 400, {"message": MSG_CART_NOT_FOUND}
+        return 200, dict(cart)
+
+    def create_cart(self, body: Any, authorization: str | None) -> Result:
+        errors = validate(body, CART_SCHEMA)
+        if errors:
+            return 400, errors
+        user = self._authenticate(authorization)
+        if user is None:
+            return 401, {"message": MSG_TOKEN_INVALID}
+        items = body["produtos"]
+        product_ids = [item["idProduto"] for item in items]
+        if len(set(product_ids)) != len(product_ids):
+            return 400, {"message": MSG_CART_DUPLICATED_PRODUCT}
+        with self.lock:
+            if self.carrinhos.find_unique(user["_id"]) is not None:
+                return 400, {"message": MSG_CART_LIMIT}
+            lines = []
+            for index, item in enumerate(items):
+                product = self.produtos.get(item["idProduto"])
+                if product is None:
+                    return 400, {"message": MSG_PRODUCT_NOT_FOUND, "item": {**item, "index": index}}
+                if product["quantidade"] < item["quantidade"]:
+                    stock = {"quantidadeEstoque": product["quantidade"], "index": index}
+                    return 400, {"message": MSG_CART_NO_STOCK, "item": {**item, **stock}}
+                lines.append({**item, "precoUnitario": product["preco"]})
+            cart = {
+                "produtos": lines,
+                "precoTotal": sum(line["precoUnitario"] * line["quantidade"] for line in lines),
+                "quantidadeTotal": sum(line["quantidade"] for line in lines),
+                "idUsuario": user["_id"],
+                "_id": self._new_id(self.carrinhos),
+            }
+            for line in lines:
+                self.produtos.get(line["idProduto"])["quantidade"] -= line["quantidade"]
+                self.carts_by_product.setdefault(line["idProduto"], set()).add(cart["_id"])
+            self.carrinhos.insert(cart)
+        return 201, {"message": MSG_CREATED, "_id": cart["_id"]}
+
+    def conclude_purchase(self, authorization: str | None) -> Result:
+        return self._close_cart(authorization, restock=False)
+
+    def cancel_purchase(self, authorization: str | None) -> Result:
+        return self._close_cart(authorization, restock=True)
+
+    def _close_cart(self, authorization: str | None, restock: bool) -> Result:
+        user = self._authenticate(authorization)
+        if user is None:
+            return 401, {"message": MSG_TOKEN_INVALID}
+        with self.lock:
+            cart = self.carrinhos.find_unique(user["_id"])
+            if cart is None:
+                return 200, {"message": MSG_CART_MISSING}
+            self.carrinhos.delete(cart["_id"])
+            for line in cart["produtos"]:
+                self.carts_by_product.get(line["idProduto"], set()).discard(cart["_id"])
+                product = self.produtos.get(line["idProduto"])
+                if restock and product is not None:
+                    product["quantidade"] += line["quantidade"]
+        return 200, {"message": MSG_CART_CANCELLED if restock else MSG_DELETED}
+
+    # auth
+
+    def _issue_token(self, user: dict[str, Any]) -> str:
+        issued_at = int(time.time())
+        header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        payload = {"email": user["email"], "password": user["password"], "iat": issued_at}
+        payload["exp"] = issued_at + TOKEN_TTL_SECONDS
+        body = _b64(json.dumps(payload).encode())
+        signature = _b64(hmac.new(self.secret, f"{header}.{body}".encode(), hashlib.sha256).digest())
+        return f"{header}.{body}.{signature}"
+
+    def _authenticate(self, authorization: str | None) -> dict[str, Any] | None:
+        if not authorization:
+            return None
+        token = authorization.removeprefix("Bearer ").strip()
+        try:
+            header, body, signature = token.split(".")
+            expected = _b64(hmac.new(self.secret, f"{header}.{body}".encode(), hashlib.sha256).digest())
+            if not hmac.compare_digest(signature, expected):
+                return None
+            payload = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+        except (ValueError, TypeError):
+            return None
+        if payload.get("exp", 0) < time.time():
+            return None
+        user = self.usuarios.find_unique(payload.get("email"))
+        if user is None or user["password"] != payload.get("password"):
+            return None
+        return user
+
+    def _require_admin(self, authorization: str | None) -> Result | None:
+        user = self._authenticate(authorization)
+        if user is None:
+            return 401, {"message": MSG_TOKEN_INVALID}
+        if user["administrador"] != "true":
+            return 403, {"message": MSG_ADMIN_ONLY}
+        return None
+
+    def _new_id(self, collection: IndexedCollection) -> str:
+        while True:
+            record_id = "".join(random.choices(ID_ALPHABET, k=16))
+            if collection.get(record_id) is None:
+                return record_id
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+# Validation mirrors the Joi schemas (and Portuguese messages) used by ServeRest.
+
+
+def _string(field: str, value: Any) -> str | None:
+    if not isinstance(value, str):
+        return f"{field} deve ser uma string"
+    if value == "":
+        return f"{field} não pode ficar em branco"
+    return None
+
+
+def _email(field: str, value: Any) -> str | None:
+    error = _string(field, value)
+    if error:
+        return error
+    if not EMAIL_PATTERN.fullmatch(value):
+        return f"{field} deve ser um email válido"
+    return None
+
+
+def _admin_flag(field: str, value: Any) -> str | None:
+    if value not in ("true", "false"):
+        return f"{field} deve ser 'true' ou 'false'"
+    return None
+
+
+def _integer(minimum: int | None = None, positive: bool = False):
+    def check(field: str, value: Any) -> str | None:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f"{field} deve ser um número"
+        if positive and value <= 0:
+            return f"{field} deve ser um número positivo"
+        if minimum is not None and value < minimum:
+            return f"{field} deve ser maior ou igual a {minimum}"
+        if value != int(value):
+            return f"{field} deve ser um inteiro"
+        return None
+
+    return check
+
+
+def _cart_items(field: str, value: Any) -> str | None:
+    if not isinstance(value, list):
+        return f"{field} deve ser um array"
+    if not value:
+        return f"{field} não contém 1 valor obrigatório"
+    quantity_check = _integer(positive=True)
+    for index, item in enumerate(value):
+        if not isinstance(item, dict):
+            return f"{field}[{index}] deve ser um objeto"
+        for key, check in (("idProduto", _string), ("quantidade", quantity_check)):
+            if key not in item:
+                return f"{field}[{index}].{key} é obrigatório"
+            error = check(f"{field}[{index}].{key}", item[key])
+            if error:
+                return error
+    return None
+
+
+LOGIN_SCHEMA = {"email": _email, "password": _string}
+USER_SCHEMA = {"nome": _string, "email": _email, "password": _string, "administrador": _admin_flag}
+PRODUCT_SCHEMA = {
+    "nome": _string,
+    "preco": _integer(positive=True),
+    "descricao": _string,
+    "quantidade": _integer(minimum=0),
+}
+CART_SCHEMA = {"produtos": _cart_items}
+
+
+def validate(body: Any, schema: dict[str, Any]) -> dict[str, str]:
+    if not isinstance(body, dict):
+        return {"message": "O corpo da requisição deve ser um objeto JSON"}
+    errors = {}
+    for field, check in schema.items():
+        if field not in body:
+            errors[field] = f"{field} é obrigatório"
+            continue
+        error = check(field, body[field])
+        if error:
+            errors[field] = error
+    for field in body:
+        if field not in schema:
+            errors[field] = f"{field} não é permitido"
+    return errors
+
+
+def pick(body: dict[str, Any], schema: dict[str, Any]) -> dict[str, Any]:
+    return {field: body[field] for field in schema}
+
+
+def parse_query(query: dict[str, str], fields: dict[str, type]) -> tuple[dict[str, str], dict[str, Any]]:
+    errors = {}
+    filters = {}
+    for key, raw in query.items():
+        kind = fields.get(key)
+        if kind is None:
+            errors[key] = f"{key} não é permitido"
+        elif kind is int:
+            try:
+                filters[key] = int(raw)
+            except ValueError:
+                errors[key] = f"{key} deve ser um número"
+        elif key == "administrador" and raw not in ("true", "false"):
+            errors[key] = f"{key} deve ser 'true' ou 'false'"
+        else:
+            filters[key] = raw
+    return errors, filters
@@ -0,0 +1,247 @@
+import asyncio
+import os
+import random
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+from playwright.async_api import APIResponse as AsyncAPIResponse
+from playwright.sync_api import APIResponse
+
+from tests.utils.request_middleware import AsyncSend, RequestCall, Send
+from tests.utils.transport import IDEMPOTENT_METHODS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Suggested --rate-limit for the public ServeRest; without the option there is no limiter.
+DEFAULT_RATE = 50.0
+MIN_RATE = 1.0
+DECREASE_FACTOR = 0.5
+# Additive increase: after this many successes in a row the rate grows by a tenth of the ceiling.
+INCREASE_AFTER = 20
+RETRIES = 3
+BACKOFF_BASE = 0.2
+BACKOFF_CAP = 5.0
+THROTTLE_STATUSES = frozenset({429, 503})
+LIMITER = pytest.StashKey["RateLimiter"]()
+
+# rate, tokens, updated, blocked_until, successes in a row, throttles
+STATE = struct.Struct("<ddddqq")
+
+
+@dataclass
+class BucketState:
+    rate: float
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+    successes: int = 0
+    throttles: int = 0
+
+
+class SharedTokenBucket:
+    # Token bucket whose state lives in a small file shared by every xdist worker and
+    # updated under an exclusive file lock, so the limit applies to the whole run.
+    # The rate adapts AIMD-style: halved on 429/503, raised back towards the ceiling
+    # after sustained success.
+    def __init__(self, path: Path, ceiling: float = DEFAULT_RATE, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ceiling = ceiling
+        self.clock = clock
+        self._thread_lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def reserve(self) -> float:
+        # Takes a token now (the balance may go negative) and returns how long the
+        # caller has to wait before using it; one lock round per request.
+        with self._locked() as state:
+            now = self.clock()
+            state.tokens = min(self._burst(state), state.tokens + (now - state.updated) * state.rate) - 1
+            state.updated = now
+            wait = max(-state.tokens / state.rate, state.blocked_until - now, 0.0)
+        return wait
+
+    def succeeded(self) -> None:
+        with self._locked() as state:
+            state.successes += 1
+            if state.successes >= INCREASE_AFTER and state.rate < self.ceiling:
+                state.rate = min(self.ceiling, state.rate + self.ceiling / 10)
+                state.successes = 0
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        with self._locked() as state:
+            now = self.clock()
+            state.rate = max(MIN_RATE, state.rate * DECREASE_FACTOR)
+            state.tokens = min(state.tokens, self._burst(state))
+            state.successes = 0
+            state.throttles += 1
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+
+    def snapshot(self) -> BucketState:
+        with self._locked() as state:
+            return BucketState(**asdict(state))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def _burst(self, state: BucketState) -> float:
+        return max(1.0, state.rate)
+
+    @contextmanager
+    def _locked(self) -> Iterator[BucketState]:
+        with self._thread_lock:
+            _lock_file(self._fd)
+            try:
+                raw = _read(self._fd)
+                if len(raw) == STATE.size:
+                    state = BucketState(*STATE.unpack(raw))
+                else:
+                    state = BucketState(rate=self.ceiling, tokens=self.ceiling, updated=self.clock())
+                yield state
+                _write(
+                    self._fd,
+                    STATE.pack(
+                        state.rate, state.tokens, state.updated, state.blocked_until, state.successes, state.throttles
+                    ),
+                )
+            finally:
+                _unlock_file(self._fd)
+
+
+@dataclass
+class LimiterStats:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    waited: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class RateLimiter:
+    # Middleware for api_request/api_request_async (and so post_json/put_json): every
+    # request waits for a token; 429/503 shrink the shared rate and honour Retry-After.
+    # Only idempotent requests are retried, with full-jitter exponential backoff.
+    # Costs two rounds on the shared file lock per request (reserve, then outcome).
+    def __init__(
+        self,
+        bucket: SharedTokenBucket,
+        retries: int = RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ):
+        self.bucket = bucket
+        self.retries = retries
+        self.sleep = sleep
+        self.jitter = jitter
+        self.stats = LimiterStats()
+
+    def __call__(self, call: RequestCall, send: Send) -> APIResponse:
+        attempt = 0
+        while True:
+            wait = self._reserve()
+            if wait:
+                self.sleep(wait)
+            response = send(call)
+            delay = self._outcome(call, response, attempt)
+            if delay is None:
+                return response
+            # Superseded by the retry; frees its body in the driver right away.
+            response.dispose()
+            self.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, call: RequestCall, send: AsyncSend) -> AsyncAPIResponse:
+        attempt = 0
+        while True:
+            wait = self._reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            response = await send(call)
+            delay = self._outcome(call, response, attempt)
+            if delay is None:
+                return response
+            await response.dispose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _reserve(self) -> float:
+        self.stats.requests += 1
+        wait = self.bucket.reserve()
+        self.stats.waited += wait
+        return wait
+
+    def _outcome(self, call: RequestCall, response: APIResponse | AsyncAPIResponse, attempt: int) -> float | None:
+        # None when the response is final, otherwise the delay before the next attempt.
+        status = response.status
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if status in THROTTLE_STATUSES or (retry_after is not None and status >= 500):
+            self.stats.throttled += 1
+            self.bucket.throttled(retry_after)
+        elif status < 500:
+            self.bucket.succeeded()
+            return None
+        if call.method not in IDEMPOTENT_METHODS or attempt >= self.retries:
+            return None
+        self.stats.retries += 1
+        backoff = self.jitter(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+        return max(backoff, retry_after or 0.0)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limiter(config: pytest.Config) -> RateLimiter | None:
+    return config.stash.get(LIMITER, None)
+
+
+def _lock_file(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _read(fd: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, STATE.size, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    return os.read(fd, STATE.size)
+
+
+def _write(fd: int, data: bytes) -> None:
+    if hasattr(os, "pwrite"):
+        os.pwrite(fd, data, 0)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, data)
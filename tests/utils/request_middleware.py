@@ -0,0 +1,109 @@
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from playwright.async_api import APIRequestContext as AsyncAPIRequestContext
+from playwright.async_api import APIResponse as AsyncAPIResponse
+from playwright.sync_api import APIRequestContext, APIResponse
+
+
+@dataclass
+class RequestCall:
+    method: str
+    url: str
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+Send = Callable[[RequestCall], APIResponse]
+Middleware = Callable[[RequestCall, Send], APIResponse]
+AsyncSend = Callable[[RequestCall], Awaitable[AsyncAPIResponse]]
+AsyncMiddleware = Callable[[RequestCall, AsyncSend], Awaitable[AsyncAPIResponse]]
+
+
+class RequestContextProxy:
+    # Drop-in stand-in for APIRequestContext: every HTTP verb goes through the
+    # middleware chain, everything else (dispose, storage_state...) is forwarded.
+    def __init__(self, request_context: APIRequestContext, middlewares: Sequence[Middleware] = ()):
+        self._request_context = request_context
+        self._middlewares = tuple(middlewares)
+        self._chain = compose(self._middlewares, self._send)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._request_context, name)
+
+    @property
+    def request_context(self) -> APIRequestContext:
+        return self._request_context
+
+    @property
+    def middlewares(self) -> tuple[Middleware, ...]:
+        return self._middlewares
+
+    def fetch(self, url: str, method: str | None = None, **options: Any) -> APIResponse:
+        return self._chain(RequestCall((method or "GET").upper(), url, options))
+
+    def get(self, url: str, **options: Any) -> APIResponse:
+        return self._chain(RequestCall("GET", url, options))
+
+    def head(self, url: str, **options: Any) -> APIResponse:
+        return self._chain(RequestCall("HEAD", url, options))
+
+    def post(self, url: str, **options: Any) -> APIResponse:
+        return self._chain(RequestCall("POST", url, options))
+
+    def put(self, url: str, **options: Any) -> APIResponse:
+        return self._chain(RequestCall("PUT", url, options))
+
+    def patch(self, url: str, **options: Any) -> APIResponse:
+        return self._chain(RequestCall("PATCH", url, options))
+
+    def delete(self, url: str, **options: Any) -> APIResponse:
+        return self._chain(RequestCall("DELETE", url, options))
+
+    def _send(self, call: RequestCall) -> APIResponse:
+        return self._request_context.fetch(call.url, method=call.method, **call.options)
+
+
+class AsyncRequestContextProxy:
+    # Same idea for api_request_async, with coroutine middlewares.
+    def __init__(self, request_context: AsyncAPIRequestContext, middlewares: Sequence[AsyncMiddleware] = ()):
+        self._request_context = request_context
+        self._chain = compose(middlewares, self._send)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._request_context, name)
+
+    async def fetch(self, url: str, method: str | None = None, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall((method or "GET").upper(), url, options))
+
+    async def get(self, url: str, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall("GET", url, options))
+
+    async def head(self, url: str, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall("HEAD", url, options))
+
+    async def post(self, url: str, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall("POST", url, options))
+
+    async def put(self, url: str, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall("PUT", url, options))
+
+    async def patch(self, url: str, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall("PATCH", url, options))
+
+    async def delete(self, url: str, **options: Any) -> AsyncAPIResponse:
+        return await self._chain(RequestCall("DELETE", url, options))
+
+    async def _send(self, call: RequestCall) -> AsyncAPIResponse:
+        return await self._request_context.fetch(call.url, method=call.method, **call.options)
+
+
+def compose(middlewares: Sequence[Middleware | AsyncMiddleware], send: Send | AsyncSend) -> Send | AsyncSend:
+    # The first middleware is the outermost one; send() is called last.
+    for middleware in reversed(middlewares):
+        send = _bind(middleware, send)
+    return send
+
+
+def _bind(middleware: Middleware | AsyncMiddleware, send: Send | AsyncSend) -> Send | AsyncSend:
+    return lambda call: middleware(call, send)
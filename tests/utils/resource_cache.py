@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import os
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+LOADERS = {
+    ".json": json.loads,
+    ".csv": lambda text: list(csv.DictReader(io.StringIO(text))),
+}
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ResourceCache:
+    # Parsed resources are kept frozen (read-only mappings and tuples), so one copy can be
+    # shared by every caller; each entry is re-read only when its file's mtime changes.
+    def __init__(self, root: Path):
+        self.root = root
+        self.entries: dict[str, tuple[int, Any]] = {}
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, relative_path: str) -> Any:
+        file_path = self.root / relative_path
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Resource not found: {file_path}") from None
+        entry = self.entries.get(relative_path)
+        if entry is not None and entry[0] == mtime:
+            self.hits += 1
+            return entry[1]
+        return self._load(relative_path, file_path, mtime)
+
+    def preload(self) -> int:
+        for file_path in sorted(self.root.rglob("*")):
+            if file_path.suffix in LOADERS:
+                relative_path = file_path.relative_to(self.root).as_posix()
+                self._load(relative_path, file_path, os.stat(file_path).st_mtime_ns)
+        return len(self.entries)
+
+    def export(self) -> dict[str, Any]:
+        return {path: [mtime, thaw(value)] for path, (mtime, value) in self.entries.items()}
+
+    def restore(self, exported: dict[str, Any]) -> None:
+        # Entries preloaded by the xdist controller; the mtime check still applies.
+        for relative_path, (mtime, value) in exported.items():
+            self.entries[relative_path] = (mtime, freeze(value))
+
+    def _load(self, relative_path: str, file_path: Path, mtime: int) -> Any:
+        loader = LOADERS.get(file_path.suffix)
+        if loader is None:
+            raise ValueError(f"Unsupported resource type: {file_path.suffix}")
+        value = freeze(loader(file_path.read_text(encoding="utf-8")))
+        self.entries[relative_path] = (mtime, value)
+        self.loads += 1
+        return value
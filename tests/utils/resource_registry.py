@@ -0,0 +1,164 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+from playwright.async_api import APIResponse as AsyncAPIResponse
+from playwright.sync_api import APIResponse
+
+from tests.utils.batch import BatchResult, run_batch
+from tests.utils.request_middleware import AsyncSend, RequestCall, Send
+from tests.utils.transport import ApiRequestContext
+
+RESOURCE_PATH = re.compile(r"/(usuarios|produtos)(?:/([A-Za-z0-9]+))?")
+CART_CLOSE_PATHS = ("/carrinhos/concluir-compra", "/carrinhos/cancelar-compra")
+# "Nenhum registro excluído" / "Não foi encontrado carrinho para esse usuário"
+NOTHING_REMOVED = ("Nenhum registro", "Não foi encontrado")
+
+
+@dataclass
+class CleanupReport:
+    carts: int = 0
+    products: int = 0
+    users: int = 0
+    already_gone: int = 0
+    failures: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ResourceRegistry:
+    # Middleware that remembers what the suite creates (and forgets what tests delete
+    # themselves), so cleanup() can remove the rest: carts -> products -> users.
+    def __init__(self):
+        self.users: dict[str, None] = {}
+        self.products: dict[str, None] = {}
+        self.carts: dict[str, str] = {}
+        self.credentials: dict[str, tuple[str, str]] = {}
+
+    def __call__(self, call: RequestCall, send: Send) -> APIResponse:
+        response = send(call)
+        path = urlsplit(call.url).path.rstrip("/")
+        if _needs_body(path, response.status):
+            self.observe(call.method, path, call.options, response.status, response.json())
+        elif call.method == "DELETE" and response.status == 200:
+            self.observe(call.method, path, call.options, response.status, None)
+        return response
+
+    async def track_async(self, call: RequestCall, send: AsyncSend) -> AsyncAPIResponse:
+        response = await send(call)
+        path = urlsplit(call.url).path.rstrip("/")
+        if _needs_body(path, response.status):
+            self.observe(call.method, path, call.options, response.status, await response.json())
+        elif call.method == "DELETE" and response.status == 200:
+            self.observe(call.method, path, call.options, response.status, None)
+        return response
+
+    def observe(self, method: str, path: str, options: dict[str, Any], status: int, body: Any) -> None:
+        token = (options.get("headers") or {}).get("Authorization")
+        if path == "/login":
+            data = options.get("data") or "{}"
+            payload = data if isinstance(data, dict) else json.loads(data)
+            self.credentials[body["authorization"]] = (payload.get("email"), payload.get("password"))
+            return
+        if path == "/carrinhos" and status == 201:
+            self.carts[token] = body["_id"]
+            return
+        if path in CART_CLOSE_PATHS:
+            self.carts.pop(token, None)
+            return
+        match = RESOURCE_PATH.fullmatch(path)
+        if match is None:
+            return
+        resources = self.users if match.group(1) == "usuarios" else self.products
+        if method == "DELETE":
+            resources.pop(match.group(2), None)
+        elif status == 201:
+            resources[body["_id"]] = None
+
+    def track(self, kind: str, resource_id: str, token: str | None = None) -> None:
+        if kind == "carrinhos":
+            self.carts[token] = resource_id
+        else:
+            (self.users if kind == "usuarios" else self.products)[resource_id] = None
+
+    def __len__(self) -> int:
+        return len(self.users) + len(self.products) + len(self.carts)
+
+    def has_cart(self, token: str) -> bool:
+        # Whether a cart created with this token is still open, as far as this worker saw.
+        return token in self.carts
+
+    def cleanup(
+        self,
+        request: ApiRequestContext,
+        admin_token: str,
+        concurrency: int | None = None,
+    ) -> CleanupReport:
+        # One batch() per dependency level, on the leased context: concurrent with a
+        # thread-safe transport (DEFAULT_CONCURRENCY when None), one request at a time on a
+        # sync Playwright context.
+        report = CleanupReport()
+        tokens = list(self.carts)
+        cancelled = run_batch(request, [_cancel_cart(token) for token in tokens], concurrency)
+        # Carts can only be cancelled by their owner; log in again where the token expired.
+        expired = [
+            position
+            for position, (token, result) in enumerate(zip(tokens, cancelled))
+            if result.response is not None and result.response.status == 401 and token in self.credentials
+        ]
+        logins = [_login(*self.credentials[tokens[position]]) for position in expired]
+        relogged = [
+            (position, result.response.json()["authorization"])
+            for position, result in zip(expired, run_batch(request, logins, concurrency))
+            if result.ok
+        ]
+        retried = run_batch(request, [_cancel_cart(token) for _, token in relogged], concurrency)
+        for (position, _), result in zip(relogged, retried):
+            cancelled[position] = result
+        for token, result in zip(tokens, cancelled):
+            _settle(report, "carts", f"cart {self.carts[token]}", result)
+
+        admin_headers = {"Authorization": admin_token}
+        for kind, endpoint, resources, headers in (
+            ("products", "/produtos", self.products, admin_headers),
+            ("users", "/usuarios", self.users, {}),
+        ):
+            calls = [
+                RequestCall("DELETE", f"{endpoint}/{resource_id}", {"headers": headers}) for resource_id in resources
+            ]
+            for call, result in zip(calls, run_batch(request, calls, concurrency)):
+                _settle(report, kind, call.url, result)
+        self.carts.clear()
+        self.products.clear()
+        self.users.clear()
+        return report
+
+
+def _needs_body(path: str, status: int) -> bool:
+    return status == 201 or (path == "/login" and status == 200)
+
+
+def _cancel_cart(token: str) -> RequestCall:
+    return RequestCall("DELETE", "/carrinhos/cancelar-compra", {"headers": {"Authorization": token}})
+
+
+def _login(email: str, password: str) -> RequestCall:
+    return RequestCall("POST", "/login", {"data": {"email": email, "password": password}})
+
+
+def _settle(report: CleanupReport, kind: str, label: str, result: BatchResult) -> None:
+    if result.error is not None:
+        report.failures.append(f"{label}: {result.error!r}")
+        return
+    response = result.response
+    if not response.ok:
+        report.failures.append(f"{label}: {response.status} {response.text()}")
+        return
+    message = response.json().get("message", "")
+    if message.startswith(NOTHING_REMOVED):
+        report.already_gone += 1
+    else:
+        setattr(report, kind, getattr(report, kind) + 1)
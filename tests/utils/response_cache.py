@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pytest
+from playwright.async_api import APIResponse as AsyncAPIResponse
+
+from tests.utils.request_middleware import AsyncSend, RequestCall, Send
+from tests.utils.serverest_contract import ID_PATTERN
+from tests.utils.transport import ApiResponse, HttpResponse
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 256
+CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+# Writes to a collection can change others: carts reserve and return product stock.
+INVALIDATES = {"carrinhos": ("produtos",)}
+RESPONSE_CACHE = pytest.StashKey["ResponseCache"]()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    expired: int = 0
+    evicted: int = 0
+    invalidated: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def cache_key(call: RequestCall) -> tuple[str, str, str]:
+    # Path plus sorted query (from the URL and the params option) and the caller's token,
+    # so ?a=1&b=2 and params={"b": 2, "a": 1} share an entry but two users never do.
+    # Header names are case-insensitive: "authorization" is the same token.
+    parts = urlsplit(call.url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(key, str(value)) for key, value in (call.options.get("params") or {}).items()]
+    target = (parts.path.rstrip("/") or "/") + ("?" + urlencode(sorted(query)) if query else "")
+    headers = {name.lower(): value for name, value in (call.options.get("headers") or {}).items()}
+    return call.method, target, headers.get("authorization", "")
+
+
+def resource_path(url: str) -> tuple[str, str]:
+    # ("usuarios", "") for the listing, ("usuarios", "<id>") for one record.
+    collection, _, rest = urlsplit(url).path.strip("/").partition("/")
+    return collection, rest
+
+
+class ResponseCache:
+    # Opt-in read-through cache for GET responses, one per worker. Successful responses
+    # are kept as HttpResponse copies (status, headers, body), so they outlive the leased
+    # context; every write through api_request or api_request_async drops the entries it
+    # may have changed (see invalidate). Entries also expire after `ttl` seconds, and the
+    # least recently used one goes once `max_entries` is reached. Writes made by other
+    # workers are only seen after the TTL.
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, HttpResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __call__(self, call: RequestCall, send: Send) -> ApiResponse:
+        if call.method not in CACHEABLE_METHODS:
+            self.invalidate(call.url)
+            return send(call)
+        key = cache_key(call)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = send(call)
+        if response.status == 200:
+            body = response.body()
+            response = self.put(key, response.url, response.status, response.status_text, response.headers, body)
+        return response
+
+    async def call_async(self, call: RequestCall, send: AsyncSend) -> AsyncAPIResponse:
+        # Async responses are not cached; their writes still invalidate.
+        if call.method not in CACHEABLE_METHODS:
+            self.invalidate(call.url)
+        return await send(call)
+
+    def get(self, key: tuple[str, str, str]) -> HttpResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[0] >= self.ttl:
+                del self._entries[key]
+                self.stats.expired += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def put(
+        self, key: tuple[str, str, str], url: str, status: int, status_text: str, headers: dict[str, str], body: bytes
+    ) -> HttpResponse:
+        response = HttpResponse(url, status, status_text, dict(headers), body)
+        with self._lock:
+            self._entries[key] = (self.clock(), response)
+            self._entries.move_to_end(key)
+            self.stats.stored += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evicted += 1
+        return response
+
+    def invalidate(self, url: str) -> None:
+        # A write drops the listings of its collection and, for /collection/<id>, that
+        # record; a create (no id) leaves the other records alone. Any other sub-path
+        # (/carrinhos/concluir-compra) and the collections in INVALIDATES lose everything.
+        written, record = resource_path(url)
+        with self._lock:
+            stale = [key for key in self._entries if _is_stale(resource_path(key[1]), written, record)]
+            for key in stale:
+                del self._entries[key]
+            self.stats.invalidated += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _is_stale(entry: tuple[str, str], written: str, record: str) -> bool:
+    collection, entry_record = entry
+    if collection != written:
+        return collection in INVALIDATES.get(written, ())
+    return not entry_record or entry_record == record or (bool(record) and not ID_PATTERN.fullmatch(record))
+
+
+def response_cache(config: pytest.Config) -> ResponseCache | None:
+    return config.stash.get(RESPONSE_CACHE, None)
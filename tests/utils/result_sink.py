@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tests.utils.instrumentation import RequestRecord
+
+DEFAULT_BATCH_SIZE = 100
+RESULT_SINK = pytest.StashKey["ResultSink"]()
+# Allure status of a failure in each phase: a failing fixture is "broken", not "failed".
+FAILED_STATUS = {"setup": "broken", "call": "failed", "teardown": "broken"}
+
+
+class ResultSink:
+    # Append-only JSONL results, one line per test. Lines are buffered and written
+    # `batch_size` at a time with a single O_APPEND write, so xdist workers can share the
+    # file without interleaving their lines and without one open/close per test.
+    def __init__(self, path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.written = 0
+        self._buffer: list[str] = []
+
+    def add(self, result: dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(self._buffer).encode("utf-8")
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, data)
+        finally:
+            os.close(descriptor)
+        self.written += len(self._buffer)
+        self._buffer.clear()
+
+
+def result_sink(config: pytest.Config) -> ResultSink | None:
+    return config.stash.get(RESULT_SINK, None)
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def request_stats(records: list[RequestRecord]) -> dict[str, Any]:
+    return {
+        "count": len(records),
+        "time": round(sum(record.duration for record in records), 6),
+        "bytes_sent": sum(record.bytes_sent for record in records),
+        "bytes_received": sum(record.bytes_received for record in records),
+        # phase, method, endpoint, status, milliseconds
+        "records": [
+            [record.phase, record.method, record.endpoint, record.status, round(record.duration * 1000, 2)]
+            for record in records
+        ],
+    }
+
+
+def allure_labels(item: pytest.Item) -> list[list[str]]:
+    # Labels set with the allure decorators (@allure.severity, @allure.feature, ...),
+    # which allure-pytest stores as allure_label marks.
+    labels = []
+    for mark in item.iter_markers("allure_label"):
+        labels.extend([mark.kwargs["label_type"], str(getattr(value, "value", value))] for value in mark.args)
+    return labels
+
+
+def read_results(path: Path, run: str | None = None) -> Iterator[dict[str, Any]]:
+    # Results of one run; the last run in the file when `run` is None, every run with "all".
+    with open(path, encoding="utf-8") as sink:
+        results = [json.loads(line) for line in sink if line.strip()]
+    if run is None and results:
+        run = results[-1]["run"]
+    return (result for result in results if run == "all" or result["run"] == run)
+
+
+def to_allure(result: dict[str, Any], directory: Path) -> None:
+    # One <uuid>-result.json in the allure-results format, plus attachments for the
+    # request log and snapshot diffs, as allure-pytest would have written them.
+    test_uuid = str(uuid.uuid4())
+    module, _, name = result["nodeid"].partition("::")
+    package = module.removesuffix(".py").replace("/", ".")
+    attachments = []
+    if result["requests"]["count"]:
+        attachments.append(_attach(directory, "HTTP requests", result["requests"]["records"]))
+    for diff in result["snapshot_diffs"]:
+        attachments.append(_attach(directory, "snapshot diff", diff, "text/plain", "txt"))
+    labels = [
+        ["framework", "pytest"],
+        ["language", "cpython3"],
+        ["package", package],
+        ["suite", package.rpartition(".")[2]],
+        ["testMethod", name.partition("[")[0]],
+        ["thread", result["worker"]],
+        *result["labels"],
+    ]
+    report = {
+        "uuid": test_uuid,
+        "historyId": hashlib.md5(result["nodeid"].encode()).hexdigest(),
+        "testCaseId": hashlib.md5(result["nodeid"].partition("[")[0].encode()).hexdigest(),
+        "fullName": f"{package}#{name}",
+        "name": name,
+        "status": result["outcome"],
+        "stage": "finished",
+        "start": int(result["start"] * 1000),
+        "stop": int(result["stop"] * 1000),
+        "labels": [{"name": label, "value": value} for label, value in labels],
+        "parameters": [{"name": key, "value": value} for key, value in result["params"].items()],
+        "attachments": attachments,
+    }
+    if result["message"] or result["trace"]:
+        report["statusDetails"] = {"message": result["message"], "trace": result["trace"]}
+    (directory / f"{test_uuid}-result.json").write_text(json.dumps(report, ensure_ascii=False), encoding="utf-8")
+
+
+def _attach(directory: Path, name: str, content: Any, mime: str = "application/json", extension: str = "json") -> dict:
+    source = f"{uuid.uuid4()}-attachment.{extension}"
+    text = content if isinstance(content, str) else json.dumps(content, indent=2, ensure_ascii=False)
+    (directory / source).write_text(text, encoding="utf-8")
+    return {"name": name, "source": source, "type": mime}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a --results-sink JSONL file into allure-results.")
+    parser.add_argument("sink", type=Path)
+    parser.add_argument("directory", type=Path, nargs="?", default=Path("allure-results"))
+    parser.add_argument("--run", default=None, help="Run id to convert, or 'all' (default: the last run).")
+    parser.add_argument("--clean", action="store_true", help="Empty the allure-results directory first.")
+    args = parser.parse_args()
+
+    args.directory.mkdir(parents=True, exist_ok=True)
+    if args.clean:
+        for stale in args.directory.iterdir():
+            if stale.is_file():
+                stale.unlink()
+    converted = 0
+    for result in read_results(args.sink, args.run):
+        to_allure(result, args.directory)
+        converted += 1
+    print(f"{converted} results written to {args.directory}")
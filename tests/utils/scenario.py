@@ -0,0 +1,239 @@
+import json
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from tests.utils.api_utils import batch, json_call
+from tests.utils.auth_pool import (
+    TOKEN_REFRESH_MARGIN_SECONDS,
+    TOKEN_TTL_SECONDS,
+    UserSession,
+)
+from tests.utils.faker_utils import random_email, random_name, random_product
+from tests.utils.request_middleware import RequestCall
+from tests.utils.transport import ApiRequestContext, ApiResponse
+
+ScenarioBuilder = Callable[..., dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Step:
+    # One resource of a scenario. request() builds the call from the values of `needs`
+    # (other steps or context entries) and may return None when nothing has to be sent;
+    # result() turns the response into the step's value. Shared steps are built once per
+    # worker and reused by every scenario that needs the same step with the same
+    # params and the same shared dependencies, for at most `max_age` seconds when set.
+    name: str
+    request: Callable[[Mapping[str, Any]], RequestCall | None]
+    result: Callable[[ApiResponse, RequestCall], Any]
+    needs: tuple[str, ...] = ()
+    shared: bool = False
+    params: tuple[Any, ...] = ()
+    max_age: float | None = None
+
+
+@dataclass
+class ScenarioStats:
+    sent: int = 0
+    reused: int = 0
+    skipped: int = 0
+    rounds: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ScenarioCache:
+    values: dict[tuple[Any, ...], Any] = field(default_factory=dict)
+    expires: dict[tuple[Any, ...], float] = field(default_factory=dict)
+    stats: ScenarioStats = field(default_factory=ScenarioStats)
+    clock: Callable[[], float] = time.monotonic
+
+    def get(self, signature: tuple[Any, ...] | None) -> tuple[bool, Any]:
+        if signature not in self.values:
+            return False, None
+        if signature in self.expires and self.clock() >= self.expires[signature]:
+            del self.values[signature], self.expires[signature]
+            return False, None
+        return True, self.values[signature]
+
+    def put(self, signature: tuple[Any, ...], value: Any, max_age: float | None) -> None:
+        self.values[signature] = value
+        if max_age is not None:
+            self.expires[signature] = self.clock() + max_age
+
+
+class Scenario:
+    # Declarative setup: steps and their dependencies. build() runs the graph level by
+    # level; the steps of a level do not depend on each other, so a level with several
+    # calls goes out as one batch() (concurrent only on a thread-safe transport), and a
+    # single call is sent directly.
+    def __init__(self, *steps: Step):
+        self.steps = {step.name: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("Scenario step names must be unique")
+
+    def levels(self, targets: Iterable[str] | None = None, context: Iterable[str] = ()) -> list[list[Step]]:
+        available = set(context)
+        wanted: dict[str, Step] = {}
+        stack = list(self.steps if targets is None else targets)
+        while stack:
+            name = stack.pop()
+            if name in wanted or name in available:
+                continue
+            if name not in self.steps:
+                raise KeyError(f"Unknown scenario step or context value: {name}")
+            wanted[name] = self.steps[name]
+            stack.extend(wanted[name].needs)
+        levels = []
+        done = set(available)
+        while wanted:
+            level = [step for step in wanted.values() if done.issuperset(step.needs)]
+            if not level:
+                raise ValueError(f"Scenario has a dependency cycle between {sorted(wanted)}")
+            levels.append(level)
+            for step in level:
+                done.add(step.name)
+                del wanted[step.name]
+        return levels
+
+    def build(
+        self,
+        request: ApiRequestContext,
+        cache: ScenarioCache,
+        context: Mapping[str, Any] | None = None,
+        targets: Iterable[str] | None = None,
+        fresh: Iterable[str] = (),
+    ) -> dict[str, Any]:
+        # `fresh` names shared steps to build again anyway (a test that changes them).
+        values = dict(context or {})
+        fresh = set(fresh)
+        # Cache key of each built step; None when it (or one of its dependencies) is not shared.
+        signatures: dict[str, tuple[Any, ...] | None] = {name: (name,) for name in values}
+        stats = cache.stats
+        for level in self.levels(targets, values):
+            pending: list[tuple[Step, RequestCall]] = []
+            for step in level:
+                signature = None
+                dependencies = [signatures[name] for name in step.needs]
+                if step.shared and step.name not in fresh and None not in dependencies:
+                    signature = (step.name, step.params, *dependencies)
+                signatures[step.name] = signature
+                found, value = cache.get(signature)
+                if found:
+                    values[step.name] = value
+                    stats.reused += 1
+                    continue
+                call = step.request(values)
+                if call is None:
+                    values[step.name] = None
+                    stats.skipped += 1
+                    continue
+                pending.append((step, call))
+            if not pending:
+                continue
+            stats.rounds += 1
+            if len(pending) == 1:
+                _, call = pending[0]
+                responses = [request.fetch(call.url, method=call.method, **call.options)]
+            else:
+                responses = [outcome.unwrap() for outcome in batch(request, [call for _, call in pending])]
+            for (step, call), response in zip(pending, responses):
+                values[step.name] = step.result(response, call)
+                stats.sent += 1
+                if signatures[step.name] is not None:
+                    cache.put(signatures[step.name], values[step.name], step.max_age)
+        return values
+
+
+def expect_status(step: str, response: ApiResponse, status: int) -> dict[str, Any]:
+    if response.status != status:
+        raise RuntimeError(f"Scenario step {step!r} expected {status}, got {response.status}: {response.text()}")
+    return response.json()
+
+
+def user(admin: bool = True) -> Step:
+    def request(values: Mapping[str, Any]) -> RequestCall:
+        payload = {
+            "nome": random_name(),
+            "email": random_email(),
+            "password": values["password"],
+            "administrador": "true" if admin else "false",
+        }
+        return json_call("POST", "/usuarios", payload)
+
+    def result(response: ApiResponse, call: RequestCall) -> UserSession:
+        body = expect_status("user", response, 201)
+        payload = json.loads(call.options["data"])
+        return UserSession(email=payload["email"], password=payload["password"], admin=admin, user_id=body["_id"])
+
+    return Step("user", request, result, needs=("password",), shared=True, params=(admin,))
+
+
+def token() -> Step:
+    # Refreshed on the same schedule as the pooled tokens of AuthTokenPool.
+    def request(values: Mapping[str, Any]) -> RequestCall:
+        session = values["user"]
+        return json_call("POST", "/login", {"email": session.email, "password": session.password})
+
+    return Step(
+        "token",
+        request,
+        lambda response, call: expect_status("token", response, 200)["authorization"],
+        needs=("user",),
+        shared=True,
+        max_age=TOKEN_TTL_SECONDS - TOKEN_REFRESH_MARGIN_SECONDS,
+    )
+
+
+def product(price: int, quantity: int) -> Step:
+    # Created by the worker's pooled admin (`admin_token` returns its token), so it does
+    # not wait for the scenario's own user and token.
+    def request(values: Mapping[str, Any]) -> RequestCall:
+        payload = {
+            "nome": random_product(),
+            "preco": price,
+            "descricao": "Product for cart tests",
+            "quantidade": quantity,
+        }
+        return json_call("POST", "/produtos", payload, headers={"Authorization": values["admin_token"]()})
+
+    return Step(
+        "product",
+        request,
+        lambda response, call: expect_status("product", response, 201)["_id"],
+        needs=("admin_token",),
+        shared=True,
+        params=(price, quantity),
+    )
+
+
+def reset_cart() -> Step:
+    # Cancels the user's open cart, but only when the resource registry saw one being
+    # created (and not closed) with this token; a new user never needs the call.
+    def request(values: Mapping[str, Any]) -> RequestCall | None:
+        if not values["has_cart"](values["token"]):
+            return None
+        return RequestCall("DELETE", "/carrinhos/cancelar-compra", {"headers": {"Authorization": values["token"]}})
+
+    return Step(
+        "reset_cart",
+        request,
+        lambda response, call: expect_status("reset_cart", response, 200),
+        needs=("token", "has_cart"),
+    )
+
+
+def cart(quantity: int) -> Step:
+    def request(values: Mapping[str, Any]) -> RequestCall:
+        payload = {"produtos": [{"idProduto": values["product"], "quantidade": quantity}]}
+        return json_call("POST", "/carrinhos", payload, headers={"Authorization": values["token"]})
+
+    return Step(
+        "cart",
+        request,
+        lambda response, call: expect_status("cart", response, 201)["_id"],
+        needs=("token", "product", "reset_cart"),
+    )
@@ -0,0 +1,163 @@
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+ID_PATTERN = r"[A-Za-z0-9]{16}"
+EMAIL_PATTERN = r".+@.+\..+"
+
+
+@dataclass(frozen=True)
+class Field:
+    type: type | tuple[type, ...]
+    pattern: str | None = None
+    choices: tuple[Any, ...] | None = None
+    items: "Schema | None" = None
+    required: bool = True
+
+
+@dataclass(frozen=True, eq=False)
+class Schema:
+    name: str
+    fields: dict[str, Field]
+
+
+class Violation(NamedTuple):
+    index: int
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"[{self.index}] {self.path}: {self.message}" if self.path else f"[{self.index}] {self.message}"
+
+
+Validator = Callable[[Iterable[Any]], list[Violation]]
+LazyValidator = Callable[[Iterable[Any]], Iterator[Violation]]
+
+USUARIO = Schema(
+    "usuario",
+    {
+        "nome": Field(str),
+        "email": Field(str, pattern=EMAIL_PATTERN),
+        "password": Field(str),
+        "administrador": Field(str, choices=("true", "false")),
+        "_id": Field(str, pattern=ID_PATTERN),
+    },
+)
+PRODUTO = Schema(
+    "produto",
+    {
+        "nome": Field(str),
+        "preco": Field(int),
+        "descricao": Field(str),
+        "quantidade": Field(int),
+        "_id": Field(str, pattern=ID_PATTERN),
+    },
+)
+ITEM_CARRINHO = Schema(
+    "item_carrinho",
+    {
+        "idProduto": Field(str, pattern=ID_PATTERN),
+        "quantidade": Field(int),
+        "precoUnitario": Field(int),
+    },
+)
+CARRINHO = Schema(
+    "carrinho",
+    {
+        "produtos": Field(list, items=ITEM_CARRINHO),
+        "precoTotal": Field(int),
+        "quantidadeTotal": Field(int),
+        "idUsuario": Field(str, pattern=ID_PATTERN),
+        "_id": Field(str, pattern=ID_PATTERN),
+    },
+)
+
+FieldCheck = Callable[[int, Any], Iterable[Violation]]
+_NO_VIOLATIONS: tuple[Violation, ...] = ()
+_compiled: dict[tuple[Schema, bool], Validator | LazyValidator] = {}
+
+
+def compile_schema(schema: Schema, lazy: bool = False) -> Validator | LazyValidator:
+    # Builds one check closure per field (types, regex and choices resolved once) and a
+    # single loop over the items, instead of one assertpy builder per key per item.
+    # The lazy variant is a generator that yields each violation as soon as it is
+    # found and pulls items one at a time (e.g. from a ListStream).
+    if (schema, lazy) in _compiled:
+        return _compiled[schema, lazy]
+    checks = [(name, _field_check(name, field)) for name, field in schema.fields.items()]
+    not_an_object = f"expected {schema.name} object, got "
+
+    def iter_many(items: Iterable[Any]) -> Iterator[Violation]:
+        for index, item in enumerate(items):
+            if type(item) is not dict:
+                yield Violation(index, "", not_an_object + type(item).__name__)
+                continue
+            get = item.get
+            for name, check in checks:
+                yield from check(index, get(name, _MISSING))
+
+    def validate_many(items: Iterable[Any]) -> list[Violation]:
+        violations: list[Violation] = []
+        extend = violations.extend
+        for index, item in enumerate(items):
+            if type(item) is not dict:
+                violations.append(Violation(index, "", not_an_object + type(item).__name__))
+                continue
+            get = item.get
+            for name, check in checks:
+                extend(check(index, get(name, _MISSING)))
+        return violations
+
+    _compiled[schema, lazy] = iter_many if lazy else validate_many
+    return _compiled[schema, lazy]
+
+
+def _field_check(name: str, field: Field) -> FieldCheck:
+    types = field.type if isinstance(field.type, tuple) else (field.type,)
+    wrong_type = f"expected {' | '.join(kind.__name__ for kind in types)}, got "
+    match = re.compile(field.pattern).fullmatch if field.pattern is not None else None
+    choices = frozenset(field.choices) if field.choices is not None else None
+    nested = compile_schema(field.items) if field.items is not None else None
+
+    def check(index: int, value: Any) -> Iterable[Violation]:
+        if value is _MISSING:
+            return (Violation(index, name, "is required"),) if field.required else _NO_VIOLATIONS
+        # Exact type match: bool is a subclass of int, yet JSON true is not a number.
+        if type(value) not in types:
+            return (Violation(index, name, wrong_type + type(value).__name__),)
+        if match is not None and match(value) is None:
+            return (Violation(index, name, f"{value!r} does not match {field.pattern}"),)
+        if choices is not None and value not in choices:
+            return (Violation(index, name, f"{value!r} is not one of {list(field.choices)}"),)
+        if nested is None:
+            return _NO_VIOLATIONS
+        violations = []
+        for inner in nested(value):
+            path = f"{name}[{inner.index}]"
+            violations.append(Violation(index, f"{path}.{inner.path}" if inner.path else path, inner.message))
+        return violations
+
+    return check
+
+
+def validate_many(schema: Schema, items: Iterable[Any]) -> list[Violation]:
+    return compile_schema(schema)(items)
+
+
+def iter_violations(schema: Schema, items: Iterable[Any]) -> Iterator[Violation]:
+    # Lazy over a stream of items; next(iter_violations(...), None) stops at the first violation.
+    # Validating a whole listing is faster with validate_many on the parsed body.
+    return compile_schema(schema, lazy=True)(items)
+
+
+def validate(schema: Schema, item: Any) -> list[Violation]:
+    return compile_schema(schema)((item,))
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
@@ -0,0 +1,10 @@
+import re
+
+# The 16 letters and digits ServeRest gives every _id.
+ID_PATTERN = re.compile(r"[A-Za-z0-9]{16}")
+
+# Query string filters ServeRest accepts on each listing (field -> type of its value);
+# all of them are exact matches. Shared by the query planner and the local stand-in.
+USER_QUERY_FIELDS = {"_id": str, "nome": str, "email": str, "password": str, "administrador": str}
+PRODUCT_QUERY_FIELDS = {"_id": str, "nome": str, "preco": int, "descricao": str, "quantidade": int}
+CART_QUERY_FIELDS = {"_id": str, "precoTotal": int, "quantidadeTotal": int, "idUsuario": str}
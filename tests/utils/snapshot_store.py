@@ -0,0 +1,177 @@
+import difflib
+import json
+import os
+import tempfile
+from collections.abc import Container
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+SNAPSHOT_DIR = Path(__file__).resolve().parents[2] / "__snapshots"
+MODES = ("record", "update", "check")
+SNAPSHOT_STORE = pytest.StashKey["SnapshotStore"]()
+
+
+def split_nodeid(nodeid: str) -> tuple[str, str]:
+    module, _, test = nodeid.partition("::")
+    return f"snap-{Path(module).stem}.json", test
+
+
+def test_of(key: str) -> str:
+    return key.rpartition("#")[0]
+
+
+def _normalize(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+def _render(value: Any) -> str:
+    return json.dumps(value, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+class SnapshotStore:
+    # Each worker reads a snapshot file at most once and only ever reports changes;
+    # the files themselves are rewritten once, by the controller, in merge_exports().
+    def __init__(self, directory: Path = SNAPSHOT_DIR, mode: str = "record"):
+        self.directory = directory
+        self.mode = mode
+        self.files: dict[str, dict[str, Any]] = {}
+        self.updates: dict[str, dict[str, Any]] = {}
+        self.touched: dict[str, set[str]] = {}
+        self.executed: dict[str, set[str]] = {}
+        self.collected: dict[str, set[str]] = {}
+        self.diffs: dict[str, list[str]] = {}
+        self.nodeid: str | None = None
+        self.counter = 0
+
+    def collect(self, nodeids: list[str], partial: Container[str] = ()) -> None:
+        # Modules narrowed on the command line (file.py::test) only collect part of their
+        # tests, so their missing tests cannot be told apart from deleted ones.
+        for nodeid in nodeids:
+            filename, test = split_nodeid(nodeid)
+            if filename not in partial:
+                self.collected.setdefault(filename, set()).add(test)
+
+    def begin_test(self, nodeid: str) -> None:
+        self.nodeid = nodeid
+        self.counter = 0
+
+    def end_test(self, nodeid: str, passed: bool) -> None:
+        # Only a passing test is known to have reached all of its matches_snapshot() calls;
+        # entries of failed or skipped tests are neither stale nor prunable.
+        self.nodeid = None
+        if passed:
+            filename, test = split_nodeid(nodeid)
+            self.executed.setdefault(filename, set()).add(test)
+
+    def check(self, value: Any) -> str | None:
+        if self.nodeid is None:
+            return "matches_snapshot() can only be used while a test is running"
+        filename, test = split_nodeid(self.nodeid)
+        self.counter += 1
+        key = f"{test}#{self.counter}"
+        self.touched.setdefault(filename, set()).add(key)
+
+        actual = _normalize(value)
+        stored = self._load(filename)
+        if key not in stored:
+            if self.mode == "check":
+                return f"No snapshot stored for {key} in {filename}; run with --snapshot-update to record it"
+            self._update(filename, key, actual)
+            return None
+        if stored[key] == actual:
+            return None
+        if self.mode == "update":
+            self._update(filename, key, actual)
+            return None
+        diff = "\n".join(
+            difflib.unified_diff(
+                _render(stored[key]).splitlines(),
+                _render(actual).splitlines(),
+                fromfile=f"{filename}:{key}",
+                tofile="actual",
+                lineterm="",
+            )
+        )
+        self.diffs.setdefault(self.nodeid, []).append(diff)
+        return f"Snapshot {key} does not match:\n{diff}"
+
+    def export(self) -> dict[str, Any]:
+        filenames = set(self.collected) | set(self.executed) | set(self.updates)
+        return {
+            filename: {
+                "updates": self.updates.get(filename, {}),
+                "touched": sorted(self.touched.get(filename, ())),
+                "executed": sorted(self.executed.get(filename, ())),
+                "collected": sorted(self.collected[filename]) if filename in self.collected else None,
+            }
+            for filename in filenames
+        }
+
+    def _load(self, filename: str) -> dict[str, Any]:
+        if filename not in self.files:
+            path = self.directory / filename
+            self.files[filename] = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        return self.files[filename]
+
+    def _update(self, filename: str, key: str, value: Any) -> None:
+        self._load(filename)[key] = value
+        self.updates.setdefault(filename, {})[key] = value
+
+
+def snapshot_store(config: pytest.Config) -> SnapshotStore | None:
+    return config.stash.get(SNAPSHOT_STORE, None)
+
+
+def merge_exports(directory: Path, exports: list[dict[str, Any]], mode: str) -> dict[str, dict[str, list[str]]]:
+    merged: dict[str, dict[str, Any]] = {}
+    for export in exports:
+        for filename, part in export.items():
+            target = merged.setdefault(
+                filename, {"updates": {}, "touched": set(), "executed": set(), "collected": set()}
+            )
+            target["updates"].update(part["updates"])
+            target["touched"].update(part["touched"])
+            target["executed"].update(part["executed"])
+            if part["collected"] is None or target["collected"] is None:
+                target["collected"] = None
+            else:
+                target["collected"].update(part["collected"])
+
+    report = {}
+    for filename, part in sorted(merged.items()):
+        path = directory / filename
+        stored = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        created = sorted(key for key in part["updates"] if key not in stored)
+        updated = sorted(key for key in part["updates"] if key in stored)
+        stale = sorted(
+            key
+            for key in stored
+            if key not in part["touched"]
+            and (
+                test_of(key) in part["executed"]
+                or (part["collected"] is not None and test_of(key) not in part["collected"])
+            )
+        )
+        content = {**stored, **part["updates"]}
+        if mode == "update":
+            for key in stale:
+                content.pop(key, None)
+        if content != stored:
+            _write_atomic(path, content)
+        if created or updated or stale:
+            report[filename] = {"created": created, "updated": updated, "stale": stale}
+    return report
+
+
+def _write_atomic(path: Path, content: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            temp_file.write(json.dumps(content, indent=2, sort_keys=True))
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pytest
+from playwright.sync_api import APIResponse, Playwright, sync_playwright
+
+from tests.utils.request_middleware import RequestCall, Send
+
+PHASES = {
+    "imports": "imports",
+    "driver_spawn": "driver spawn",
+    "async_driver_spawn": "async driver",
+    "first_context": "first context",
+    "first_request": "first request",
+}
+PROFILE = pytest.StashKey["StartupProfile"]()
+
+
+@dataclass
+class StartupProfile:
+    # Each phase is timed once per process. Times are exclusive: the first request
+    # also starts the driver and leases the first context, and those are not counted twice.
+    # Batch threads can time phases concurrently, hence the lock around the bookkeeping.
+    phases: dict[str, float] = field(default_factory=dict)
+    _recorded: float = 0.0
+    _running: set[str] = field(default_factory=set)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        with self._lock:
+            claimed = phase not in self.phases and phase not in self._running
+            if claimed:
+                self._running.add(phase)
+                recorded_before = self._recorded
+        if not claimed:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                exclusive = time.perf_counter() - started - (self._recorded - recorded_before)
+                self.phases[phase] = exclusive
+                self._recorded += exclusive
+                self._running.discard(phase)
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases.setdefault(phase, seconds)
+
+    def first_request(self, call: RequestCall, send: Send) -> APIResponse:
+        # Middleware; after the first request it only costs a dict lookup.
+        if "first_request" in self.phases:
+            return send(call)
+        with self.timed("first_request"):
+            return send(call)
+
+
+class LazyPlaywright:
+    # Starts the Node driver on first use instead of at session start.
+    def __init__(self, profile: StartupProfile):
+        self.profile = profile
+        self._playwright: Playwright | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    def get(self) -> Playwright:
+        if self._playwright is None:
+            with self.profile.timed("driver_spawn"):
+                self._playwright = sync_playwright().start()
+        return self._playwright
+
+    def stop(self) -> None:
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+def process_uptime() -> float:
+    # Wall-clock seconds since this process started, from its start time in /proc (clock
+    # ticks since boot). Where there is no /proc, the CPU time used so far stands in.
+    try:
+        with open("/proc/self/stat", encoding="ascii") as stat:
+            started_ticks = int(stat.read().rpartition(")")[2].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - started_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, AttributeError, ValueError, IndexError):
+        return time.process_time()
+
+
+def startup_profile(config: pytest.Config) -> StartupProfile:
+    return config.stash.setdefault(PROFILE, StartupProfile())
@@ -0,0 +1,210 @@
+import sqlite3
+import statistics
+import subprocess
+import time
+from collections.abc import Iterable
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from tests.utils.api_utils import BASE_URL
+from tests.utils.cassette import active_cassette
+from tests.utils.instrumentation import RequestRecord
+
+HISTORY_FILE = Path(__file__).resolve().parents[2] / ".timing-history.sqlite"
+DEFAULT_BASELINE_RUNS = 5
+DEFAULT_THRESHOLD = 20.0
+# A run where fewer tests passed (failed over failed + passed) is not stored: a broken
+# target or network would make it the baseline every later run is compared with.
+DEFAULT_MIN_PASS_RATIO = 0.9
+# Changes smaller than this are noise at any percentage (a 1 ms test taking 2 ms).
+MIN_DELTA = 0.005
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    git_commit TEXT NOT NULL,
+    base_url TEXT NOT NULL,
+    transport TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_target ON runs (base_url, transport, id);
+CREATE TABLE IF NOT EXISTS test_timings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_timings_run ON test_timings (run_id);
+CREATE TABLE IF NOT EXISTS endpoint_timings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    method TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50 REAL NOT NULL,
+    p95 REAL NOT NULL,
+    total REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS endpoint_timings_run ON endpoint_timings (run_id);
+CREATE TABLE IF NOT EXISTS test_groups (
+    nodeid TEXT PRIMARY KEY,
+    scope TEXT
+);
+"""
+
+
+@dataclass(frozen=True)
+class Regression:
+    kind: str
+    name: str
+    baseline: float
+    current: float
+    runs: int
+
+    @property
+    def change(self) -> float:
+        # Percent slower than the baseline.
+        return (self.current / self.baseline - 1) * 100
+
+
+def history_target(config: pytest.Config) -> str:
+    cassette = active_cassette(config)
+    if cassette is not None and cassette.mode == "replay":
+        return "replay"
+    return "local-server" if config.getoption("local_server") else BASE_URL
+
+
+def git_commit(cwd: Path) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, timeout=5, check=False
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return result.stdout.strip() if result.returncode == 0 else "unknown"
+
+
+class TimingHistory:
+    # Test durations and per-endpoint request latencies of every run, tagged with the git
+    # commit and the target (BASE_URL, local-server or replay) plus the transport. Runs
+    # are only compared with earlier runs against the same target and transport.
+    def __init__(self, path: Path = HISTORY_FILE):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record(
+        self,
+        commit: str,
+        base_url: str,
+        transport: str,
+        tests: dict[str, tuple[str, float]],
+        endpoints: Iterable[dict],
+    ) -> int:
+        # tests: nodeid -> (outcome, seconds); endpoints: rows of instrumentation.endpoint_summary().
+        with closing(self._connect()) as connection, connection:
+            run_id = connection.execute(
+                "INSERT INTO runs (started_at, git_commit, base_url, transport) VALUES (?, ?, ?, ?)",
+                (time.time(), commit, base_url, transport),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO test_timings VALUES (?, ?, ?, ?)",
+                [(run_id, nodeid, outcome, duration) for nodeid, (outcome, duration) in tests.items()],
+            )
+            connection.executemany(
+                "INSERT INTO endpoint_timings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, row["method"], row["endpoint"], row["count"], row["p50"], row["p95"], row["total"])
+                    for row in endpoints
+                ],
+            )
+        return run_id
+
+    def baseline(self, base_url: str, transport: str, runs: int, before: int | None = None) -> dict[str, dict]:
+        # Median over the last `runs` runs (before run id `before`) of each passed test's
+        # duration and each endpoint's p50: {"tests": {nodeid: (median, runs)},
+        # "endpoints": {"GET /usuarios": (median, runs)}}.
+        with closing(self._connect()) as connection:
+            run_ids = [
+                row[0]
+                for row in connection.execute(
+                    "SELECT id FROM runs WHERE base_url = ? AND transport = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                    (base_url, transport, before if before is not None else 2**63 - 1, runs),
+                )
+            ]
+            if not run_ids:
+                return {"tests": {}, "endpoints": {}}
+            marks = ",".join("?" * len(run_ids))
+            tests = connection.execute(
+                f"SELECT nodeid, duration FROM test_timings WHERE run_id IN ({marks}) AND outcome = 'passed'",
+                run_ids,
+            ).fetchall()
+            endpoints = connection.execute(
+                f"SELECT method || ' ' || endpoint, p50 FROM endpoint_timings WHERE run_id IN ({marks})", run_ids
+            ).fetchall()
+        return {"tests": _medians(tests), "endpoints": _medians(endpoints)}
+
+    def test_durations(self, base_url: str, transport: str, runs: int) -> dict[str, list[float]]:
+        # Each test's duration over the last `runs` stored runs, oldest first; skipped
+        # tests did not run and are left out. An absent file is an empty history.
+        if not Path(self.path).exists():
+            return {}
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT nodeid, duration FROM test_timings WHERE outcome != 'skipped' AND run_id IN "
+                "(SELECT id FROM runs WHERE base_url = ? AND transport = ? ORDER BY id DESC LIMIT ?) "
+                "ORDER BY run_id",
+                (base_url, transport, runs),
+            ).fetchall()
+        durations: dict[str, list[float]] = {}
+        for nodeid, duration in rows:
+            durations.setdefault(nodeid, []).append(duration)
+        return durations
+
+    def test_groups(self) -> dict[str, str | None]:
+        # Which tests must share a worker, as reported by the last run that collected them.
+        if not Path(self.path).exists():
+            return {}
+        with closing(self._connect()) as connection:
+            return dict(connection.execute("SELECT nodeid, scope FROM test_groups").fetchall())
+
+    def save_test_groups(self, groups: dict[str, str | None]) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO test_groups VALUES (?, ?)", groups.items())
+
+
+def pass_ratio(outcomes: Iterable[str]) -> float:
+    # Skipped tests neither pass nor fail; a run with nothing but skips counts as passing.
+    counted = [outcome for outcome in outcomes if outcome != "skipped"]
+    return counted.count("passed") / len(counted) if counted else 1.0
+
+
+def answered(record: RequestRecord) -> bool:
+    # Whether a request's latency says something about the endpoint: it got a response
+    # that is neither a server error nor throttling (a transport error has status 0).
+    return 0 < record.status < 500 and record.status != 429
+
+
+def _medians(rows: list[tuple[str, float]]) -> dict[str, tuple[float, int]]:
+    samples: dict[str, list[float]] = {}
+    for name, value in rows:
+        samples.setdefault(name, []).append(value)
+    return {name: (statistics.median(values), len(values)) for name, values in samples.items()}
+
+
+def regressions(
+    kind: str, current: dict[str, float], baseline: dict[str, tuple[float, int]], threshold: float
+) -> list[Regression]:
+    found = []
+    for name, value in current.items():
+        if name not in baseline:
+            continue
+        reference, runs = baseline[name]
+        if reference > 0 and value - reference >= MIN_DELTA and value > reference * (1 + threshold / 100):
+            found.append(Regression(kind, name, reference, value, runs))
+    return sorted(found, key=lambda regression: regression.change, reverse=True)
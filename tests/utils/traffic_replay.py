@@ -0,0 +1,306 @@
+import json
+import re
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from tests.utils.cassette import CASSETTE_PATH, load_cassette
+from tests.utils.instrumentation import endpoint_template, percentile
+from tests.utils.transport import HttpRequestContext
+
+DEFAULT_CONCURRENCY = 8
+# Upper bounds in milliseconds; the last bucket takes everything slower.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Response fields whose recorded value later requests reuse (ids in paths and bodies, tokens).
+CAPTURED_FIELDS = ("_id", "authorization")
+# Cassette.Masker placeholders, e.g. "<email:gw0/3>".
+PLACEHOLDER = re.compile(r"<(email|password|nome|produto|uid|token):([\w/]+)>")
+DEPENDENCY_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True)
+class Exchange:
+    index: int
+    test: str
+    offset: float
+    request: dict[str, Any]
+    status: int
+    body: str
+
+    def request_text(self) -> str:
+        return json.dumps(self.request, ensure_ascii=False)
+
+
+def load_journal(path: Path = CASSETTE_PATH) -> list[Exchange]:
+    # The cassette in recorded order (offsets into each worker's session). Cassettes
+    # recorded without masked requests ("request"/"offset") cannot be replayed as load.
+    _, interactions = load_cassette(path)
+    replayable = [interaction for interaction in interactions if "offset" in interaction]
+    if not replayable:
+        raise ValueError(f"{path} has no recorded requests; record it again with pytest --record")
+    replayable.sort(key=lambda interaction: interaction["offset"])
+    return [
+        Exchange(index, item["test"], item["offset"], item["request"], item["status"], item["body"])
+        for index, item in enumerate(replayable)
+    ]
+
+
+def captured_values(body: str) -> dict[str, str]:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return {}
+    if not isinstance(payload, dict):
+        return {}
+    return {name: payload[name] for name in CAPTURED_FIELDS if isinstance(payload.get(name), str)}
+
+
+def dependencies(journal: list[Exchange]) -> list[list[int]]:
+    # For each exchange, the earlier exchanges it needs: the one whose recorded response
+    # produced an id or token it sends, the first one that used each generated value it
+    # sends (the signup before a login with the same email), and the previous request sent
+    # with the same token (tests sharing a user also share its cart). Replay waits for
+    # them, whatever the pacing and concurrency.
+    producers: dict[str, int] = {}
+    last_by_token: dict[str, int] = {}
+    needs = []
+    for exchange in journal:
+        text = exchange.request_text()
+        found = {index for value, index in producers.items() if value in text}
+        token = exchange.request.get("auth")
+        if token is not None:
+            if token in last_by_token:
+                found.add(last_by_token[token])
+            last_by_token[token] = exchange.index
+        found.discard(exchange.index)
+        needs.append(sorted(found))
+        for match in PLACEHOLDER.finditer(text):
+            producers.setdefault(match.group(), exchange.index)
+        for value in captured_values(exchange.body).values():
+            producers.setdefault(value.removeprefix("Bearer "), exchange.index)
+    return needs
+
+
+class Rewriter:
+    # Per iteration: every placeholder of the recording gets a value tagged with the
+    # iteration (the same one wherever it appears, so a login still matches its signup),
+    # and every id/token the target returns replaces the recorded one, tokens included:
+    # a request sends the token of the login replayed before it.
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.values: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def learn(self, recorded_body: str, body: bytes) -> None:
+        recorded = captured_values(recorded_body)
+        current = captured_values(body.decode("utf-8", "replace"))
+        with self._lock:
+            for name, old in recorded.items():
+                if name in current and current[name] != old:
+                    self.values[old.removeprefix("Bearer ")] = current[name].removeprefix("Bearer ")
+
+    def apply(self, text: str) -> str:
+        with self._lock:
+            known = dict(self.values)
+        for old, new in known.items():
+            text = text.replace(old, new)
+        return PLACEHOLDER.sub(self._fill, text)
+
+    def _fill(self, match: re.Match) -> str:
+        kind, number = match.groups()
+        name = f"{number.replace('/', 'x')}{self.tag}"
+        if kind == "email":
+            return f"replay.{name}@example.com"
+        if kind == "password":
+            return f"Senha@{name}"
+        if kind == "nome":
+            return f"Replay {name}"
+        if kind == "produto":
+            return f"Produto {name}"
+        # uid, or a token whose login failed: sent as is, the target answers 401.
+        return name if kind == "uid" else match.group()
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    mismatched: int = 0
+
+    def histogram(self) -> list[int]:
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for seconds in self.latencies:
+            milliseconds = seconds * 1000
+            counts[next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if milliseconds <= bound), -1)] += 1
+        return counts
+
+
+@dataclass
+class LoadReport:
+    duration: float
+    endpoints: dict[str, EndpointStats]
+
+    def rows(self) -> list[dict[str, Any]]:
+        rows = []
+        for endpoint, stats in self.endpoints.items():
+            latencies = stats.latencies
+            rows.append(
+                {
+                    "endpoint": endpoint,
+                    "count": len(latencies),
+                    "rps": len(latencies) / self.duration if self.duration else 0.0,
+                    "p50_ms": percentile(latencies, 0.50) * 1000,
+                    "p95_ms": percentile(latencies, 0.95) * 1000,
+                    "p99_ms": percentile(latencies, 0.99) * 1000,
+                    "errors": stats.errors,
+                    "mismatched": stats.mismatched,
+                    "statuses": {str(status): count for status, count in sorted(stats.statuses.items())},
+                    "histogram": stats.histogram(),
+                }
+            )
+        return sorted(rows, key=lambda row: row["count"], reverse=True)
+
+
+class TrafficReplay:
+    # Replays a recorded suite run as load. Requests of one test are sent in order (a
+    # test is one virtual user); tests run concurrently on `concurrency` threads and start
+    # at their recorded offsets divided by `speedup` (0 sends as fast as possible).
+    # `iterations` runs the journal again back to back, each with fresh emails and names.
+    def __init__(
+        self,
+        journal: list[Exchange],
+        request: HttpRequestContext,
+        speedup: float = 1.0,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        iterations: int = 1,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.journal = journal
+        self.request = request
+        self.speedup = speedup
+        self.concurrency = concurrency
+        self.iterations = iterations
+        self.clock = clock
+        self.needs = dependencies(journal)
+        self.span = journal[-1].offset - journal[0].offset if journal else 0.0
+        self._stats: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def run(self) -> LoadReport:
+        flows: dict[str, list[Exchange]] = {}
+        for exchange in self.journal:
+            flows.setdefault(exchange.test, []).append(exchange)
+        run_tag = secrets.token_hex(2)
+        started = self.clock()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="replay") as pool:
+            futures = []
+            for iteration in range(self.iterations):
+                rewriter = Rewriter(f"{run_tag}r{iteration}")
+                done = [threading.Event() for _ in self.journal]
+                offset = iteration * self.span
+                for flow in flows.values():
+                    futures.append(pool.submit(self._flow, flow, rewriter, done, started, offset))
+            for future in futures:
+                future.result()
+        return LoadReport(self.clock() - started, self._stats)
+
+    def _flow(
+        self, flow: list[Exchange], rewriter: Rewriter, done: list[threading.Event], started: float, offset: float
+    ) -> None:
+        for exchange in flow:
+            try:
+                if self.speedup > 0:
+                    due = started + (offset + exchange.offset - self.journal[0].offset) / self.speedup
+                    time.sleep(max(0.0, due - self.clock()))
+                deadline = time.monotonic() + DEPENDENCY_TIMEOUT
+                for index in self.needs[exchange.index]:
+                    done[index].wait(max(0.0, deadline - time.monotonic()))
+                self._send(exchange, rewriter)
+            finally:
+                done[exchange.index].set()
+
+    def _send(self, exchange: Exchange, rewriter: Rewriter) -> None:
+        request = json.loads(rewriter.apply(exchange.request_text()))
+        endpoint = f"{request['method']} {endpoint_template(request['url'])}"
+        headers = dict(request["headers"])
+        if "auth" in request:
+            headers["Authorization"] = request["auth"]
+        began = self.clock()
+        try:
+            response = self.request.fetch(
+                request["url"],
+                method=request["method"],
+                params=request.get("params"),
+                headers=headers,
+                data=request["data"],
+            )
+            status = response.status
+        except OSError:
+            response = None
+            status = 0
+        elapsed = self.clock() - began
+        if response is not None:
+            rewriter.learn(exchange.body, response.body())
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, EndpointStats())
+            stats.latencies.append(elapsed)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.errors += status == 0 or status >= 500
+            stats.mismatched += status != exchange.status
+
+
+def format_report(report: LoadReport) -> str:
+    rows = report.rows()
+    total = sum(row["count"] for row in rows)
+    lines = [
+        f"{total} requests in {report.duration:.2f} s ({total / report.duration if report.duration else 0:.1f} req/s)",
+        f"{'endpoint':<38}{'count':>6}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>7}{'!=rec':>7}",
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['endpoint']:<38}{row['count']:>6}{row['rps']:>8.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+            f"{row['p99_ms']:>9.1f}{row['errors']:>7}{row['mismatched']:>7}"
+        )
+    bounds = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    lines.append("")
+    lines.append(f"{'latency histogram (ms)':<38}" + "".join(f"{bound:>7}" for bound in bounds))
+    for row in rows:
+        lines.append(f"{row['endpoint']:<38}" + "".join(f"{count:>7}" for count in row["histogram"]))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from tests.utils.api_utils import BASE_URL
+    from tests.utils.local_server import start_local_server
+
+    parser = argparse.ArgumentParser(description="Replay the traffic recorded in a cassette as load.")
+    parser.add_argument("--cassette", type=Path, default=CASSETTE_PATH)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--local-server", action="store_true", help="Target an in-process ServeRest stand-in.")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Replay N times faster; 0 sends without pauses.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Tests replayed at once.")
+    parser.add_argument("--iterations", type=int, default=1, help="Times the journal is replayed.")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the per-endpoint report here.")
+    args = parser.parse_args()
+
+    server = start_local_server() if args.local_server else None
+    target = HttpRequestContext(server.base_url if server is not None else args.base_url)
+    try:
+        replay = TrafficReplay(load_journal(args.cassette), target, args.speedup, args.concurrency, args.iterations)
+        report = replay.run()
+    finally:
+        target.dispose()
+        if server is not None:
+            server.stop()
+    print(format_report(report))
+    if args.json is not None:
+        summary = {"duration": report.duration, "buckets_ms": LATENCY_BUCKETS_MS, "endpoints": report.rows()}
+        args.json.write_text(json.dumps(summary, indent=2), encoding="utf-8")
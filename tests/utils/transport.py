@@ -0,0 +1,237 @@
+import http.client
+import json
+import select
+import threading
+import time
+from typing import Any, Protocol
+from urllib.parse import urlencode, urljoin, urlsplit
+
+TRANSPORTS = ("playwright", "http")
+DEFAULT_TIMEOUT_MS = 30_000
+MAX_IDLE_PER_HOST = 8
+# Idle connections older than this are closed instead of reused: below the keep-alive
+# timeout of the servers the suite targets (serverest.dev closes them after about 5 s).
+MAX_IDLE_SECONDS = 4.0
+# A pooled connection the server closed after it was checked fails on first use. A
+# request that could not be written is retried once on a fresh connection, whatever
+# its method; one written in full may have reached the server, so only idempotent
+# methods are retried then.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class ApiResponse(Protocol):
+    @property
+    def status(self) -> int: ...
+
+    @property
+    def ok(self) -> bool: ...
+
+    @property
+    def headers(self) -> dict[str, str]: ...
+
+    def body(self) -> bytes: ...
+
+    def text(self) -> str: ...
+
+    def json(self) -> Any: ...
+
+
+class ApiRequestContext(Protocol):
+    # What the suite needs from a transport; Playwright's APIRequestContext and
+    # HttpRequestContext both provide it, and RequestContextProxy wraps either one.
+    def fetch(self, url: str, method: str | None = None, **options: Any) -> ApiResponse: ...
+
+    def get(self, url: str, **options: Any) -> ApiResponse: ...
+
+    def post(self, url: str, **options: Any) -> ApiResponse: ...
+
+    def put(self, url: str, **options: Any) -> ApiResponse: ...
+
+    def delete(self, url: str, **options: Any) -> ApiResponse: ...
+
+    def dispose(self) -> None: ...
+
+
+class HttpResponse:
+    def __init__(self, url: str, status: int, status_text: str, headers: dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.status_text = status_text
+        self.ok = 200 <= status <= 299
+        self.headers = headers
+        self._body = body
+
+    def body(self) -> bytes:
+        return self._body
+
+    def text(self) -> str:
+        return self._body.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self._body)
+
+    def dispose(self) -> None:
+        pass
+
+
+class HttpRequestContext:
+    # Pure-Python transport: requests go straight from this process to the server over
+    # pooled keep-alive connections, with no round trip through the Playwright driver.
+    # Mirrors the APIRequestContext options the suite uses (params, headers, data, timeout).
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = DEFAULT_TIMEOUT_MS,
+        max_idle: int = MAX_IDLE_PER_HOST,
+        max_idle_seconds: float = MAX_IDLE_SECONDS,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_idle_seconds = max_idle_seconds
+        # origin -> [(connection, monotonic time it went idle)], most recent last.
+        self._idle: dict[tuple[str, str], list[tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def fetch(
+        self,
+        url: str,
+        method: str | None = None,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        data: Any = None,
+        timeout: float | None = None,
+    ) -> HttpResponse:
+        full_url = urljoin(self.base_url, url)
+        if params:
+            query = urlencode({key: _param(value) for key, value in params.items()})
+            full_url += ("&" if "?" in full_url else "?") + query
+        parts = urlsplit(full_url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        request_headers = dict(headers or {})
+        body = _encode_body(data, request_headers)
+        origin = (parts.scheme, parts.netloc)
+        method = (method or "GET").upper()
+        # Milliseconds, as in Playwright; 0 means no timeout.
+        milliseconds = self.timeout if timeout is None else timeout
+        seconds = milliseconds / 1000 if milliseconds else None
+
+        for attempt in range(2):
+            connection, reused = self._checkout(origin, seconds, fresh=attempt > 0)
+            written = False
+            try:
+                connection.request(method, target, body=body, headers=request_headers)
+                written = True
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if attempt or not reused or (written and method not in IDEMPOTENT_METHODS):
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(origin, connection)
+        response_headers: dict[str, str] = {}
+        for name, value in response.getheaders():
+            name = name.lower()
+            response_headers[name] = f"{response_headers[name]}, {value}" if name in response_headers else value
+        return HttpResponse(full_url, response.status, response.reason, response_headers, payload)
+
+    def get(self, url: str, **options: Any) -> HttpResponse:
+        return self.fetch(url, "GET", **options)
+
+    def head(self, url: str, **options: Any) -> HttpResponse:
+        return self.fetch(url, "HEAD", **options)
+
+    def post(self, url: str, **options: Any) -> HttpResponse:
+        return self.fetch(url, "POST", **options)
+
+    def put(self, url: str, **options: Any) -> HttpResponse:
+        return self.fetch(url, "PUT", **options)
+
+    def patch(self, url: str, **options: Any) -> HttpResponse:
+        return self.fetch(url, "PATCH", **options)
+
+    def delete(self, url: str, **options: Any) -> HttpResponse:
+        return self.fetch(url, "DELETE", **options)
+
+    def storage_state(self) -> dict[str, list[Any]]:
+        # No cookie jar: ServeRest authenticates with the Authorization header only.
+        return {"cookies": [], "origins": []}
+
+    def dispose(self) -> None:
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection, _ in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _checkout(
+        self, origin: tuple[str, str], timeout: float | None, fresh: bool = False
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        while not fresh:
+            with self._lock:
+                idle = self._idle.get(origin)
+                if not idle:
+                    break
+                connection, idle_since = idle.pop()
+            if time.monotonic() - idle_since > self.max_idle_seconds or not _usable(connection):
+                connection.close()
+                continue
+            connection.timeout = timeout
+            connection.sock.settimeout(timeout)
+            return connection, True
+        scheme, netloc = origin
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.connections_opened += 1
+        return connection_class(netloc, timeout=timeout), False
+
+    def _checkin(self, origin: tuple[str, str], connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_idle:
+                idle.append((connection, time.monotonic()))
+                return
+        connection.close()
+
+
+def _encode_body(data: Any, headers: dict[str, str]) -> bytes | None:
+    # Same defaults as Playwright: objects become JSON, anything else is sent as is.
+    if data is None:
+        return None
+    has_content_type = any(name.lower() == "content-type" for name in headers)
+    if isinstance(data, (dict, list)):
+        if not has_content_type:
+            headers["Content-Type"] = "application/json"
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+    if not has_content_type:
+        headers["Content-Type"] = "application/octet-stream"
+    return data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+
+def _usable(connection: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket has nothing to read; if it is readable, the server closed
+    # it (or sent something unsolicited) and the next request on it would fail.
+    if connection.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return False
+    return not readable
+
+
+def _param(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
@@ -0,0 +1,23 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+_spent = threading.local()
+
+
+@contextmanager
+def untimed() -> Iterator[None]:
+    # Work a request waits on but that is not the request itself (leasing a context,
+    # spawning a driver). RequestRecorder leaves it out of the duration of the request
+    # recorded on the same thread.
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _spent.seconds = untimed_seconds() + time.perf_counter() - started
+
+
+def untimed_seconds() -> float:
+    # Untimed seconds spent on this thread so far; callers take differences.
+    return getattr(_spent, "seconds", 0.0)
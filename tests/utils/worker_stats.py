@@ -0,0 +1,39 @@
+from typing import Any
+
+import pytest
+
+KEY_PREFIX = "serverest:"
+COLLECTED = pytest.StashKey[dict[str, list[Any]]]()
+
+
+def is_worker(config: pytest.Config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def is_controller(config: pytest.Config) -> bool:
+    return config.pluginmanager.has_plugin("dsession")
+
+
+def worker_id(config: pytest.Config) -> str:
+    return config.workerinput["workerid"] if is_worker(config) else "main"
+
+
+def publish(config: pytest.Config, key: str, payload: Any) -> None:
+    if is_worker(config):
+        config.workeroutput[KEY_PREFIX + key] = payload
+    elif not is_controller(config):
+        _store(config, key, payload)
+
+
+def collect_worker_output(config: pytest.Config, workeroutput: dict[str, Any]) -> None:
+    for key, payload in workeroutput.items():
+        if key.startswith(KEY_PREFIX):
+            _store(config, key.removeprefix(KEY_PREFIX), payload)
+
+
+def collected(config: pytest.Config, key: str) -> list[Any]:
+    return config.stash.get(COLLECTED, {}).get(key, [])
+
+
+def _store(config: pytest.Config, key: str, payload: Any) -> None:
+    config.stash.setdefault(COLLECTED, {}).setdefault(key, []).append(payload)